@@ -67,6 +67,22 @@ class ApplicationController:
             print(f"Command execution failed: {e}")
             return False
 
+    def get_command_names(self) -> Dict[str, list]:
+        names = {'common': [name.replace('_', ' ') for name in self.common_commands]}
+        tables = {
+            'vscode': self._vscode_command_table,
+            'browser': self._browser_command_table,
+            'media': self._media_command_table,
+            'terminal': self._terminal_command_table,
+            'editor': self._editor_command_table,
+            'word': self._word_command_table,
+            'excel': self._excel_command_table,
+            'powerpoint': self._powerpoint_command_table,
+        }
+        for group, table in tables.items():
+            names[group] = list(table().keys())
+        return names
+
     def _type_text(self, params: Dict[str, Any]) -> bool:
         text = params.get('text', '')
         if text:
@@ -150,10 +166,10 @@ class ApplicationController:
         print(f"Screenshot saved: {filename}")
         return True
 
-    def _vscode_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _vscode_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'save': lambda: pyautogui.hotkey(ctrl_or_cmd, 's'),
             'save all': lambda: pyautogui.hotkey(ctrl_or_cmd, 'k', 's'),
             'open file': lambda: pyautogui.hotkey(ctrl_or_cmd, 'o'),
@@ -173,16 +189,19 @@ class ApplicationController:
             'previous tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 'pageup'),
             'split editor': lambda: pyautogui.hotkey(ctrl_or_cmd, '\\'),
         }
+
+    def _vscode_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._vscode_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return False
 
-    def _browser_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _browser_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'new tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 't'),
             'close tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 'w'),
             'reopen tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 'shift', 't'),
@@ -204,14 +223,17 @@ class ApplicationController:
             'reset zoom': lambda: pyautogui.hotkey(ctrl_or_cmd, '0'),
             'fullscreen': lambda: pyautogui.press('f11'),
         }
+
+    def _browser_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._browser_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return False
 
-    def _media_commands(self, command: str, params: Dict[str, Any]) -> bool:
-        commands = {
+    def _media_command_table(self) -> Dict[str, Any]:
+        return {
             'play': lambda: pyautogui.press('space'),
             'pause': lambda: pyautogui.press('space'),
             'next': lambda: pyautogui.press('n'),
@@ -223,16 +245,19 @@ class ApplicationController:
             'seek forward': lambda: pyautogui.press('right'),
             'seek backward': lambda: pyautogui.press('left'),
         }
+
+    def _media_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._media_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return False
 
-    def _terminal_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _terminal_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'clear': lambda: (pyautogui.write('clear') and pyautogui.press('enter')),
             'new tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 'shift', 't'),
             'close tab': lambda: pyautogui.hotkey(ctrl_or_cmd, 'shift', 'w'),
@@ -242,16 +267,19 @@ class ApplicationController:
             'zoom in': lambda: pyautogui.hotkey(ctrl_or_cmd, '+'),
             'zoom out': lambda: pyautogui.hotkey(ctrl_or_cmd, '-'),
         }
+
+    def _terminal_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._terminal_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return False
 
-    def _editor_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _editor_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'save': lambda: pyautogui.hotkey(ctrl_or_cmd, 's'),
             'save as': lambda: pyautogui.hotkey(ctrl_or_cmd, 'shift', 's'),
             'open': lambda: pyautogui.hotkey(ctrl_or_cmd, 'o'),
@@ -265,16 +293,19 @@ class ApplicationController:
             'undo': lambda: pyautogui.hotkey(ctrl_or_cmd, 'z'),
             'redo': lambda: pyautogui.hotkey(ctrl_or_cmd, 'y'),
         }
+
+    def _editor_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._editor_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return False
 
-    def _word_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _word_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'bold': lambda: pyautogui.hotkey(ctrl_or_cmd, 'b'),
             'italic': lambda: pyautogui.hotkey(ctrl_or_cmd, 'i'),
             'underline': lambda: pyautogui.hotkey(ctrl_or_cmd, 'u'),
@@ -285,38 +316,47 @@ class ApplicationController:
             'increase font': lambda: pyautogui.hotkey(ctrl_or_cmd, ']'),
             'decrease font': lambda: pyautogui.hotkey(ctrl_or_cmd, '['),
         }
+
+    def _word_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._word_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return self._editor_commands(command, params)
 
-    def _excel_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _excel_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'new sheet': lambda: pyautogui.hotkey('shift', 'f11'),
             'insert row': lambda: pyautogui.hotkey(ctrl_or_cmd, 'shift', '+'),
             'delete row': lambda: pyautogui.hotkey(ctrl_or_cmd, '-'),
             'autosum': lambda: pyautogui.hotkey('alt', '='),
             'format cells': lambda: pyautogui.hotkey(ctrl_or_cmd, '1'),
         }
+
+    def _excel_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._excel_command_table()
         
         if command in commands:
             commands[command]()
             return True
         return self._editor_commands(command, params)
 
-    def _powerpoint_commands(self, command: str, params: Dict[str, Any]) -> bool:
+    def _powerpoint_command_table(self) -> Dict[str, Any]:
         ctrl_or_cmd = 'command' if self.os_name == 'Darwin' else 'ctrl'
         
-        commands = {
+        return {
             'new slide': lambda: pyautogui.hotkey(ctrl_or_cmd, 'm'),
             'start presentation': lambda: pyautogui.press('f5'),
             'next slide': lambda: pyautogui.press('right'),
             'previous slide': lambda: pyautogui.press('left'),
             'end presentation': lambda: pyautogui.press('esc'),
         }
+
+    def _powerpoint_commands(self, command: str, params: Dict[str, Any]) -> bool:
+        commands = self._powerpoint_command_table()
         
         if command in commands:
             commands[command]()
@@ -48,7 +48,8 @@ class EnhancedIntelligentBrowser:
             except Exception as e:
                 print(f"❌ Cannot recover from closed window: {e}")
                 return False
-    def parse_command(self, text):
+    @staticmethod
+    def parse_command(text):
         text = text.lower().strip()
         file_patterns = [
             (r"^create\s+(?:a\s+)?file\s+(?:named\s+|called\s+)?(.+)", "create_file"),
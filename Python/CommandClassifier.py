@@ -1,12 +1,87 @@
 
+import random
 import re
+import sys
+import time
 from enum import Enum
 
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse, sre_constants
+
 class CommandType(Enum):
     SYSTEM = "system"
     WEB = "web"
     CONVERSATION = "conversation"
 
+def _required_literals(pattern, flags=0):
+    """Literal strings one of which must occur in any match of `pattern`, or None if unknown."""
+    try:
+        return _sequence_literals(sre_parse.parse(pattern, flags).data)
+    except Exception:
+        return None
+
+def _sequence_literals(items):
+    run = ""
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            run += chr(av).lower()
+            continue
+        if run:
+            return {run}
+        literals = None
+        if op == sre_constants.SUBPATTERN:
+            literals = _sequence_literals(av[-1].data if hasattr(av[-1], 'data') else av[-1])
+        elif op == sre_constants.BRANCH:
+            alternatives = [_sequence_literals(alt.data if hasattr(alt, 'data') else alt) for alt in av[1]]
+            if all(alternatives):
+                literals = set().union(*alternatives)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            literals = _sequence_literals(av[2].data if hasattr(av[2], 'data') else av[2])
+        if literals:
+            return literals
+    return {run} if run else None
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that reports every keyword occurring in a text in one scan."""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [frozenset()]
+        for keyword in keywords:
+            state = 0
+            for ch in keyword:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(frozenset())
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state] = self.output[state] | {keyword}
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] | self.output[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        found = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
 class CommandClassifier:
     def __init__(self):
         self.system_patterns = [
@@ -91,14 +166,73 @@ class CommandClassifier:
             r'^(wow|cool|nice|great|awesome|amazing|excellent|perfect)\b',
             r'^(wah|zabardast|badhiya|mast|shandar)\b',
         ]
+        self.search_prefixes = ('search ', 'google ', 'find ', 'lookup ', 'look up ')
+        self.launch_prefixes = ('open ', 'launch ', 'start ', 'run ', 'execute ', 'close ', 'quit ')
+        self.apps = ['chrome', 'firefox', 'brave', 'edge', 'safari', 'notepad', 
+                     'calculator', 'terminal', 'cmd', 'settings', 'explorer',
+                     'finder', 'spotify', 'discord', 'steam', 'vlc', 'code', 'vscode',
+                     'visual', 'studio', 'tool', 'app', 'application']
+        self.system_keywords = ['file', 'folder', 'directory', 'volume', 'brightness',
+                                'screenshot', 'taskbar', 'desktop', 'window']
+        self.local_indicators = ['on computer', 'in computer', 'on pc', 'in pc', 
+                                 'on system', 'in system', 'from system', 'on my computer', 'on this computer',
+                                 'my pc', 'this pc', 'on laptop', 'in laptop',
+                                 'computer me', 'pc me', 'system me', 'system se', 'mere computer',
+                                 'meri pc', 'is computer']
+        self.question_words = ['what', 'who', 'when', 'where', 'why', 'how',
+                               'kya', 'kaun', 'kab', 'kahan', 'kaise', 'kyun']
+        self.info_words = ['information', 'details', 'about', 'regarding',
+                           'jankari', 'bare mein', 'ke bare']
+        self.web_indicators = ['google', 'search on internet', 'search online', 
+                               'internet pe', 'web pe', 'online search',
+                               'google karo', 'internet par']
+        self.web_conversation_indicators = ['thank', 'thanks', 'bye', 'hello', 'hi', 'sorry', 
+                                            'ok', 'okay', 'watching', 'listening']
+        self.local_context = ['on computer', 'in computer', 'computer me', 'pc me', 
+                              'system me', 'from system', 'system se', 'on my pc', 'my computer']
+        self.strong_indicators = [
+            'thank you', 'thanks', 'thank', 'thankyou', 'thx',
+            'bye', 'goodbye', 'see you', 'take care',
+            'hello', 'hi', 'hey',
+            'sorry', 'apologies',
+            'ok', 'okay', 'alright', 'sure', 'got it',
+            'wow', 'cool', 'nice', 'great',
+        ]
+        self.viewing_words = ['watching', 'listening', 'viewing']
+        self.english_question_words = ['what', 'who', 'when', 'where', 'why', 'how']
+        self.pronouns = ['you', 'your', 'yourself', 'tum', 'tumhara', 'aap', 'aapka']
+        self.polite_words = ['please', 'kindly', 'kripa', 'meherbani']
+        self.explicit_search = re.compile(r'\b(search|find|lookup|google)\s+(for|about|on)\s+')
+        self.domain = re.compile(r'\.(com|org|net|in|co)')
+        self._compile()
+    def _compile(self):
+        """Compiles the pattern lists and keyword tables into one keyword automaton.
+
+        Each regex is compiled once and tagged with the literals it cannot match
+        without; a single automaton scan finds those literals together with every
+        contextual keyword, so only regexes whose literals occur are run.
+        """
+        self.compiled_patterns = []
+        keywords = set()
+        for index, patterns in enumerate((self.system_patterns, self.web_patterns, self.conversation_patterns)):
+            for pattern in patterns:
+                literals = _required_literals(pattern, re.IGNORECASE)
+                self.compiled_patterns.append((re.compile(pattern, re.IGNORECASE), index, literals))
+                keywords |= literals or set()
+        self.keyword_weights = {}
+        for index, table, weight in (
+            (0, self.apps, 2), (0, self.system_keywords, 1), (0, self.local_indicators, 10),
+            (1, self.info_words, 1), (1, self.web_indicators, 5),
+            (1, self.web_conversation_indicators, -8), (1, self.local_context, -10),
+            (2, self.strong_indicators, 5), (2, self.polite_words, 1),
+        ):
+            for keyword in table:
+                self.keyword_weights.setdefault(keyword, [0, 0, 0])[index] += weight
+        keywords |= set(self.keyword_weights) | set(self.viewing_words) | set(self.english_question_words)
+        self.automaton = KeywordAutomaton(sorted(keywords))
     def classify(self, text):
         text = text.lower().strip()
-        system_score = self._score_patterns(text, self.system_patterns)
-        web_score = self._score_patterns(text, self.web_patterns)
-        conversation_score = self._score_patterns(text, self.conversation_patterns)
-        system_score += self._contextual_system_score(text)
-        web_score += self._contextual_web_score(text)
-        conversation_score += self._contextual_conversation_score(text)
+        system_score, web_score, conversation_score = self._compiled_scores(text)
         scores = {
             CommandType.SYSTEM: system_score,
             CommandType.WEB: web_score,
@@ -114,6 +248,52 @@ class CommandClassifier:
         confidence = min(max_score / 5.0, 1.0)
         reasoning = self._get_reasoning(text, command_type, scores)
         return command_type, confidence, reasoning
+    def _compiled_scores(self, text):
+        found = self.automaton.find(text)
+        # The literal prefilter assumes ASCII case folding; anything else runs every regex
+        prefilter = text.isascii()
+        pattern_scores = [0, 0, 0]
+        for regex, index, literals in self.compiled_patterns:
+            if prefilter and literals is not None and literals.isdisjoint(found):
+                continue
+            if regex.search(text):
+                pattern_scores[index] += 1
+        context = [0, 0, 0]
+        for keyword in found:
+            weights = self.keyword_weights.get(keyword)
+            if weights:
+                context[0] += weights[0]
+                context[1] += weights[1]
+                context[2] += weights[2]
+        words = text.split()
+        word_set = set(words)
+        searching = text.startswith(self.search_prefixes)
+        if searching:
+            system_context = -10
+        else:
+            system_context = context[0] + (3 if text.startswith(self.launch_prefixes) else 0)
+        web_context = context[1] + (10 if searching else 0)
+        if self.explicit_search.search(text):
+            web_context += 8
+        question_count = sum(1 for word in self.question_words if word in word_set)
+        web_context += 1.5 * question_count
+        if self.domain.search(text):
+            web_context += 3
+        if len(words) <= 2 and not question_count:
+            web_context -= 5
+        conversation_context = context[2] + (2 if len(words) <= 3 else 0)
+        if not found.isdisjoint(self.viewing_words) and found.isdisjoint(self.english_question_words):
+            conversation_context += 5
+        conversation_context += 2 * sum(1 for pronoun in self.pronouns if pronoun in word_set)
+        if text.endswith(('!', '.')):
+            conversation_context += 1
+        return (pattern_scores[0] + system_context, pattern_scores[1] + web_context,
+                pattern_scores[2] + conversation_context)
+    def _reference_scores(self, text):
+        """Uncompiled scoring, kept as the oracle for the equivalence check."""
+        return (self._score_patterns(text, self.system_patterns) + self._contextual_system_score(text),
+                self._score_patterns(text, self.web_patterns) + self._contextual_web_score(text),
+                self._score_patterns(text, self.conversation_patterns) + self._contextual_conversation_score(text))
     def _score_patterns(self, text, patterns):
         score = 0
         for pattern in patterns:
@@ -122,28 +302,17 @@ class CommandClassifier:
         return score
     def _contextual_system_score(self, text):
         score = 0
-        if text.strip().lower().startswith(('search ', 'google ', 'find ', 'lookup ', 'look up ')):
+        if text.strip().lower().startswith(self.search_prefixes):
             return -10
-        if text.strip().lower().startswith(('open ', 'launch ', 'start ', 'run ', 'execute ', 'close ', 'quit ')):
+        if text.strip().lower().startswith(self.launch_prefixes):
             score += 3
-        apps = ['chrome', 'firefox', 'brave', 'edge', 'safari', 'notepad', 
-                'calculator', 'terminal', 'cmd', 'settings', 'explorer',
-                'finder', 'spotify', 'discord', 'steam', 'vlc', 'code', 'vscode',
-                'visual', 'studio', 'tool', 'app', 'application']
-        for app in apps:
+        for app in self.apps:
             if app in text:
                 score += 2
-        system_keywords = ['file', 'folder', 'directory', 'volume', 'brightness',
-                          'screenshot', 'taskbar', 'desktop', 'window']
-        for keyword in system_keywords:
+        for keyword in self.system_keywords:
             if keyword in text:
                 score += 1
-        local_indicators = ['on computer', 'in computer', 'on pc', 'in pc', 
-                           'on system', 'in system', 'from system', 'on my computer', 'on this computer',
-                           'my pc', 'this pc', 'on laptop', 'in laptop',
-                           'computer me', 'pc me', 'system me', 'system se', 'mere computer',
-                           'meri pc', 'is computer']
-        for indicator in local_indicators:
+        for indicator in self.local_indicators:
             if indicator in text:
                 score += 10
         return score
@@ -151,24 +320,20 @@ class CommandClassifier:
         score = 0
         
         # Explicit search commands get high score
-        if text.strip().lower().startswith(('search ', 'google ', 'find ', 'lookup ', 'look up ')):
+        if text.strip().lower().startswith(self.search_prefixes):
             score += 10
         if re.search(r'\b(search|find|lookup|google)\s+(for|about|on)\s+', text):
             score += 8
         
         # Question words indicate information seeking
-        question_words = ['what', 'who', 'when', 'where', 'why', 'how',
-                         'kya', 'kaun', 'kab', 'kahan', 'kaise', 'kyun']
         has_question_word = False
-        for word in question_words:
+        for word in self.question_words:
             if word in text.split():
                 score += 1.5
                 has_question_word = True
         
         # Informational keywords
-        info_words = ['information', 'details', 'about', 'regarding',
-                     'jankari', 'bare mein', 'ke bare']
-        for word in info_words:
+        for word in self.info_words:
             if word in text:
                 score += 1
         
@@ -177,10 +342,7 @@ class CommandClassifier:
             score += 3
         
         # Explicit web indicators
-        web_indicators = ['google', 'search on internet', 'search online', 
-                         'internet pe', 'web pe', 'online search',
-                         'google karo', 'internet par']
-        for indicator in web_indicators:
+        for indicator in self.web_indicators:
             if indicator in text:
                 score += 5
         
@@ -189,16 +351,12 @@ class CommandClassifier:
             score -= 5
         
         # Conversational phrases should not be searches
-        conversation_indicators = ['thank', 'thanks', 'bye', 'hello', 'hi', 'sorry', 
-                                  'ok', 'okay', 'watching', 'listening']
-        for indicator in conversation_indicators:
+        for indicator in self.web_conversation_indicators:
             if indicator in text:
                 score -= 8
         
         # Local computer context negates web search
-        local_context = ['on computer', 'in computer', 'computer me', 'pc me', 
-                        'system me', 'from system', 'system se', 'on my pc', 'my computer']
-        for context in local_context:
+        for context in self.local_context:
             if context in text:
                 score -= 10
         
@@ -211,32 +369,22 @@ class CommandClassifier:
             score += 2
         
         # Strong conversation indicators - common phrases
-        strong_indicators = [
-            'thank you', 'thanks', 'thank', 'thankyou', 'thx',
-            'bye', 'goodbye', 'see you', 'take care',
-            'hello', 'hi', 'hey',
-            'sorry', 'apologies',
-            'ok', 'okay', 'alright', 'sure', 'got it',
-            'wow', 'cool', 'nice', 'great',
-        ]
-        for indicator in strong_indicators:
+        for indicator in self.strong_indicators:
             if indicator in text:
                 score += 5
         
         # "watching", "listening" without question words = conversation
-        if any(word in text for word in ['watching', 'listening', 'viewing']):
-            if not any(qword in text for qword in ['what', 'who', 'when', 'where', 'why', 'how']):
+        if any(word in text for word in self.viewing_words):
+            if not any(qword in text for qword in self.english_question_words):
                 score += 5
         
         # Pronouns addressing the assistant
-        pronouns = ['you', 'your', 'yourself', 'tum', 'tumhara', 'aap', 'aapka']
-        for pronoun in pronouns:
+        for pronoun in self.pronouns:
             if pronoun in text.split():
                 score += 2
         
         # Polite words boost
-        polite_words = ['please', 'kindly', 'kripa', 'meherbani']
-        for word in polite_words:
+        for word in self.polite_words:
             if word in text:
                 score += 1
         
@@ -307,5 +455,41 @@ def test_classifier():
         print(f"   Confidence: {confidence*100:.0f}%")
         print(f"   Reasoning: {reasoning}")
 
+def _scoring_corpus(classifier, size, seed=7):
+    rng = random.Random(seed)
+    vocabulary = sorted(classifier.keyword_weights)
+    vocabulary += [literal for _, _, literals in classifier.compiled_patterns for literal in (literals or ())]
+    vocabulary += ["the", "me", "for", "on", "in", "to", "python", "weather", "notes.txt", "youtube.com",
+                   "karo", "mein", "ke", "!", ".", "?", "Café", "naïve", "ſearch", "KELVIN"]
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 9))]
+        corpus.append(" ".join(words).lower().strip())
+    return corpus
+
+def test_compiled_scoring(samples=20000):
+    classifier = CommandClassifier()
+    corpus = _scoring_corpus(classifier, samples)
+    mismatches = [text for text in corpus if classifier._compiled_scores(text) != classifier._reference_scores(text)]
+    print("="*70)
+    print("COMPILED SCORING EQUIVALENCE AND THROUGHPUT")
+    print("="*70)
+    print(f"Equivalence: {len(corpus) - len(mismatches)}/{len(corpus)} identical")
+    for text in mismatches[:10]:
+        print(f"   ⚠ {text!r}: {classifier._reference_scores(text)} != {classifier._compiled_scores(text)}")
+    results = {}
+    for name, score in (("reference", classifier._reference_scores), ("compiled", classifier._compiled_scores)):
+        started = time.perf_counter()
+        for text in corpus:
+            score(text)
+        elapsed = time.perf_counter() - started
+        results[name] = elapsed
+        print(f"{name:<10} {len(corpus) / elapsed:>10.0f} texts/s  ({elapsed / len(corpus) * 1e6:.1f} µs/text)")
+    print(f"Speedup: {results['reference'] / results['compiled']:.1f}x")
+    return not mismatches
+
 if __name__ == "__main__":
-    test_classifier()
\ No newline at end of file
+    if "--benchmark" in sys.argv:
+        test_compiled_scoring()
+    else:
+        test_classifier()
\ No newline at end of file
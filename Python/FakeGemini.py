@@ -0,0 +1,105 @@
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeGeminiServer:
+    """Local stand-in for the Gemini generateContent endpoint.
+
+    Point a GeminiTransport at base_url to exercise the client without network
+    access or an API key. responder(prompt) returns the reply text; latency,
+    connect_latency (charged once per new connection, standing in for DNS, TCP and
+    TLS setup) and fail_first (number of 503 responses before succeeding, sent with
+    a Retry-After header when retry_after is set) simulate a slow or flaky API.
+    """
+
+    def __init__(self, responder=None, host="127.0.0.1", port=0, latency=0.0, connect_latency=0.0, fail_first=0,
+                 retry_after=None):
+        self.responder = responder or (lambda prompt: '{"action": "web_search", "query": "test"}')
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with fake._lock:
+                    fake.connections += 1
+                if fake.connect_latency:
+                    time.sleep(fake.connect_latency)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.requests += 1
+                    failing = fake.fail_first > 0
+                    if failing:
+                        fake.fail_first -= 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if failing:
+                    headers = {"Retry-After": str(fake.retry_after)} if fake.retry_after is not None else None
+                    self._send(503, {"error": {"code": 503, "message": "The model is overloaded."}}, headers)
+                    return
+                if not re.search(r"/models/[^/:]+:generateContent$", self.path.split("?")[0]):
+                    self._send(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+                    return
+                try:
+                    prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+                except (ValueError, KeyError, IndexError):
+                    self._send(400, {"error": {"code": 400, "message": "Invalid payload"}})
+                    return
+                with fake._lock:
+                    fake.prompts.append(prompt)
+                self._send(200, {"candidates": [{"content": {"parts": [{"text": fake.responder(prompt)}],
+                                                             "role": "model"}}]})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="FakeGemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
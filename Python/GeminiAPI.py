@@ -2,14 +2,16 @@
 import requests
 import json
 from config import GEMINI_API_KEY
+from ParseCache import parse_cache as shared_parse_cache
+from GeminiTransport import gemini_transport, TIMEOUT_ERRORS
+from PromptBuilder import prompt_builder as shared_prompt_builder
 
 class GeminiAssistant:
-    def __init__(self):
+    def __init__(self, parse_cache=None, transport=None, prompt_builder=None):
+        self.parse_cache = parse_cache if parse_cache is not None else shared_parse_cache
+        self.transport = transport if transport is not None else gemini_transport
+        self.prompt_builder = prompt_builder if prompt_builder is not None else shared_prompt_builder
         self.api_key = GEMINI_API_KEY
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.api_key}"
-        self.headers = {
-            "Content-Type": "application/json"
-        }
         import platform
         self.os_name = platform.system()
         self.default_browser = self._detect_default_browser()
@@ -23,7 +25,8 @@ class GeminiAssistant:
         elif os_name == "Windows":
             return "Edge/Chrome"
         return "Chrome"
-    def _preprocess_text(self, text):
+    @staticmethod
+    def _preprocess_text(text):
         import re
         cleaned = text
         original = text
@@ -53,287 +56,21 @@ class GeminiAssistant:
         cleaned = re.sub(r'^[,\s]+', '', cleaned)
         cleaned = cleaned.strip()
         return cleaned if len(cleaned) > 2 else text
-    def parse_command_to_json(self, text):
+    def parse_command_to_json(self, text, app_context=None):
         try:
             cleaned_text = self._preprocess_text(text)
             if cleaned_text != text:
                 print(f"📝 Cleaned: '{text}' → '{cleaned_text}'")
+            cached = self.parse_cache.get(cleaned_text, app_context)
+            if cached is not None:
+                print(f"⚡ Cached parse for '{cleaned_text}'")
+                return cached
             os_friendly = {
                 'Windows': 'Windows',
                 'Linux': 'Linux',
                 'Darwin': 'macOS'
             }.get(self.os_name, self.os_name)
-            prompt = f"""You are a Command Understanding AI for a cross-platform voice assistant.
-You must ONLY understand English, Hindi and Hinglish.
-
-Device Information:
-Operating System: {os_friendly}
-Browser: {self.default_browser}
-
-CRITICAL INSTRUCTIONS:
-🔥 IGNORE greetings and politeness - focus on the ACTION
-🔥 If there's BOTH a greeting AND a command, extract the COMMAND
-🔥 "Hello...open X" = open_app action, NOT conversation
-🔥 "Hi...search Y" = web_search action, NOT conversation
-
-Action Types:
-
-1️⃣ OPEN_APP - Launch local applications
-Examples:
-• "open chrome" → {{"action": "open_app", "app_name": "Chrome"}}
-• "Hello bot, open steam" → {{"action": "open_app", "app_name": "Steam"}}
-• "Good evening, launch calculator" → {{"action": "open_app", "app_name": "Calculator"}}
-
-🔄 SWITCH_APP - Switch control to another application
-Examples:
-• "switch to chrome" → {{"action": "switch_app", "app_name": "chrome"}}
-• "switch to vscode" → {{"action": "switch_app", "app_name": "vscode"}}
-• "go to browser" → {{"action": "switch_app", "app_name": "browser"}}
-• "switch to previous app" → {{"action": "switch_app", "app_name": "previous"}}
-• "switch back" → {{"action": "switch_app", "app_name": "back"}}
-
-🎮 APP_COMMAND - Execute commands within active application
-Examples:
-• "save file" → {{"action": "app_command", "command": "save"}}
-• "type hello world" → {{"action": "app_command", "command": "type", "params": {{"text": "hello world"}}}}
-• "copy this" → {{"action": "app_command", "command": "copy"}}
-• "paste" → {{"action": "app_command", "command": "paste"}}
-• "undo" → {{"action": "app_command", "command": "undo"}}
-• "press enter" → {{"action": "app_command", "command": "enter"}}
-• "new tab" → {{"action": "app_command", "command": "new tab"}}
-• "close tab" → {{"action": "app_command", "command": "close tab"}}
-• "bold" → {{"action": "app_command", "command": "bold"}}
-• "find" → {{"action": "app_command", "command": "find"}}
-• "scroll down" → {{"action": "app_command", "command": "scroll down"}}
-
-2️⃣ WEB_SEARCH - Search on Google (NOT when in app context)
-Examples:
-• "search Python" → {{"action": "web_search", "query": "python"}}
-• "Hello, search for weather" → {{"action": "web_search", "query": "weather"}}
-• "open browser and go to steam" → {{"action": "web_search", "query": "steam"}}
-• "search steam" → {{"action": "web_search", "query": "steam"}}
-
-🔥 IMPORTANT: If user is already in an application and says something generic, use app_command with type!
-• In VSCode + "hello world" → {{"action": "app_command", "command": "type", "params": {{"text": "hello world"}}}}
-• In Notepad + "my name is john" → {{"action": "app_command", "command": "type", "params": {{"text": "my name is john"}}}}
-
-3️⃣ OPEN_WEBSITE - Open a website directly
-Examples:
-• "go to youtube" → {{"action": "open_website", "url": "youtube.com"}}
-• "open google" → {{"action": "open_website", "url": "google.com"}}
-• "visit reddit" → {{"action": "open_website", "url": "reddit.com"}}
-
-4️⃣ PLATFORM_SEARCH - Search on ANY website
-Examples:
-• "search cats on youtube" → {{"action": "platform_search", "platform": "youtube", "query": "cats"}}
-• "open instagram and search for oman" → {{"action": "platform_search", "platform": "instagram", "query": "oman"}}
-• "go to chatgpt and write hello" → {{"action": "platform_search", "platform": "chatgpt", "query": "write hello"}}
-• "search on amazon for laptop" → {{"action": "platform_search", "platform": "amazon", "query": "laptop"}}
-
-5️⃣ PLAY_MEDIA - Play first result (auto-click and play)
-Examples:
-• "play latest song" → {{"action": "play_media", "query": "latest song", "platform": "youtube"}}
-• "play first song from playlist" → {{"action": "play_media", "query": "playlist", "platform": "youtube"}}
-• "go to youtube and play latest song" → {{"action": "play_media", "query": "latest song", "platform": "youtube"}}
-
-6️⃣ DOWNLOAD_APP - Download/Install applications
-🔥 CRITICAL: User can specify WHERE to download from!
-
-Source Options (in order of priority):
-A) EXPLICIT SOURCE SPECIFIED:
-• "download X from web" → {{"action": "download_app", "app_name": "X", "source": "web"}}
-• "download X from terminal" → {{"action": "download_app", "app_name": "X", "source": "terminal"}}
-• "install X from snap" → {{"action": "download_app", "app_name": "X", "source": "snap"}}
-• "install X from flatpak" → {{"action": "download_app", "app_name": "X", "source": "flatpak"}}
-• "download X from app store" → {{"action": "download_app", "app_name": "X", "source": "appstore"}}
-• "get X via snap store" → {{"action": "download_app", "app_name": "X", "source": "snap"}}
-• "install X via package manager" → {{"action": "download_app", "app_name": "X", "source": "terminal"}}
-
-B) NO SOURCE SPECIFIED (DEFAULT TO WEB):
-• "download steam" → {{"action": "download_app", "app_name": "steam", "source": "web"}}
-• "install chrome" → {{"action": "download_app", "app_name": "chrome", "source": "web"}}
-• "get discord" → {{"action": "download_app", "app_name": "discord", "source": "web"}}
-
-Source Keywords:
-• "web", "internet", "online", "website" → source: "web"
-• "terminal", "package manager", "apt", "dnf", "brew", "choco" → source: "terminal"
-• "snap", "snap store" → source: "snap"
-• "flatpak" → source: "flatpak"
-• "app store", "microsoft store", "mac app store", "gnome software" → source: "appstore"
-
-🔥 ALWAYS include "source" field in download_app actions!
-🔥 If user says "from [SOURCE]" or "via [SOURCE]", extract it!
-🔥 Default to "web" if no source is mentioned!
-
-7️⃣ DOWNLOAD_RESEARCH - Download research papers
-Examples:
-• "download research on machine learning" → {{"action": "download_research", "topic": "machine learning", "max_papers": 5}}
-• "download me all research of quantum computing" → {{"action": "download_research", "topic": "quantum computing", "max_papers": 5}}
-• "fetch research papers on AI" → {{"action": "download_research", "topic": "AI", "max_papers": 5}}
-
-8️⃣ LIST_APPS - Show installed apps
-Example: "list apps" → {{"action": "list_apps"}}
-
-9️⃣ BROWSER_CONTROL - Interactive browser commands
-
-📑 TAB MANAGEMENT:
-• "create new tab" or "open new tab" → {{"action": "browser_control", "command": "new_tab"}}
-• "new tab and open youtube" → {{"action": "browser_control", "command": "new_tab", "url": "youtube.com"}}
-• "switch to first tab" or "go to first tab" → {{"action": "browser_control", "command": "first_tab"}}
-• "switch to last tab" or "go to last tab" → {{"action": "browser_control", "command": "last_tab"}}
-• "go to next tab" or "next tab" → {{"action": "browser_control", "command": "next_tab"}}
-• "go to previous tab" or "previous tab" → {{"action": "browser_control", "command": "previous_tab"}}
-• "switch to tab 3" or "go to 3rd tab" → {{"action": "browser_control", "command": "switch_to_tab", "tab_index": 3}}
-• "close this tab" or "close current tab" → {{"action": "browser_control", "command": "close_tab"}}
-• "close other tabs" or "close all other tabs" → {{"action": "browser_control", "command": "close_other_tabs"}}
-• "list all tabs" or "show tabs" → {{"action": "browser_control", "command": "list_tabs"}}
-
-🪟 WINDOW MANAGEMENT:
-• "create new window" or "open new window" → {{"action": "browser_control", "command": "new_window"}}
-• "open incognito window" or "create private window" → {{"action": "browser_control", "command": "incognito_window"}}
-• "maximize window" → {{"action": "browser_control", "command": "maximize"}}
-• "minimize window" → {{"action": "browser_control", "command": "minimize"}}
-• "fullscreen" or "enter fullscreen" → {{"action": "browser_control", "command": "fullscreen"}}
-
-🧭 NAVIGATION:
-• "go back" or "back" → {{"action": "browser_control", "command": "go_back"}}
-• "go forward" or "forward" → {{"action": "browser_control", "command": "go_forward"}}
-• "refresh page" or "reload" → {{"action": "browser_control", "command": "refresh"}}
-• "what's the current url" → {{"action": "browser_control", "command": "get_url"}}
-• "what's the page title" → {{"action": "browser_control", "command": "get_title"}}
-
-🖱️ PAGE INTERACTION:
-• "what's on the page" or "show page content" → {{"action": "browser_control", "command": "show_page"}}
-• "click on the first link" → {{"action": "browser_control", "command": "click_first_link"}}
-• "click on YouTube" → {{"action": "browser_control", "command": "click_by_text", "text": "YouTube"}}
-• "there is a title called Stranger Things" → {{"action": "browser_control", "command": "click_by_text", "text": "Stranger Things"}}
-• "click on the 4th video" → {{"action": "browser_control", "command": "click_nth", "position": 4, "element_type": "video"}}
-• "scroll down" → {{"action": "browser_control", "command": "scroll_down"}}
-• "scroll up" → {{"action": "browser_control", "command": "scroll_up"}}
-• "close popup" → {{"action": "browser_control", "command": "close_popup"}}
-• "volume up" → {{"action": "browser_control", "command": "volume_up"}}
-• "volume down" → {{"action": "browser_control", "command": "volume_down"}}
-
-🔟 COMPLEX_COMMAND - Multi-step commands with AND/THEN
-Examples:
-• "open VS Code and create file tut1.cpp" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "vscode"}},
-  {{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}}
-]}}
-• "I want you to create a file tut1.cpp and open it in VS Code" → {{"action": "complex_command", "steps": [
-  {{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}}
-]}}
-• "create file tut1.cpp and open it in VS Code" → {{"action": "complex_command", "steps": [
-  {{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}}
-]}}
-• "open VS Code and make a file called tut1.cpp" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "vscode"}},
-  {{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}}
-]}}
-• "can you open VS Code and make a file called tut1.cpp" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "vscode"}},
-  {{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}}
-]}}
-• "open Chrome and search Python tutorials" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "chrome"}},
-  {{"action": "web_search", "query": "Python tutorials"}}
-]}}
-• "open firefox and search youtube" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "firefox"}},
-  {{"action": "web_search", "query": "youtube"}}
-]}}
-• "open browser and search for cats" → {{"action": "complex_command", "steps": [
-  {{"action": "open_app", "app_name": "chrome"}},
-  {{"action": "web_search", "query": "cats"}}
-]}}
-• "create folder projects and make file main.py" → {{"action": "complex_command", "steps": [
-  {{"action": "create_folder", "folder_path": "projects"}},
-  {{"action": "create_file", "file_path": "projects/main.py"}}
-]}}
-
-1️⃣1️⃣ CREATE_FILE - Create a new file (with folder creation if needed)
-Examples:
-• "create file tut1.cpp" → {{"action": "create_file", "file_path": "tut1.cpp"}}
-• "make a file called tut1.cpp" → {{"action": "create_file", "file_path": "tut1.cpp"}}
-• "create file named test.py" → {{"action": "create_file", "file_path": "test.py"}}
-• "make file test.py in folder scripts" → {{"action": "create_file", "file_path": "scripts/test.py", "create_folder_if_missing": true}}
-• "create document.txt" → {{"action": "create_file", "file_path": "document.txt"}}
-
-1️⃣2️⃣ CREATE_FOLDER - Create a new folder/directory
-Examples:
-• "create folder projects" → {{"action": "create_folder", "folder_path": "projects"}}
-• "make directory test" → {{"action": "create_folder", "folder_path": "test"}}
-
-1️⃣3️⃣ MOVE_FILE - Move file from one location to another
-Examples:
-• "move file.txt to folder backup" → {{"action": "move_file", "source": "file.txt", "destination": "backup/file.txt"}}
-• "move document.pdf from downloads to documents" → {{"action": "move_file", "source": "downloads/document.pdf", "destination": "documents/document.pdf"}}
-
-1️⃣4️⃣ COPY_FILE - Copy file from one location to another
-Examples:
-• "copy file.txt to folder backup" → {{"action": "copy_file", "source": "file.txt", "destination": "backup/file.txt"}}
-• "copy document.pdf to documents folder" → {{"action": "copy_file", "source": "document.pdf", "destination": "documents/document.pdf"}}
-
-🔟 CONVERSATION - ONLY if there's NO command at all
-Examples:
-• "hello" (nothing else) → {{"action": "conversation", "text": "hello"}}
-• "thank you" (nothing else) → {{"action": "conversation", "text": "thank you"}}
-• "how are you" (nothing else) → {{"action": "conversation", "text": "how are you"}}
-
-Rules:
-✨ Return ONLY valid JSON (no explanation, no markdown, no code blocks)
-✨ IGNORE greetings AND politeness phrases - focus on ACTION
-✨ "I want you to create file X" = create_file action (ignore "I want you to")
-✨ "I want you to open X and create file Y" = complex_command with steps
-✨ "create file X and open it in Y" = complex_command with steps
-✨ "create file X in Y" where Y is an app = complex_command
-✨ "open X and create file Y" = complex_command with steps
-✨ "open X and make a file called Y" = complex_command with steps (extract Y, not "called")
-✨ "open X and [action]" = complex_command for multi-step operations
-✨ "create file X" = create_file action (auto-create folder if missing)
-✨ "make a file called X" = create_file with file_path: "X" (NOT "called")
-✨ When user says "called X", "named X", or "titled X", extract X as the filename
-✨ If command contains "create file" or "make file" AND mentions an app, use complex_command
-✨ "create folder X" = create_folder action
-✨ "move file X to Y" = move_file action
-✨ "copy file X to Y" = copy_file action
-✨ "switch to X" or "go to X" (for apps) = switch_app action
-✨ "switch back" or "previous app" = switch_app with app_name: "previous"
-✨ Commands like "save", "copy", "paste", "undo" = app_command action
-✨ "type X" or "write X" = app_command with command: "type" and params
-✨ Generic text in app context = app_command with type
-✨ "go to [WEBSITE]" without "search" = open_website action (e.g., "go to youtube" → youtube.com)
-✨ "open [WEBSITE]" without "search" = open_website action (e.g., "open google" → google.com)
-✨ "visit [WEBSITE]" = open_website action
-✨ "click on [TEXT]" where TEXT is not a number = browser_control with click_by_text
-✨ "click on the [NUMBER]" = browser_control with click_nth
-✨ "scroll" in browser = browser_control action
-✨ "scroll" in app = app_command action
-✨ "volume up/down" = browser_control action
-✨ "new tab" or "create new tab" = browser_control with new_tab OR app_command (if not browser)
-✨ "first tab" or "last tab" = browser_control with first_tab/last_tab
-✨ "next tab" or "previous tab" = browser_control with next_tab/previous_tab
-✨ "tab X" or "Xth tab" = browser_control with switch_to_tab
-✨ "close tab" = browser_control with close_tab OR app_command
-✨ "new window" = browser_control with new_window
-✨ "incognito" or "private window" = browser_control with incognito_window
-✨ "go back" or "go forward" = browser_control with go_back/go_forward
-✨ "refresh" or "reload" = browser_control with refresh
-✨ "play X" or "play first" (without "on page") = play_media action
-✨ "play X on page" or "play video X" = browser_control with play_video
-✨ "download research on X" or "fetch research papers" = download_research action
-✨ 🔥 "download/install X from/via [SOURCE]" = download_app with source field (CRITICAL!)
-✨ "download X" or "install X" (for apps) = download_app action with source: "web" (default)
-✨ "open browser and search X" OR "open [BROWSER] and search X" = complex_command: open_app + web_search
-✨ Browsers (Chrome, Firefox, Edge, Safari, Brave, Opera) = open_app, NOT platform_search
-✨ "open/go to [WEBSITE] and search X" = platform_search (WEBSITE like youtube, instagram, etc.)
-✨ "search X on [WEBSITE]" = platform_search
-✨ Prefer action over conversation when unsure
-✨ 🔥 ALWAYS extract download source if mentioned: "from web", "from snap", "via terminal", etc.
-✨ 🔥 App control keywords: save, copy, paste, cut, undo, redo, find, close, bold, italic, etc.
-
-User Input: {cleaned_text}
-JSON Output:"""
+            prompt = self.prompt_builder.build(cleaned_text, os_friendly, self.default_browser, app_context)
 
             payload = {
                 "contents": [{
@@ -346,9 +83,10 @@ JSON Output:"""
                     "topP": 0.1,
                 }
             }
-            response = requests.post(self.api_url, headers=self.headers, data=json.dumps(payload), timeout=10)
+            response = self.transport.post(payload, read_timeout=10)
             if response.status_code == 200:
                 result = response.json()
+                self.prompt_builder.record_usage(result.get('usageMetadata', {}).get('promptTokenCount'))
                 if 'candidates' in result and len(result['candidates']) > 0:
                     candidate = result['candidates'][0]
                     if 'content' in candidate and 'parts' in candidate['content']:
@@ -358,15 +96,18 @@ JSON Output:"""
                             json_text = json_text.replace('```json', '').replace('```', '').strip()
                             try:
                                 parsed_json = json.loads(json_text)
+                                if isinstance(parsed_json, dict) and parsed_json.get('action'):
+                                    self.parse_cache.put(cleaned_text, parsed_json, app_context)
                                 return parsed_json
                             except json.JSONDecodeError:
                                 return self._fallback_parse(text)
             return self._fallback_parse(text)
         except Exception as e:
             return self._fallback_parse(text)
-    def _fallback_parse(self, text):
+    @staticmethod
+    def _fallback_parse(text):
         import re
-        cleaned = self._preprocess_text(text)
+        cleaned = GeminiAssistant._preprocess_text(text)
         text_lower = cleaned.lower().strip()
         match1 = re.search(r'(?:search|find|lookup)\s+(?:for\s+)?(.+?)\s+(?:on|in)\s+(\w+)', text_lower)
         if match1:
@@ -854,49 +595,55 @@ JSON Output:"""
         if len(text_lower.split()) == 1 and len(text_lower) > 2:
             return {"action": "open_app", "app_name": text_lower}
         return {"action": "web_search", "query": cleaned}
+    def _query_payload(self, prompt):
+        return {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "topK": 40,
+                "topP": 0.95,
+                "maxOutputTokens": 1024,
+            }
+        }
+    def _query_result(self, response):
+        if response.status_code == 200:
+            data = response.json()
+            if "candidates" in data and len(data["candidates"]) > 0:
+                candidate = data["candidates"][0]
+                if "content" in candidate and "parts" in candidate["content"]:
+                    parts = candidate["content"]["parts"]
+                    if len(parts) > 0 and "text" in parts[0]:
+                        return True, parts[0]["text"]
+            return False, "No response from Gemini"
+        else:
+            error_msg = f"API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                if "error" in error_data:
+                    error_msg = error_data["error"].get("message", error_msg)
+            except:
+                pass
+            return False, error_msg
     def query(self, prompt):
         try:
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 1024,
-                }
-            }
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if "candidates" in data and len(data["candidates"]) > 0:
-                    candidate = data["candidates"][0]
-                    if "content" in candidate and "parts" in candidate["content"]:
-                        parts = candidate["content"]["parts"]
-                        if len(parts) > 0 and "text" in parts[0]:
-                            return True, parts[0]["text"]
-                return False, "No response from Gemini"
-            else:
-                error_msg = f"API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    if "error" in error_data:
-                        error_msg = error_data["error"].get("message", error_msg)
-                except:
-                    pass
-                return False, error_msg
+            response = self.transport.post(self._query_payload(prompt), read_timeout=30)
+            return self._query_result(response)
         except requests.exceptions.Timeout:
             return False, "Request timeout - check internet connection"
         except Exception as e:
             return False, f"Error: {str(e)}"
+    async def aquery(self, prompt):
+        try:
+            response = await self.transport.apost(self._query_payload(prompt), read_timeout=30)
+            return self._query_result(response)
+        except TIMEOUT_ERRORS:
+            return False, "Request timeout - check internet connection"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
     def _regex_parse_command(self, text):
         import re
         removal_patterns = [
@@ -976,7 +723,7 @@ Output:"""
                     "topP": 0.1,
                 }
             }
-            response = requests.post(self.api_url, headers=self.headers, data=json.dumps(payload), timeout=10)
+            response = self.transport.post(payload, read_timeout=10)
             if response.status_code == 200:
                 result = response.json()
                 if 'candidates' in result and len(result['candidates']) > 0:
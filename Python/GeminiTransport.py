@@ -0,0 +1,269 @@
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from config import GEMINI_API_KEY
+except ImportError:
+    GEMINI_API_KEY = ""
+
+try:
+    from config import GEMINI_API_BASE, GEMINI_MODEL
+except ImportError:
+    GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+    GEMINI_MODEL = "gemini-2.5-flash"
+
+try:
+    from config import GEMINI_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT, GEMINI_RETRIES, GEMINI_RETRY_BACKOFF, GEMINI_POOL_SIZE
+except ImportError:
+    GEMINI_CONNECT_TIMEOUT = 3.05
+    GEMINI_READ_TIMEOUT = 10
+    GEMINI_RETRIES = 2
+    GEMINI_RETRY_BACKOFF = 0.25
+    GEMINI_POOL_SIZE = 8
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+TIMEOUT_ERRORS = (requests.exceptions.Timeout,) + ((httpx.TimeoutException,) if httpx is not None else ())
+
+def _retry_after(value):
+    """Seconds asked for by a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time()) if when is not None else None
+
+class GeminiTransport:
+    """Keep-alive HTTP transport for Gemini generateContent calls.
+
+    Blocking callers share one pooled requests.Session, so DNS, TCP and TLS setup
+    is paid once per connection rather than once per command. Async handlers use an
+    httpx.AsyncClient (or the pooled session on a worker thread when httpx is not
+    installed). Connection failures and 429/5xx responses are retried with jittered
+    exponential backoff, or after the server's Retry-After when it sends one; read
+    timeouts are not, since the request may have been served.
+    """
+
+    def __init__(self, api_key=GEMINI_API_KEY, base_url=GEMINI_API_BASE, model=GEMINI_MODEL,
+                 connect_timeout=GEMINI_CONNECT_TIMEOUT, read_timeout=GEMINI_READ_TIMEOUT,
+                 retries=GEMINI_RETRIES, backoff=GEMINI_RETRY_BACKOFF, pool_size=GEMINI_POOL_SIZE):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.last_latency = None
+        self._async_clients = {}
+        self._lock = threading.Lock()
+
+    def url(self, model=None):
+        return f"{self.base_url}/models/{model or self.model}:generateContent"
+
+    def _delay(self, attempt):
+        # Full jitter keeps concurrent retries from hammering the API in lockstep
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before retrying, or None when the call should not be retried."""
+        if attempt >= self.retries:
+            return None
+        if response is None:
+            return self._delay(attempt)
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        retry_after = _retry_after(response.headers.get("Retry-After"))
+        if retry_after is None:
+            return self._delay(attempt)
+        # Waiting longer than a whole read timeout is worse than reporting the error now
+        return retry_after if retry_after <= self.read_timeout else None
+
+    def _record(self, started, retries, failed):
+        elapsed = time.time() - started
+        with self._lock:
+            self.requests += 1
+            self.retried += retries
+            self.failures += 1 if failed else 0
+            self.total_seconds += elapsed
+            self.last_latency = elapsed
+
+    def post(self, payload, read_timeout=None, model=None):
+        """POSTs a generateContent payload and returns the requests.Response."""
+        body = json.dumps(payload)
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        started = time.time()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.url(model), headers=self.headers, data=body, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout):
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    self._record(started, attempt, True)
+                    raise
+            except requests.exceptions.RequestException:
+                self._record(started, attempt, True)
+                raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    self._record(started, attempt, response.status_code != 200)
+                    return response
+                # Hand the connection back to the pool before waiting
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _get_async_client(self):
+        # An AsyncClient only works on the loop that opened it, so each loop gets its own
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                # Clients of closed loops can no longer be closed; just forget them
+                for closed in [l for l in self._async_clients if l.is_closed()]:
+                    del self._async_clients[closed]
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    headers=self.headers,
+                    limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                )
+        return client
+
+    async def apost(self, payload, read_timeout=None, model=None):
+        """Async post(); the returned response has the same status_code/json() interface."""
+        if httpx is None:
+            return await asyncio.to_thread(self.post, payload, read_timeout, model)
+        client = self._get_async_client()
+        timeout = httpx.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+        started = time.time()
+        attempt = 0
+        while True:
+            try:
+                response = await client.post(self.url(model), content=json.dumps(payload), timeout=timeout)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError):
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    self._record(started, attempt, True)
+                    raise
+            except httpx.HTTPError:
+                self._record(started, attempt, True)
+                raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    self._record(started, attempt, response.status_code != 200)
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def warmup(self):
+        """Opens a pooled connection ahead of the first command."""
+        try:
+            self.session.head(self.base_url, timeout=(self.connect_timeout, self.read_timeout))
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Gemini connection warmup failed: {e}")
+            return False
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        """Closes the running loop's async client and the pooled session."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        self.close()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'base_url': self.base_url,
+                'model': self.model,
+                'requests': self.requests,
+                'retries': self.retried,
+                'failures': self.failures,
+                'avg_latency': round(self.total_seconds / self.requests, 3) if self.requests else None,
+                'last_latency': round(self.last_latency, 3) if self.last_latency is not None else None,
+                'async_backend': "httpx" if httpx is not None else "thread",
+                'timeouts': {'connect': self.connect_timeout, 'read': self.read_timeout},
+            }
+
+gemini_transport = GeminiTransport()
+
+
+def _time_calls(call, count):
+    started = time.time()
+    for _ in range(count):
+        call()
+    return (time.time() - started) / count
+
+def test_transport(count=20):
+    from FakeGemini import FakeGeminiServer
+    payload = {"contents": [{"parts": [{"text": "ping"}]}], "generationConfig": {"maxOutputTokens": 5}}
+    live = "--live" in sys.argv
+    server = None
+    if live:
+        transport = GeminiTransport()
+    else:
+        # Each new connection is charged 150 ms to stand in for DNS, TCP and TLS setup
+        server = FakeGeminiServer(connect_latency=0.15, fail_first=2).start()
+        transport = GeminiTransport(base_url=server.base_url, backoff=0.01)
+    print("="*70)
+    print(f"GEMINI TRANSPORT ({'live API' if live else 'local stand-in, 150 ms simulated connection setup'})")
+    print("="*70)
+    response = transport.post(payload)
+    print(f"First request: HTTP {response.status_code} after {transport.retried} retries")
+    bare_avg = _time_calls(lambda: requests.post(transport.url(), headers=transport.headers,
+                                                    data=json.dumps(payload), timeout=30), count)
+    pooled_avg = _time_calls(lambda: transport.post(payload, read_timeout=30), count)
+    print(f"Bare requests.post:  {bare_avg * 1000:8.1f} ms/request")
+    print(f"Pooled keep-alive:   {pooled_avg * 1000:8.1f} ms/request "
+          f"({(bare_avg - pooled_avg) * 1000:.1f} ms saved)")
+    async def run_async():
+        started = time.time()
+        responses = await asyncio.gather(*(transport.apost(payload) for _ in range(count)))
+        elapsed = time.time() - started
+        await transport.aclose()
+        return responses, elapsed
+    responses, elapsed = asyncio.run(run_async())
+    ok = sum(1 for response in responses if response.status_code == 200)
+    print(f"Async ({transport.get_stats()['async_backend']}): {ok}/{count} concurrent requests in {elapsed * 1000:.1f} ms")
+    if server is not None:
+        print(f"Stand-in served {server.requests} requests over {server.connections} connections")
+        server.stop()
+    print(transport.get_stats())
+
+if __name__ == "__main__":
+    test_transport()
@@ -0,0 +1,231 @@
+import re
+import sys
+import threading
+from collections import Counter
+
+try:
+    from config import LOCAL_INTENT_MIN_CONFIDENCE
+except ImportError:
+    LOCAL_INTENT_MIN_CONFIDENCE = 0.85
+
+WEB_PLATFORMS = {
+    'youtube', 'google', 'facebook', 'instagram', 'twitter', 'amazon', 'reddit', 'wikipedia', 'spotify',
+    'linkedin', 'github', 'chatgpt', 'netflix', 'pinterest', 'tiktok', 'whatsapp', 'telegram', 'ebay',
+    'stackoverflow', 'medium', 'quora', 'imdb', 'yelp', 'twitch', 'flipkart', 'gmail',
+}
+COMMON_APPS = {
+    'chrome', 'firefox', 'edge', 'safari', 'brave', 'opera', 'vscode', 'code', 'notepad', 'terminal',
+    'calculator', 'discord', 'steam', 'slack', 'spotify', 'files', 'settings', 'word', 'excel',
+}
+BROWSER_APPS = {'chrome', 'firefox', 'edge', 'safari', 'brave', 'opera', 'browser'}
+INSTALL_SOURCES = {
+    'terminal_install': 'terminal', 'snap_install': 'snap', 'flatpak_install': 'flatpak',
+    'appstore_install': 'appstore', 'web_download': 'web',
+}
+# Confidence of a _fallback_parse result for commands with a fixed target
+FIXED_COMMAND_CONFIDENCE = {
+    'list_apps': 0.95,
+    'switch_app': 0.9,
+    'play_media': 0.9,
+    'download_research': 0.9,
+    'create_file': 0.9,
+    'create_folder': 0.9,
+    'download_app': 0.85,
+    'complex_command': 0.6,
+}
+SEARCH_PREFIX = re.compile(r"^(?:search|google|find|look ?up)\b")
+GREETING = re.compile(r"^(?:hello|hi|hey|thank you|thanks|how are you|namaste|kaise ho)[\s.,!?]*$")
+EXPLICIT_SOURCE = re.compile(r"\b(?:via|through|by|using|from)\b")
+
+class LocalIntent:
+    def __init__(self, command, confidence, source):
+        self.command = command
+        self.confidence = confidence
+        self.source = source
+
+class LocalIntentEngine:
+    """Parses commands locally and says how sure it is.
+
+    Candidates come from the GeminiAssistant._fallback_parse rules and from the
+    anchored IntelligentBrowser.parse_command patterns (mapped to the assistant's JSON
+    schema). Each is scored by how tightly the utterance fits the rule that produced
+    it; results at or above min_confidence are dispatched without calling Gemini.
+    """
+
+    def __init__(self, fallback_parser=None, min_confidence=LOCAL_INTENT_MIN_CONFIDENCE):
+        self.fallback_parser = fallback_parser
+        self.min_confidence = min_confidence
+        self.commands = 0
+        self.local = 0
+        self.local_actions = Counter()
+        self.remote_actions = Counter()
+        self._lock = threading.Lock()
+
+    def _browser_intent(self, text):
+        from Browser.IntelligentBrowser import EnhancedIntelligentBrowser
+        parsed = EnhancedIntelligentBrowser.parse_command(text)
+        action = parsed.get('action')
+        if action in ('create_file', 'create_folder'):
+            key = 'file_path' if action == 'create_file' else 'folder_path'
+            command = {"action": action, key: parsed['target']}
+            if action == 'create_file':
+                command.update({"create_folder_if_missing": True, "open_in_app": None})
+            return command, 0.9
+        if action in INSTALL_SOURCES:
+            explicit = action != 'web_download' or EXPLICIT_SOURCE.search(text) or text.startswith(('download', 'install'))
+            return {"action": "download_app", "app_name": parsed['item'], "source": INSTALL_SOURCES[action]}, \
+                0.9 if explicit else 0.6
+        if action == 'platform_search':
+            return {"action": "platform_search", "platform": parsed['platform'], "query": parsed['query']}, \
+                0.9 if parsed['platform'] in WEB_PLATFORMS else 0.6
+        if action == 'open_app':
+            return {"action": "open_app", "app_name": parsed['app']}, 0.75
+        if action == 'search_google':
+            return {"action": "web_search", "query": parsed['query']}, 0.9 if SEARCH_PREFIX.match(text) else 0.7
+        if action == 'open_website':
+            return {"action": "open_website", "url": parsed['url']}, 0.9
+        if action == 'list_apps':
+            return {"action": "list_apps"}, 0.95
+        return None, 0.0
+
+    def _known_app(self, app_name, known_apps):
+        if not app_name:
+            return False
+        app_name = app_name.lower()
+        return app_name in COMMON_APPS or (known_apps is not None and app_name in known_apps)
+
+    def _fallback_intent(self, parser, text, cleaned, context, known_apps):
+        command = parser._fallback_parse(text)
+        action = command.get('action')
+        words = cleaned.split()
+        if action in FIXED_COMMAND_CONFIDENCE:
+            confidence = FIXED_COMMAND_CONFIDENCE[action]
+        elif action == 'browser_control':
+            sub_command = command.get('command', '')
+            if sub_command in ('click_by_text', 'click_first_link'):
+                confidence = 0.6
+            else:
+                confidence = 0.95 if len(words) <= 4 else 0.7
+            if context and context not in BROWSER_APPS:
+                confidence -= 0.2
+        elif action == 'app_command':
+            sub_command = command.get('command', '')
+            if sub_command == 'type':
+                confidence = 0.9
+            elif len(words) <= 2:
+                # A bare "save" or "copy" only means something for the focused app
+                confidence = 0.95 if self._known_app(context, known_apps) else 0.6
+            else:
+                confidence = 0.5
+        elif action == 'open_app':
+            app_name = command.get('app_name', '').lower()
+            confidence = 0.95 if self._known_app(app_name, known_apps) and ' and ' not in app_name else 0.6
+        elif action == 'open_website':
+            url = command.get('url', '')
+            confidence = 0.9 if url.split('.')[0] in WEB_PLATFORMS or '.' in url[:-4] else 0.5
+        elif action == 'platform_search':
+            confidence = 0.9 if command.get('platform') in WEB_PLATFORMS else 0.6
+        elif action == 'web_search':
+            confidence = 0.9 if SEARCH_PREFIX.match(cleaned) else 0.3
+        elif action == 'conversation':
+            confidence = 0.95 if GREETING.match(cleaned) else 0.4
+        else:
+            confidence = 0.5
+        if len(words) > 8:
+            confidence -= 0.2
+        return command, confidence
+
+    def parse(self, text, context=None, known_apps=None, parser=None):
+        """Best local parse of `text` as a LocalIntent, or None if no rule produced one."""
+        if parser is None:
+            if self.fallback_parser is None:
+                from GeminiAPI import GeminiAssistant
+                # The rule parser is static, so no assistant has to be built
+                self.fallback_parser = GeminiAssistant
+            parser = self.fallback_parser
+        cleaned = parser._preprocess_text(text).lower().strip()
+        candidates = []
+        try:
+            command, confidence = self._fallback_intent(parser, text, cleaned, context, known_apps)
+            candidates.append(LocalIntent(command, confidence, "fallback_rules"))
+        except Exception as e:
+            print(f"⚠ Local fallback rules failed: {e}")
+        try:
+            command, confidence = self._browser_intent(cleaned)
+            if command is not None:
+                candidates.append(LocalIntent(command, confidence, "browser_rules"))
+        except Exception:
+            pass
+        if not candidates:
+            return None
+        candidates.sort(key=lambda c: c.confidence, reverse=True)
+        best = candidates[0]
+        if len(candidates) > 1:
+            other = candidates[1]
+            if other.command.get('action') == best.command.get('action'):
+                best.confidence += 0.05
+            elif other.confidence >= self.min_confidence:
+                # Two confident rules disagree: let Gemini decide
+                best.confidence -= 0.1
+        best.confidence = round(min(max(best.confidence, 0.0), 0.99), 2)
+        return best
+
+    def is_confident(self, intent):
+        return intent is not None and intent.confidence >= self.min_confidence
+
+    def record(self, handled_locally, action):
+        with self._lock:
+            self.commands += 1
+            if handled_locally:
+                self.local += 1
+                self.local_actions[action] += 1
+            else:
+                self.remote_actions[action] += 1
+
+    def get_report(self):
+        with self._lock:
+            return {
+                'commands': self.commands,
+                'handled_locally': self.local,
+                'local_fraction': round(self.local / self.commands, 3) if self.commands else None,
+                'min_confidence': self.min_confidence,
+                'local_actions': dict(self.local_actions),
+                'remote_actions': dict(self.remote_actions),
+            }
+
+local_intents = LocalIntentEngine()
+
+
+SAMPLE_COMMANDS = [
+    "open chrome", "scroll down", "new tab", "close tab", "go back", "volume up", "list apps",
+    "search for python tutorials", "search cats on youtube", "play lofi music", "hello",
+    "create file notes.txt", "download vlc via snap", "switch back", "save", "copy",
+    "open chrome and search for weather", "what should I cook for dinner tonight",
+    "remind me what I was doing yesterday", "tell me a joke", "open my project",
+]
+
+def test_intent_engine():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r") as f:
+            commands = [line.strip() for line in f if line.strip()]
+    else:
+        commands = SAMPLE_COMMANDS
+    engine = LocalIntentEngine()
+    print("="*90)
+    print(f"LOCAL INTENT FAST PATH ({len(commands)} commands, threshold {engine.min_confidence})")
+    print("="*90)
+    for text in commands:
+        intent = engine.parse(text)
+        handled = engine.is_confident(intent)
+        action = intent.command.get('action') if intent else None
+        engine.record(handled, action)
+        source = intent.source if intent else "-"
+        confidence = intent.confidence if intent else 0.0
+        print(f"{'local ' if handled else 'gemini'} {confidence:>5.2f}  {source:<15}{str(action):<18}{text}")
+    report = engine.get_report()
+    print("="*90)
+    print(f"Handled locally: {report['handled_locally']}/{report['commands']} ({report['local_fraction']:.0%})")
+    print(f"By action: {report['local_actions']}")
+
+if __name__ == "__main__":
+    test_intent_engine()
@@ -0,0 +1,147 @@
+import atexit
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from config import PARSE_CACHE_FILE, PARSE_CACHE_SIZE, PARSE_CACHE_TTL
+except ImportError:
+    PARSE_CACHE_FILE = os.path.join(str(Path.home()), ".either_assistant", "parse_cache.json")
+    PARSE_CACHE_SIZE = 500
+    PARSE_CACHE_TTL = 7 * 24 * 3600
+
+SAVE_INTERVAL = 5.0
+
+def normalize_command(text):
+    text = re.sub(r"[^\w\s'.]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip(" .")
+
+class ParseCache:
+    """LRU + TTL cache of parsed command JSON, keyed by normalized text and app context.
+
+    Entries are persisted as JSON so repeat commands resolve without a network call
+    across restarts and while offline.
+    """
+
+    def __init__(self, path=PARSE_CACHE_FILE, max_entries=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL):
+        self.path = os.path.expanduser(path) if path else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.dirty = False
+        self.last_save = 0.0
+        self._lock = threading.Lock()
+        self._load()
+        atexit.register(self.save)
+
+    @staticmethod
+    def make_key(text, context=None):
+        return f"{(context or '').lower()}|{normalize_command(text)}"
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in sorted(stored.items(), key=lambda item: item[1].get('last_used', 0)):
+            if not self.ttl or now - entry.get('timestamp', 0) <= self.ttl:
+                self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, text, context=None):
+        key = self.make_key(text, context)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.time() - entry['timestamp'] > self.ttl:
+                del self.entries[key]
+                self.expired += 1
+                self.dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            entry['last_used'] = time.time()
+            entry['hits'] = entry.get('hits', 0) + 1
+            self.hits += 1
+            return copy.deepcopy(entry['result'])
+
+    def put(self, text, result, context=None):
+        key = self.make_key(text, context)
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {'result': copy.deepcopy(result), 'timestamp': now, 'last_used': now, 'hits': 0}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.dirty = True
+            due = now - self.last_save >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def invalidate(self, text=None, context=None):
+        """Drops one entry, every entry for a context, or (with no arguments) everything."""
+        with self._lock:
+            if text is not None:
+                keys = [self.make_key(text, context)]
+            elif context is not None:
+                prefix = f"{context.lower()}|"
+                keys = [key for key in self.entries if key.startswith(prefix)]
+            else:
+                keys = list(self.entries)
+            removed = sum(1 for key in keys if self.entries.pop(key, None) is not None)
+            self.dirty = self.dirty or removed > 0
+        self.save()
+        return removed
+
+    def save(self):
+        if not self.path:
+            return False
+        with self._lock:
+            if not self.dirty:
+                return True
+            snapshot = dict(self.entries)
+            self.dirty = False
+            self.last_save = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError) as e:
+            print(f"⚠ Could not save parse cache: {e}")
+            return False
+        return True
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'path': self.path,
+            }
+
+parse_cache = ParseCache()
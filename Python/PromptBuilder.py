@@ -0,0 +1,366 @@
+import math
+import re
+import sys
+import threading
+from collections import Counter
+
+try:
+    from config import PROMPT_TOKEN_BUDGET, PROMPT_MAX_EXAMPLES, PROMPT_MAX_RULES
+except ImportError:
+    PROMPT_TOKEN_BUDGET = 1400
+    PROMPT_MAX_EXAMPLES = 8
+    PROMPT_MAX_RULES = 6
+
+MAX_EXAMPLES_PER_ACTION = 3
+MIN_SIMILARITY = 0.1
+
+CORE_PROMPT = """You are a Command Understanding AI for a cross-platform voice assistant.
+You must ONLY understand English, Hindi and Hinglish.
+
+Device Information:
+Operating System: {os_name}
+Browser: {browser}{context_line}
+
+CRITICAL INSTRUCTIONS:
+🔥 IGNORE greetings and politeness - focus on the ACTION
+🔥 If there's BOTH a greeting AND a command, extract the COMMAND
+🔥 "Hello...open X" = open_app action, NOT conversation
+🔥 "Hi...search Y" = web_search action, NOT conversation
+
+Action Types (JSON fields):
+• open_app: app_name - launch a local application
+• switch_app: app_name - switch to another application ("previous" for the last one)
+• app_command: command, params - command inside the active application (save, type, copy, undo...)
+• web_search: query - search on Google (NOT when in app context)
+• open_website: url - open a website directly
+• platform_search: platform, query - search on ANY website (youtube, amazon, instagram...)
+• play_media: query, platform - play the first result
+• download_app: app_name, source - download/install an application
+• download_research: topic, max_papers - download research papers
+• list_apps - show installed apps
+• browser_control: command - new_tab, first_tab, last_tab, next_tab, previous_tab, switch_to_tab (tab_index), close_tab, close_other_tabs, list_tabs, new_window, incognito_window, maximize, minimize, fullscreen, go_back, go_forward, refresh, get_url, get_title, show_page, click_first_link, click_by_text (text), click_nth (position, element_type), scroll_down, scroll_up, close_popup, volume_up, volume_down, play_video
+• complex_command: steps - list of actions for multi-step commands with AND/THEN
+• create_file: file_path, create_folder_if_missing, open_in_app - create a new file
+• create_folder: folder_path - create a new folder/directory
+• move_file / copy_file: source, destination
+• conversation: text - ONLY if there's NO command at all
+
+Download sources (ALWAYS include "source" in download_app, default "web"):
+• "web", "internet", "online", "website" → "web"
+• "terminal", "package manager", "apt", "dnf", "brew", "choco" → "terminal"
+• "snap", "snap store" → "snap"
+• "flatpak" → "flatpak"
+• "app store", "microsoft store", "mac app store", "gnome software" → "appstore"
+
+Rules:
+✨ Return ONLY valid JSON (no explanation, no markdown, no code blocks)
+✨ IGNORE greetings AND politeness phrases - focus on ACTION
+✨ Generic text in app context = app_command with type
+✨ Prefer action over conversation when unsure
+✨ 🔥 ALWAYS extract download source if mentioned: "from web", "from snap", "via terminal", etc.
+✨ 🔥 App control keywords: save, copy, paste, cut, undo, redo, find, close, bold, italic, etc.
+"""
+
+# (action, input, output) pairs from the original parsing prompt; indexed by input text
+EXAMPLES = [
+    ('open_app', '"open chrome"', '{"action": "open_app", "app_name": "Chrome"}'),
+    ('open_app', '"Hello bot, open steam"', '{"action": "open_app", "app_name": "Steam"}'),
+    ('open_app', '"Good evening, launch calculator"', '{"action": "open_app", "app_name": "Calculator"}'),
+    ('switch_app', '"switch to chrome"', '{"action": "switch_app", "app_name": "chrome"}'),
+    ('switch_app', '"switch to vscode"', '{"action": "switch_app", "app_name": "vscode"}'),
+    ('switch_app', '"go to browser"', '{"action": "switch_app", "app_name": "browser"}'),
+    ('switch_app', '"switch to previous app"', '{"action": "switch_app", "app_name": "previous"}'),
+    ('switch_app', '"switch back"', '{"action": "switch_app", "app_name": "back"}'),
+    ('app_command', '"save file"', '{"action": "app_command", "command": "save"}'),
+    ('app_command', '"type hello world"', '{"action": "app_command", "command": "type", "params": {"text": "hello world"}}'),
+    ('app_command', '"copy this"', '{"action": "app_command", "command": "copy"}'),
+    ('app_command', '"paste"', '{"action": "app_command", "command": "paste"}'),
+    ('app_command', '"undo"', '{"action": "app_command", "command": "undo"}'),
+    ('app_command', '"press enter"', '{"action": "app_command", "command": "enter"}'),
+    ('app_command', '"new tab"', '{"action": "app_command", "command": "new tab"}'),
+    ('app_command', '"close tab"', '{"action": "app_command", "command": "close tab"}'),
+    ('app_command', '"bold"', '{"action": "app_command", "command": "bold"}'),
+    ('app_command', '"find"', '{"action": "app_command", "command": "find"}'),
+    ('app_command', '"scroll down"', '{"action": "app_command", "command": "scroll down"}'),
+    ('web_search', '"search Python"', '{"action": "web_search", "query": "python"}'),
+    ('web_search', '"Hello, search for weather"', '{"action": "web_search", "query": "weather"}'),
+    ('web_search', '"open browser and go to steam"', '{"action": "web_search", "query": "steam"}'),
+    ('web_search', '"search steam"', '{"action": "web_search", "query": "steam"}'),
+    ('open_website', '"go to youtube"', '{"action": "open_website", "url": "youtube.com"}'),
+    ('open_website', '"open google"', '{"action": "open_website", "url": "google.com"}'),
+    ('open_website', '"visit reddit"', '{"action": "open_website", "url": "reddit.com"}'),
+    ('platform_search', '"search cats on youtube"', '{"action": "platform_search", "platform": "youtube", "query": "cats"}'),
+    ('platform_search', '"open instagram and search for oman"', '{"action": "platform_search", "platform": "instagram", "query": "oman"}'),
+    ('platform_search', '"go to chatgpt and write hello"', '{"action": "platform_search", "platform": "chatgpt", "query": "write hello"}'),
+    ('platform_search', '"search on amazon for laptop"', '{"action": "platform_search", "platform": "amazon", "query": "laptop"}'),
+    ('play_media', '"play latest song"', '{"action": "play_media", "query": "latest song", "platform": "youtube"}'),
+    ('play_media', '"play first song from playlist"', '{"action": "play_media", "query": "playlist", "platform": "youtube"}'),
+    ('play_media', '"go to youtube and play latest song"', '{"action": "play_media", "query": "latest song", "platform": "youtube"}'),
+    ('download_app', '"download X from web"', '{"action": "download_app", "app_name": "X", "source": "web"}'),
+    ('download_app', '"download X from terminal"', '{"action": "download_app", "app_name": "X", "source": "terminal"}'),
+    ('download_app', '"install X from snap"', '{"action": "download_app", "app_name": "X", "source": "snap"}'),
+    ('download_app', '"install X from flatpak"', '{"action": "download_app", "app_name": "X", "source": "flatpak"}'),
+    ('download_app', '"download X from app store"', '{"action": "download_app", "app_name": "X", "source": "appstore"}'),
+    ('download_app', '"get X via snap store"', '{"action": "download_app", "app_name": "X", "source": "snap"}'),
+    ('download_app', '"install X via package manager"', '{"action": "download_app", "app_name": "X", "source": "terminal"}'),
+    ('download_app', '"download steam"', '{"action": "download_app", "app_name": "steam", "source": "web"}'),
+    ('download_app', '"install chrome"', '{"action": "download_app", "app_name": "chrome", "source": "web"}'),
+    ('download_app', '"get discord"', '{"action": "download_app", "app_name": "discord", "source": "web"}'),
+    ('download_research', '"download research on machine learning"', '{"action": "download_research", "topic": "machine learning", "max_papers": 5}'),
+    ('download_research', '"download me all research of quantum computing"', '{"action": "download_research", "topic": "quantum computing", "max_papers": 5}'),
+    ('download_research', '"fetch research papers on AI"', '{"action": "download_research", "topic": "AI", "max_papers": 5}'),
+    ('browser_control', '"create new tab" or "open new tab"', '{"action": "browser_control", "command": "new_tab"}'),
+    ('browser_control', '"new tab and open youtube"', '{"action": "browser_control", "command": "new_tab", "url": "youtube.com"}'),
+    ('browser_control', '"switch to first tab" or "go to first tab"', '{"action": "browser_control", "command": "first_tab"}'),
+    ('browser_control', '"switch to last tab" or "go to last tab"', '{"action": "browser_control", "command": "last_tab"}'),
+    ('browser_control', '"go to next tab" or "next tab"', '{"action": "browser_control", "command": "next_tab"}'),
+    ('browser_control', '"go to previous tab" or "previous tab"', '{"action": "browser_control", "command": "previous_tab"}'),
+    ('browser_control', '"switch to tab 3" or "go to 3rd tab"', '{"action": "browser_control", "command": "switch_to_tab", "tab_index": 3}'),
+    ('browser_control', '"close this tab" or "close current tab"', '{"action": "browser_control", "command": "close_tab"}'),
+    ('browser_control', '"close other tabs" or "close all other tabs"', '{"action": "browser_control", "command": "close_other_tabs"}'),
+    ('browser_control', '"list all tabs" or "show tabs"', '{"action": "browser_control", "command": "list_tabs"}'),
+    ('browser_control', '"create new window" or "open new window"', '{"action": "browser_control", "command": "new_window"}'),
+    ('browser_control', '"open incognito window" or "create private window"', '{"action": "browser_control", "command": "incognito_window"}'),
+    ('browser_control', '"maximize window"', '{"action": "browser_control", "command": "maximize"}'),
+    ('browser_control', '"minimize window"', '{"action": "browser_control", "command": "minimize"}'),
+    ('browser_control', '"fullscreen" or "enter fullscreen"', '{"action": "browser_control", "command": "fullscreen"}'),
+    ('browser_control', '"go back" or "back"', '{"action": "browser_control", "command": "go_back"}'),
+    ('browser_control', '"go forward" or "forward"', '{"action": "browser_control", "command": "go_forward"}'),
+    ('browser_control', '"refresh page" or "reload"', '{"action": "browser_control", "command": "refresh"}'),
+    ('browser_control', '"what\'s the current url"', '{"action": "browser_control", "command": "get_url"}'),
+    ('browser_control', '"what\'s the page title"', '{"action": "browser_control", "command": "get_title"}'),
+    ('browser_control', '"what\'s on the page" or "show page content"', '{"action": "browser_control", "command": "show_page"}'),
+    ('browser_control', '"click on the first link"', '{"action": "browser_control", "command": "click_first_link"}'),
+    ('browser_control', '"click on YouTube"', '{"action": "browser_control", "command": "click_by_text", "text": "YouTube"}'),
+    ('browser_control', '"there is a title called Stranger Things"', '{"action": "browser_control", "command": "click_by_text", "text": "Stranger Things"}'),
+    ('browser_control', '"click on the 4th video"', '{"action": "browser_control", "command": "click_nth", "position": 4, "element_type": "video"}'),
+    ('browser_control', '"scroll down"', '{"action": "browser_control", "command": "scroll_down"}'),
+    ('browser_control', '"scroll up"', '{"action": "browser_control", "command": "scroll_up"}'),
+    ('browser_control', '"close popup"', '{"action": "browser_control", "command": "close_popup"}'),
+    ('browser_control', '"volume up"', '{"action": "browser_control", "command": "volume_up"}'),
+    ('browser_control', '"volume down"', '{"action": "browser_control", "command": "volume_down"}'),
+    ('complex_command', '"open VS Code and create file tut1.cpp"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "vscode"}, {"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}]}'),
+    ('complex_command', '"I want you to create a file tut1.cpp and open it in VS Code"', '{"action": "complex_command", "steps": [{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}]}'),
+    ('complex_command', '"create file tut1.cpp and open it in VS Code"', '{"action": "complex_command", "steps": [{"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}]}'),
+    ('complex_command', '"open VS Code and make a file called tut1.cpp"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "vscode"}, {"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}]}'),
+    ('complex_command', '"can you open VS Code and make a file called tut1.cpp"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "vscode"}, {"action": "create_file", "file_path": "tut1.cpp", "open_in_app": "vscode"}]}'),
+    ('complex_command', '"open Chrome and search Python tutorials"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "chrome"}, {"action": "web_search", "query": "Python tutorials"}]}'),
+    ('complex_command', '"open firefox and search youtube"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "firefox"}, {"action": "web_search", "query": "youtube"}]}'),
+    ('complex_command', '"open browser and search for cats"', '{"action": "complex_command", "steps": [{"action": "open_app", "app_name": "chrome"}, {"action": "web_search", "query": "cats"}]}'),
+    ('complex_command', '"create folder projects and make file main.py"', '{"action": "complex_command", "steps": [{"action": "create_folder", "folder_path": "projects"}, {"action": "create_file", "file_path": "projects/main.py"}]}'),
+    ('create_file', '"create file tut1.cpp"', '{"action": "create_file", "file_path": "tut1.cpp"}'),
+    ('create_file', '"make a file called tut1.cpp"', '{"action": "create_file", "file_path": "tut1.cpp"}'),
+    ('create_file', '"create file named test.py"', '{"action": "create_file", "file_path": "test.py"}'),
+    ('create_file', '"make file test.py in folder scripts"', '{"action": "create_file", "file_path": "scripts/test.py", "create_folder_if_missing": true}'),
+    ('create_file', '"create document.txt"', '{"action": "create_file", "file_path": "document.txt"}'),
+    ('create_folder', '"create folder projects"', '{"action": "create_folder", "folder_path": "projects"}'),
+    ('create_folder', '"make directory test"', '{"action": "create_folder", "folder_path": "test"}'),
+    ('move_file', '"move file.txt to folder backup"', '{"action": "move_file", "source": "file.txt", "destination": "backup/file.txt"}'),
+    ('move_file', '"move document.pdf from downloads to documents"', '{"action": "move_file", "source": "downloads/document.pdf", "destination": "documents/document.pdf"}'),
+    ('copy_file', '"copy file.txt to folder backup"', '{"action": "copy_file", "source": "file.txt", "destination": "backup/file.txt"}'),
+    ('copy_file', '"copy document.pdf to documents folder"', '{"action": "copy_file", "source": "document.pdf", "destination": "documents/document.pdf"}'),
+    ('conversation', '"hello" (nothing else)', '{"action": "conversation", "text": "hello"}'),
+    ('conversation', '"thank you" (nothing else)', '{"action": "conversation", "text": "thank you"}'),
+    ('conversation', '"how are you" (nothing else)', '{"action": "conversation", "text": "how are you"}'),
+]
+# Only offered when the user is inside an application
+CONTEXT_EXAMPLES = [
+    ('app_command', 'In VSCode + "hello world"', '{"action": "app_command", "command": "type", "params": {"text": "hello world"}}'),
+    ('app_command', 'In Notepad + "my name is john"', '{"action": "app_command", "command": "type", "params": {"text": "my name is john"}}'),
+]
+RULES = [
+    '"I want you to create file X" = create_file action (ignore "I want you to")',
+    '"I want you to open X and create file Y" = complex_command with steps',
+    '"create file X and open it in Y" = complex_command with steps',
+    '"create file X in Y" where Y is an app = complex_command',
+    '"open X and create file Y" = complex_command with steps',
+    '"open X and make a file called Y" = complex_command with steps (extract Y, not "called")',
+    '"open X and [action]" = complex_command for multi-step operations',
+    '"create file X" = create_file action (auto-create folder if missing)',
+    '"make a file called X" = create_file with file_path: "X" (NOT "called")',
+    'When user says "called X", "named X", or "titled X", extract X as the filename',
+    'If command contains "create file" or "make file" AND mentions an app, use complex_command',
+    '"create folder X" = create_folder action',
+    '"move file X to Y" = move_file action',
+    '"copy file X to Y" = copy_file action',
+    '"switch to X" or "go to X" (for apps) = switch_app action',
+    '"switch back" or "previous app" = switch_app with app_name: "previous"',
+    'Commands like "save", "copy", "paste", "undo" = app_command action',
+    '"type X" or "write X" = app_command with command: "type" and params',
+    '"go to [WEBSITE]" without "search" = open_website action (e.g., "go to youtube" → youtube.com)',
+    '"open [WEBSITE]" without "search" = open_website action (e.g., "open google" → google.com)',
+    '"visit [WEBSITE]" = open_website action',
+    '"click on [TEXT]" where TEXT is not a number = browser_control with click_by_text',
+    '"click on the [NUMBER]" = browser_control with click_nth',
+    '"scroll" in browser = browser_control action',
+    '"scroll" in app = app_command action',
+    '"volume up/down" = browser_control action',
+    '"new tab" or "create new tab" = browser_control with new_tab OR app_command (if not browser)',
+    '"first tab" or "last tab" = browser_control with first_tab/last_tab',
+    '"next tab" or "previous tab" = browser_control with next_tab/previous_tab',
+    '"tab X" or "Xth tab" = browser_control with switch_to_tab',
+    '"close tab" = browser_control with close_tab OR app_command',
+    '"new window" = browser_control with new_window',
+    '"incognito" or "private window" = browser_control with incognito_window',
+    '"go back" or "go forward" = browser_control with go_back/go_forward',
+    '"refresh" or "reload" = browser_control with refresh',
+    '"play X" or "play first" (without "on page") = play_media action',
+    '"play X on page" or "play video X" = browser_control with play_video',
+    '"download research on X" or "fetch research papers" = download_research action',
+    '🔥 "download/install X from/via [SOURCE]" = download_app with source field (CRITICAL!)',
+    '"download X" or "install X" (for apps) = download_app action with source: "web" (default)',
+    '"open browser and search X" OR "open [BROWSER] and search X" = complex_command: open_app + web_search',
+    'Browsers (Chrome, Firefox, Edge, Safari, Brave, Opera) = open_app, NOT platform_search',
+    '"open/go to [WEBSITE] and search X" = platform_search (WEBSITE like youtube, instagram, etc.)',
+    '"search X on [WEBSITE]" = platform_search',
+]
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token)."""
+    return max(1, round(len(text) / 4))
+
+def _features(text):
+    words = re.findall(r"[a-z0-9.']+", text.lower())
+    features = Counter(f"w:{word}" for word in words)
+    for word in words:
+        padded = f" {word} "
+        features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+class SimilarityIndex:
+    """TF-IDF cosine index over word and character-trigram features."""
+
+    def __init__(self, documents):
+        counts = [_features(document) for document in documents]
+        document_frequency = Counter(feature for features in counts for feature in features)
+        total = len(documents)
+        self.idf = {feature: math.log((1 + total) / (1 + df)) + 1 for feature, df in document_frequency.items()}
+        self.postings = {}
+        for doc_id, features in enumerate(counts):
+            vector = {feature: count * self.idf[feature] for feature, count in features.items()}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            for feature, weight in vector.items():
+                self.postings.setdefault(feature, []).append((doc_id, weight / norm))
+
+    def query(self, text):
+        """Returns (score, doc_id) pairs with a positive cosine similarity, best first."""
+        vector = {feature: count * self.idf[feature] for feature, count in _features(text).items() if feature in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return []
+        scores = {}
+        for feature, weight in vector.items():
+            for doc_id, doc_weight in self.postings[feature]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * doc_weight / norm
+        return sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)
+
+class PromptBuilder:
+    """Assembles the command-parsing prompt from a fixed core and the closest examples.
+
+    The core (action schema, download sources and the always-on rules) never
+    changes. Examples and the remaining rules from the original prompt are ranked
+    by similarity to the utterance and added best-first until max_examples,
+    max_rules or the token budget is reached.
+    """
+
+    def __init__(self, token_budget=PROMPT_TOKEN_BUDGET, max_examples=PROMPT_MAX_EXAMPLES, max_rules=PROMPT_MAX_RULES):
+        self.token_budget = token_budget
+        self.max_examples = max_examples
+        self.max_rules = max_rules
+        self.example_index = SimilarityIndex([example[1] for example in EXAMPLES])
+        self.rule_index = SimilarityIndex(RULES)
+        self.full_tokens = estimate_tokens(self._assemble("", "", "", RULES, EXAMPLES + CONTEXT_EXAMPLES, ""))
+        self.builds = 0
+        self.total_tokens = 0
+        self.last_tokens = None
+        self.reported_builds = 0
+        self.reported_tokens = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _assemble(text, os_name, browser, rules, examples, app_context):
+        context_line = f"\nCurrent Application: {app_context}" if app_context else ""
+        parts = [CORE_PROMPT.format(os_name=os_name, browser=browser, context_line=context_line)]
+        parts.extend(f"✨ {rule}\n" for rule in rules)
+        if examples:
+            parts.append("\nExamples:\n")
+            parts.extend(f"• {example_input} → {output}\n" for _, example_input, output in examples)
+        parts.append(f"\nUser Input: {text}\nJSON Output:")
+        return "".join(parts)
+
+    def _select_examples(self, text, app_context):
+        selected = list(CONTEXT_EXAMPLES) if app_context else []
+        per_action = Counter()
+        for score, doc_id in self.example_index.query(text):
+            if len(selected) >= self.max_examples or score < MIN_SIMILARITY:
+                break
+            example = EXAMPLES[doc_id]
+            if per_action[example[0]] >= MAX_EXAMPLES_PER_ACTION:
+                continue
+            per_action[example[0]] += 1
+            selected.append(example)
+        return selected
+
+    def build(self, text, os_name, browser, app_context=None):
+        examples = self._select_examples(text, app_context)
+        rules = [RULES[doc_id] for score, doc_id in self.rule_index.query(text)[:self.max_rules] if score >= MIN_SIMILARITY]
+        prompt = self._assemble(text, os_name, browser, rules, examples, app_context)
+        # Drop the weakest rules and examples until the prompt fits the budget
+        while estimate_tokens(prompt) > self.token_budget and (rules or examples):
+            if len(rules) > len(examples) / 2:
+                rules.pop()
+            else:
+                examples.pop()
+            prompt = self._assemble(text, os_name, browser, rules, examples, app_context)
+        tokens = estimate_tokens(prompt)
+        with self._lock:
+            self.builds += 1
+            self.total_tokens += tokens
+            self.last_tokens = tokens
+        print(f"🧾 Prompt ~{tokens} tokens ({len(examples)} examples, {len(rules)} rules; full prompt ~{self.full_tokens})")
+        return prompt
+
+    def record_usage(self, prompt_tokens):
+        """Records the prompt token count Gemini reported in usageMetadata."""
+        if prompt_tokens:
+            with self._lock:
+                self.reported_builds += 1
+                self.reported_tokens += prompt_tokens
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'builds': self.builds,
+                'avg_tokens': round(self.total_tokens / self.builds) if self.builds else None,
+                'last_tokens': self.last_tokens,
+                'full_prompt_tokens': self.full_tokens,
+                'avg_reported_tokens': round(self.reported_tokens / self.reported_builds) if self.reported_builds else None,
+                'token_budget': self.token_budget,
+            }
+
+prompt_builder = PromptBuilder()
+
+
+SAMPLE_UTTERANCES = [
+    "open chrome", "search cats on youtube", "install vlc via snap", "go to the third tab",
+    "open vs code and create file main.py", "move report.pdf to documents", "play some lofi music",
+    "download research on reinforcement learning", "thank you", "click on the second video",
+]
+
+def test_prompt_builder():
+    utterances = sys.argv[1:] or SAMPLE_UTTERANCES
+    builder = PromptBuilder()
+    print("="*70)
+    print(f"PROMPT BUILDER (budget {builder.token_budget} tokens, full prompt ~{builder.full_tokens})")
+    print("="*70)
+    for text in utterances:
+        examples = builder._select_examples(text, None)
+        builder.build(text, "Linux", "Chrome/Firefox")
+        print(f"   {text!r}: {', '.join(example[1] for example in examples[:4])}")
+    stats = builder.get_stats()
+    print("="*70)
+    print(f"Average prompt ~{stats['avg_tokens']} tokens vs ~{stats['full_prompt_tokens']} "
+          f"({1 - stats['avg_tokens'] / stats['full_prompt_tokens']:.0%} smaller)")
+
+if __name__ == "__main__":
+    test_prompt_builder()
@@ -0,0 +1,102 @@
+import threading
+from collections import deque
+
+try:
+    from config import ENDPOINT_SHORT_TAIL, ENDPOINT_DEFAULT_TAIL, ENDPOINT_LONG_TAIL, ENDPOINT_LONG_SPEECH
+except ImportError:
+    ENDPOINT_SHORT_TAIL = 0.3
+    ENDPOINT_DEFAULT_TAIL = 1.0
+    ENDPOINT_LONG_TAIL = 1.5
+    ENDPOINT_LONG_SPEECH = 4.0
+
+INCOMPLETE_ENDINGS = {
+    'and', 'to', 'the', 'a', 'an', 'for', 'on', 'in', 'with', 'my', 'of', 'called', 'named',
+    'titled', 'then', 'or', 'at', 'into', 'about', 'please', 'open', 'search', 'play', 'type',
+}
+OPEN_ENDED_ACTIONS = {'web_search', 'conversation'}
+
+def load_fallback_parser():
+    try:
+        from GeminiAPI import GeminiAssistant
+        return GeminiAssistant._fallback_parse
+    except Exception as e:
+        print(f"⚠ Local command rules unavailable: {e}")
+        return None
+
+def parses_to_command(text, parse_function):
+    words = text.lower().split()
+    if not words or words[-1] in INCOMPLETE_ENDINGS or parse_function is None:
+        return False
+    try:
+        parsed = parse_function(text)
+    except Exception:
+        return False
+    action = parsed.get('action') if isinstance(parsed, dict) else None
+    if not action or action in OPEN_ENDED_ACTIONS:
+        return False
+    if action == 'open_app' and len(words) < 2:
+        return False
+    return True
+
+class AdaptiveEndpointer:
+    """Chooses how much trailing silence ends an utterance.
+
+    A streaming partial that already parses to a concrete command through the local
+    fallback rules gets the short tail, long dictation gets the long tail, everything
+    else keeps the default.
+    """
+
+    def __init__(self, parse_function=None, short_tail=ENDPOINT_SHORT_TAIL, default_tail=ENDPOINT_DEFAULT_TAIL,
+                 long_tail=ENDPOINT_LONG_TAIL, long_speech=ENDPOINT_LONG_SPEECH):
+        self.parse_function = parse_function or load_fallback_parser()
+        self.short_tail = short_tail
+        self.default_tail = default_tail
+        self.long_tail = long_tail
+        self.long_speech = long_speech
+        self.partial = ""
+        self.complete = False
+        self.counts = {'short': 0, 'default': 0, 'long': 0}
+        self.saved_seconds = 0.0
+        self.dispatch_latencies = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.partial = ""
+        self.complete = False
+
+    def update_partial(self, text):
+        text = (text or "").strip()
+        if text == self.partial:
+            return self.complete
+        self.partial = text
+        self.complete = self.is_complete_command(text)
+        return self.complete
+
+    def is_complete_command(self, text):
+        return parses_to_command(text, self.parse_function)
+
+    def choose(self, speech_seconds):
+        if self.complete:
+            return self.short_tail, 'short'
+        if speech_seconds >= self.long_speech:
+            return self.long_tail, 'long'
+        return self.default_tail, 'default'
+
+    def record_endpoint(self, reason, tail_seconds):
+        with self._lock:
+            self.counts[reason] += 1
+            self.saved_seconds += self.default_tail - tail_seconds
+
+    def record_dispatch(self, seconds_since_speech):
+        with self._lock:
+            self.dispatch_latencies.append(seconds_since_speech)
+
+    def get_metrics(self):
+        with self._lock:
+            latencies = sorted(self.dispatch_latencies)
+            return {
+                'tails': {'short': self.short_tail, 'default': self.default_tail, 'long': self.long_tail},
+                'endpoints': dict(self.counts),
+                'silence_saved_seconds': round(self.saved_seconds, 2),
+                'speech_to_dispatch_median': round(latencies[len(latencies) // 2], 3) if latencies else None,
+            }
@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+class StageQueue:
+    def __init__(self, name, maxsize, overflow="drop_oldest"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.name = name
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize)
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        if self.overflow == "block":
+            self.queue.put(item)
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    with self._lock:
+                        self.dropped += 1
+                    if self.overflow == "drop_newest":
+                        return False
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def get(self, timeout=None):
+        return self.queue.get(timeout=timeout)
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def clear(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def get_metrics(self):
+        return {
+            'depth': self.depth(),
+            'max_depth': self.max_depth,
+            'capacity': self.maxsize,
+            'overflow': self.overflow,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+        }
+
+class PipelineStage:
+    def __init__(self, name, handler, input_queue, output_queue=None):
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.last_latency = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"AudioPipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                item = self.input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                print(f"\n⚠ Audio pipeline stage '{self.name}' failed: {e}")
+                continue
+            finally:
+                self.last_latency = time.perf_counter() - started
+                self.busy_seconds += self.last_latency
+            self.processed += 1
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+
+    def get_metrics(self):
+        return {
+            'alive': self.is_alive(),
+            'input': self.input_queue.name,
+            'processed': self.processed,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'last_latency': round(self.last_latency, 4) if self.last_latency is not None else None,
+        }
+
+class AudioPipeline:
+    def __init__(self):
+        self.queues = {}
+        self.stages = []
+
+    def attach_queue(self, stage_queue):
+        self.queues[stage_queue.name] = stage_queue
+        return stage_queue
+
+    def add_queue(self, name, maxsize, overflow="drop_oldest"):
+        self.queues[name] = StageQueue(name, maxsize, overflow)
+        return self.queues[name]
+
+    def add_stage(self, name, handler, input_name, output_name=None):
+        stage = PipelineStage(
+            name, handler, self.queues[input_name],
+            self.queues[output_name] if output_name else None
+        )
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def get_metrics(self):
+        return {
+            'queues': {name: q.get_metrics() for name, q in self.queues.items()},
+            'stages': {stage.name: stage.get_metrics() for stage in self.stages},
+        }
\ No newline at end of file
@@ -0,0 +1,97 @@
+import queue
+import threading
+import numpy as np
+
+class AudioRingBuffer:
+    """Preallocated capture buffer addressed by absolute sample positions.
+
+    Attachable to an AudioPipeline in place of the capture StageQueue.
+    """
+
+    def __init__(self, name, capacity, block_size):
+        self.name = name
+        self.capacity = capacity - capacity % block_size
+        self.block_size = block_size
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        self._scratch = np.zeros(block_size, dtype=np.float32)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._cond = threading.Condition()
+
+    def put(self, indata):
+        samples = indata[:, 0] if indata.ndim > 1 else indata
+        n = len(samples)
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        with self._cond:
+            self.write_pos += n
+            self.enqueued += 1
+            lag = self.write_pos - self.read_pos
+            if lag > self.capacity:
+                skipped = lag - self.capacity
+                self.dropped += -(-skipped // self.block_size)
+                self.read_pos += skipped
+                lag = self.capacity
+            depth = lag // self.block_size
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._cond.notify()
+        return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            if self.write_pos - self.read_pos < self.block_size:
+                self._cond.wait(timeout)
+                if self.write_pos - self.read_pos < self.block_size:
+                    raise queue.Empty
+            start = self.read_pos
+            self.read_pos += self.block_size
+        return self.view(start, start + self.block_size)
+
+    def view(self, start, end):
+        """Returns samples [start, end) without copying unless the range wraps."""
+        offset = start % self.capacity
+        if offset + (end - start) <= self.capacity:
+            return self.data[offset:offset + end - start]
+        out = self._scratch if end - start == self.block_size else np.empty(end - start, dtype=np.float32)
+        first = self.capacity - offset
+        out[:first] = self.data[offset:]
+        out[first:] = self.data[:end - start - first]
+        return out
+
+    def extract(self, start, end):
+        """Copies samples [start, end) into a new array (the single copy per utterance)."""
+        start = max(start, self.oldest())
+        out = np.empty(max(end - start, 0), dtype=np.float32)
+        offset = start % self.capacity
+        first = min(len(out), self.capacity - offset)
+        out[:first] = self.data[offset:offset + first]
+        out[first:] = self.data[:len(out) - first]
+        return out
+
+    def oldest(self):
+        return max(0, self.write_pos - self.capacity)
+
+    def depth(self):
+        return (self.write_pos - self.read_pos) // self.block_size
+
+    def clear(self):
+        with self._cond:
+            self.write_pos = 0
+            self.read_pos = 0
+
+    def get_metrics(self):
+        return {
+            'depth': self.depth(),
+            'max_depth': self.max_depth,
+            'capacity': self.capacity // self.block_size,
+            'overflow': "drop_oldest",
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+        }
@@ -1,4 +1,6 @@
 import socket
+import threading
+import time
 
 def check_server_connectivity(host="HOST_ADDRESS", port = 80, timeout = 3):
     try:
@@ -6,3 +8,89 @@ def check_server_connectivity(host="HOST_ADDRESS", port = 80, timeout = 3):
             return True
     except (socket.timeout, ConnectionRefusedError, OSError):
         return False
+
+class ConnectivityMonitor:
+    def __init__(self, host="8.8.8.8", port=53, timeout=3, interval=15, max_interval=120):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max_interval
+        self.online = False
+        self.checked = False
+        self.last_checked = None
+        self.last_change = None
+        self.consecutive_failures = 0
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._first_check = threading.Event()
+        self._thread = None
+
+    def start(self, wait=False):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ConnectivityMonitor", daemon=True)
+            self._thread.start()
+        if wait:
+            self._first_check.wait(self.timeout + 1)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_online(self):
+        return self.online
+
+    def add_listener(self, callback):
+        with self._lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def check_now(self):
+        online = check_server_connectivity(self.host, self.port, self.timeout)
+        self._update(online)
+        return online
+
+    def get_status(self):
+        return {
+            'online': self.online,
+            'checked': self.checked,
+            'last_checked': self.last_checked,
+            'last_change': self.last_change,
+            'consecutive_failures': self.consecutive_failures,
+            'next_check_in': self._next_interval(),
+        }
+
+    def _next_interval(self):
+        if self.online or self.consecutive_failures == 0:
+            return self.interval
+        return min(self.interval * (2 ** (self.consecutive_failures - 1)), self.max_interval)
+
+    def _update(self, online):
+        with self._lock:
+            changed = not self.checked or online != self.online
+            self.online = online
+            self.checked = True
+            self.last_checked = time.time()
+            self.consecutive_failures = 0 if online else self.consecutive_failures + 1
+            if changed:
+                self.last_change = self.last_checked
+            listeners = list(self.listeners) if changed else []
+        self._first_check.set()
+        for callback in listeners:
+            try:
+                callback(online)
+            except Exception as e:
+                print(f"Connectivity listener failed: {e}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.check_now()
+            self._stop_event.wait(self._next_interval())
+
+connectivity_monitor = ConnectivityMonitor()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from config import NOISE_PROFILE_FILE, NOISE_PROFILE_MAX_AGE
+except ImportError:
+    NOISE_PROFILE_FILE = os.path.join(str(Path.home()), ".either_assistant", "noise_profiles.json")
+    NOISE_PROFILE_MAX_AGE = 7 * 24 * 3600
+
+class NoiseProfileStore:
+    """Noise level and spectrum per input device, persisted as JSON."""
+
+    def __init__(self, path=NOISE_PROFILE_FILE, max_age=NOISE_PROFILE_MAX_AGE):
+        self.path = os.path.expanduser(path)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, device, sample_rate, n_fft):
+        with self._lock:
+            profile = self._read().get(device)
+        if not profile:
+            return None
+        if profile.get('sample_rate') != sample_rate or profile.get('n_fft') != n_fft:
+            return None
+        age = time.time() - profile.get('timestamp', 0)
+        if self.max_age and age > self.max_age:
+            return None
+        return {
+            'device': device,
+            'timestamp': profile['timestamp'],
+            'age': age,
+            'noise_level': profile['noise_level'],
+            'noise_mean_db': np.array(profile['noise_mean_db']),
+            'noise_std_db': np.array(profile['noise_std_db']),
+        }
+
+    def save(self, device, noise_level, noise_mean_db, noise_std_db, sample_rate, n_fft):
+        with self._lock:
+            profiles = self._read()
+            profiles[device] = {
+                'timestamp': time.time(),
+                'noise_level': float(noise_level),
+                'noise_mean_db': np.round(noise_mean_db, 3).tolist(),
+                'noise_std_db': np.round(noise_std_db, 3).tolist(),
+                'sample_rate': sample_rate,
+                'n_fft': n_fft,
+            }
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(profiles, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠ Could not save noise profile: {e}")
+                return False
+        return True
+
+    def delete(self, device):
+        with self._lock:
+            profiles = self._read()
+            if profiles.pop(device, None) is None:
+                return False
+            try:
+                with open(self.path, "w") as f:
+                    json.dump(profiles, f)
+            except OSError:
+                return False
+        return True
+
+noise_profiles = NoiseProfileStore()
@@ -1,20 +1,47 @@
 import sounddevice as sd
 import numpy as np
-import queue
+import threading
+import time
+import uuid
 import webrtcvad
-import noisereduce as nr
-from scipy import signal
 from collections import deque
+from STT.AudioPipeline import AudioPipeline
+from STT.AudioRingBuffer import AudioRingBuffer
+from STT.VadFeatures import FrameFeatureExtractor, VAD_FRAME_LENGTH
+from STT.StreamingDenoiser import StreamingDenoiser, compute_noise_spectrum, N_FFT
+from STT.NoiseProfile import noise_profiles
+from STT.AdaptiveEndpointer import AdaptiveEndpointer
 
 fs = 16000
 blocksize = 1024
-q = queue.Queue()
 vad = webrtcvad.Vad(3)  
 
 ENERGY_THRESHOLD = 0.015  
 MIN_SPEECH_DURATION = 0.5  
 SILENCE_DURATION = 1.0  
 
+try:
+    from config import ADAPTIVE_ENDPOINTING
+except ImportError:
+    ADAPTIVE_ENDPOINTING = True
+
+try:
+    from config import VAD_TRIM_MARGIN
+except ImportError:
+    VAD_TRIM_MARGIN = 0.15
+
+CAPTURE_BUFFER_SECONDS = 30
+MAX_UTTERANCE_SECONDS = 25
+NOISE_PROFILE_SAVE_INTERVAL = 120
+UTTERANCE_QUEUE_SIZE = 3
+TRANSCRIPT_QUEUE_SIZE = 3
+
+q = AudioRingBuffer("capture", int(CAPTURE_BUFFER_SECONDS * fs), blocksize)
+active_pipeline = None
+active_denoiser = None
+active_endpointer = None
+active_segmenter = None
+
 class SpeechDetector:
     def __init__(self):
         self.speech_frames = deque(maxlen=int(MIN_SPEECH_DURATION * fs / blocksize))
@@ -25,148 +52,290 @@ class SpeechDetector:
     def calculate_energy(self, audio):
         return np.sqrt(np.mean(audio**2))
     
-    def update_noise_level(self, audio):
-        energy = self.calculate_energy(audio)
+    def update_noise_energy(self, energy):
         self.noise_level = 0.95 * self.noise_level + 0.05 * energy
     
-    def is_speech_energy(self, audio):
-        energy = self.calculate_energy(audio)
+    def is_speech_level(self, energy):
         return energy > max(ENERGY_THRESHOLD, self.noise_level * 3)
 
-def is_speech(audio_block, detector):
-    if not detector.is_speech_energy(audio_block):
+def is_speech_block(features, block_id, detector):
+    if not detector.is_speech_level(features.energy(block_id)):
         return False
-    
-    pcm_data = (audio_block * 32767).astype(np.int16).tobytes()
-    frame_length = 480  
-    speech_frames = 0
-    total_frames = 0
-    
-    for i in range(0, len(pcm_data), frame_length*2):
-        frame = pcm_data[i:i+frame_length*2]
-        if len(frame) < frame_length*2:
-            break
-        total_frames += 1
-        if vad.is_speech(frame, sample_rate=fs):
-            speech_frames += 1
-    
-    return total_frames > 0 and (speech_frames / total_frames) >= 0.7
-
-def preprocess_audio(audio_np, noise_sample=None):
-    
-    if noise_sample is not None:
-        audio_np = nr.reduce_noise(
-            y=audio_np, 
-            sr=fs,
-            y_noise=noise_sample,
-            stationary=True,
-            prop_decrease=0.8
-        )
-    else:
-        audio_np = nr.reduce_noise(y=audio_np, sr=fs, stationary=True)
-    
-    sos = signal.butter(4, 100, 'hp', fs=fs, output='sos')
-    audio_np = signal.sosfilt(sos, audio_np)
-    
-    sos_bp = signal.butter(3, [300, 3000], 'bp', fs=fs, output='sos')
-    audio_np = signal.sosfilt(sos_bp, audio_np)
-    
-    max_val = np.max(np.abs(audio_np))
-    if max_val > 0:
-        audio_np = audio_np / max_val
-    
-    return audio_np.astype(np.float32)
+    return features.speech_ratio(block_id) >= 0.7
 
 def audio_callback(indata, frames, time_info, status):
     if status:
         print(status)
-    q.put(indata.copy())
+    q.put(indata)
+
+class UtteranceSegmenter:
+    def __init__(self, detector, ring, buffer_seconds=2, streaming_stt=None, denoiser=None, on_profile_update=None,
+                 endpointer=None, trim_margin=VAD_TRIM_MARGIN):
+        self.detector = detector
+        self.trim_margin = None if trim_margin is None else int(trim_margin * fs)
+        self.utterances = 0
+        self.trimmed_seconds = 0.0
+        self.endpointer = endpointer
+        self.ring = ring
+        self.denoiser = denoiser
+        self.on_profile_update = on_profile_update
+        self.last_profile_update = time.time()
+        self.streaming_stt = streaming_stt
+        self.preroll_samples = int(buffer_seconds * fs / blocksize) * blocksize
+        self.max_utterance_samples = int(min(MAX_UTTERANCE_SECONDS, ring.capacity / fs - 1) * fs)
+        self.max_silence_blocks = int(SILENCE_DURATION * fs / blocksize)
+        self.features = FrameFeatureExtractor(vad, ring.capacity // blocksize, blocksize, fs)
+        self.preroll_start = None
+        self.speech_start = None
+        self.speech_end = None
+        self.speech_end_time = None
+        self.silence_blocks = 0
+
+    def _tail_blocks(self):
+        if self.endpointer is None:
+            return self.max_silence_blocks, SILENCE_DURATION, None
+        tail, reason = self.endpointer.choose((self.speech_end - self.speech_start) / fs)
+        return max(1, int(round(tail * fs / blocksize))), tail, reason
+
+    def _refine_start(self, preroll_start, onset_end):
+        if self.trim_margin is None:
+            return preroll_start
+        threshold = self.detector.noise_level * 1.5
+        for block_id in range(preroll_start // blocksize, onset_end // blocksize):
+            if not self.features.has_block(block_id) or self.features.energy(block_id) <= threshold:
+                continue
+            for f, voiced in enumerate(self.features.vad_decisions(block_id)):
+                if voiced > 0:
+                    return max(preroll_start, block_id * blocksize + f * VAD_FRAME_LENGTH - self.trim_margin)
+        return max(preroll_start, onset_end - blocksize - self.trim_margin)
+
+    def _refine_end(self, block_end):
+        if self.trim_margin is None:
+            return block_end
+        return min(block_end, self.speech_end + self.trim_margin)
+
+    def get_metrics(self):
+        return {
+            'utterances': self.utterances,
+            'trim_margin': None if self.trim_margin is None else self.trim_margin / fs,
+            'trimmed_seconds': round(self.trimmed_seconds, 2),
+        }
+
+    def _accept_partial(self, audio_block):
+        partial = self.streaming_stt.accept(audio_block)
+        if self.endpointer:
+            self.endpointer.update_partial(partial)
+
+    def process(self, audio_block):
+        detector = self.detector
+        streaming_stt = self.streaming_stt
+        block_end = self.ring.read_pos
+        block_id = block_end // blocksize - 1
+        self.features.analyze(audio_block, block_id)
+        speech = is_speech_block(self.features, block_id, detector)
+        if self.denoiser:
+            if self.denoiser.cleaned.write_pos != block_end - blocksize:
+                self.denoiser.reset(block_end - blocksize)
+            self.denoiser.process(audio_block, update_noise=not speech and not detector.is_speaking)
+        
+        if not detector.is_speaking:
+            detector.update_noise_energy(self.features.energy(block_id))
+            if self.on_profile_update and time.time() - self.last_profile_update >= NOISE_PROFILE_SAVE_INTERVAL:
+                self.last_profile_update = time.time()
+                self.on_profile_update()
 
-def stream_microPhone(stt_function, buffer_seconds=2, noise_profile_duration=3):
-    buffer = []
-    speech_buffer = []
-    max_buffer_len = int(buffer_seconds * fs / blocksize)
+        tail = reason = None
+        if speech:
+            self.silence_blocks = 0
+            self.speech_end = block_end
+            self.speech_end_time = time.time()
+            if not detector.is_speaking:
+                detector.is_speaking = True
+                self.preroll_start = max(block_end - self.preroll_samples, self.ring.oldest())
+                self.speech_start = self._refine_start(self.preroll_start, block_end)
+                print("Speech detected...", end='', flush=True)
+                if self.endpointer:
+                    self.endpointer.reset()
+                if streaming_stt:
+                    streaming_stt.start()
+                    self._accept_partial(self.ring.extract(self.speech_start, block_end))
+            elif streaming_stt:
+                self._accept_partial(audio_block)
+            if block_end - self.speech_start < self.max_utterance_samples:
+                return None
+        else:
+            if not detector.is_speaking:
+                return None
+            
+            self.silence_blocks += 1
+            if streaming_stt:
+                self._accept_partial(audio_block)
+            tail_blocks, tail, reason = self._tail_blocks()
+            if self.silence_blocks < tail_blocks:
+                return None
+            if self.endpointer:
+                self.endpointer.record_endpoint(reason, tail)
+        
+        print(" Processing...")
+        detector.is_speaking = False
+        self.silence_blocks = 0
+        utterance_end = self._refine_end(block_end)
+        if self.denoiser:
+            audio_np = self.denoiser.extract(self.speech_start, utterance_end)
+        else:
+            audio_np = self.ring.extract(self.speech_start, utterance_end)
+        energy = self.features.mean_energy(self.speech_start // blocksize, (utterance_end - 1) // blocksize + 1)
+        self.utterances += 1
+        self.trimmed_seconds += (block_end - self.preroll_start - len(audio_np)) / fs
+        self.speech_start = None
+        return {
+            'utterance_id': uuid.uuid4().hex,
+            'audio': audio_np,
+            'energy': energy,
+            'streamed_text': streaming_stt.finish() if streaming_stt else None,
+            'endpoint_time': time.time(),
+            'speech_end_time': self.speech_end_time,
+            'endpoint_reason': reason,
+        }
+
+def get_pipeline_metrics():
+    if active_pipeline is None:
+        return {}
+    metrics = active_pipeline.get_metrics()
+    if active_denoiser is not None:
+        metrics['denoiser'] = active_denoiser.get_metrics()
+    if active_segmenter is not None:
+        metrics['segmenter'] = active_segmenter.get_metrics()
+    if active_endpointer is not None:
+        metrics['endpointer'] = active_endpointer.get_metrics()
+    return metrics
+
+def get_input_device_name():
+    try:
+        device = sd.query_devices(kind='input')
+        hostapi = sd.query_hostapis(device['hostapi'])['name']
+        return f"{device['name']} ({hostapi})"
+    except Exception:
+        return "default"
+
+def stream_microPhone(stt_function, buffer_seconds=2, noise_profile_duration=3, streaming_stt=None,
+                      dispatch_function=None, stop_event=None, recalibrate=False, endpointer=None):
+    global active_pipeline, active_denoiser, active_endpointer, active_segmenter
     detector = SpeechDetector()
-    noise_profile = []
+    stop_event = stop_event or threading.Event()
+    device_name = get_input_device_name()
+    profile = None if recalibrate else noise_profiles.load(device_name, fs, N_FFT)
     
-    print("\n" + "="*60)
-    print("NOISE CALIBRATION")
-    print("="*60)
-    print(f"Please remain SILENT for {noise_profile_duration} seconds...")
-    print("This helps the system learn background noise.")
-    print("="*60 + "\n")
+    if profile is None:
+        print("\n" + "="*60)
+        print("NOISE CALIBRATION")
+        print("="*60)
+        print(f"Please remain SILENT for {noise_profile_duration} seconds...")
+        print("This helps the system learn background noise.")
+        print("="*60 + "\n")
     
+    q.clear()
     with sd.InputStream(samplerate=fs, channels=1,
                         blocksize=blocksize,
                         callback=audio_callback):
+        pipeline = None
         try:
-            noise_blocks = int(noise_profile_duration * fs / blocksize)
-            for i in range(noise_blocks):
-                block = q.get()
-                noise_profile.append(block)
-                if (i+1) % 5 == 0:
-                    print(f"Calibrating... {i+1}/{noise_blocks}")
-            
-            noise_sample = np.concatenate(noise_profile, axis=0).flatten()
-            
-            detector.noise_level = detector.calculate_energy(noise_sample)
-            
-            print("\n" + "="*60)
-            print(f"Calibration complete!")
+            if profile is None:
+                noise_blocks = int(noise_profile_duration * fs / blocksize)
+                noise_start = q.read_pos
+                for i in range(noise_blocks):
+                    q.get()
+                    if (i+1) % 5 == 0:
+                        print(f"Calibrating... {i+1}/{noise_blocks}")
+                
+                noise_sample = q.extract(noise_start, q.read_pos)
+                
+                detector.noise_level = detector.calculate_energy(noise_sample)
+                noise_spectrum = compute_noise_spectrum(noise_sample)
+                noise_profiles.save(device_name, detector.noise_level, *noise_spectrum, fs, N_FFT)
+                
+                print("\n" + "="*60)
+                print(f"Calibration complete!")
+            else:
+                detector.noise_level = profile['noise_level']
+                noise_spectrum = (profile['noise_mean_db'], profile['noise_std_db'])
+                
+                print("\n" + "="*60)
+                print(f"Loaded noise profile for {device_name} (saved {profile['age'] / 60:.0f} min ago)")
             print(f"  Background noise level: {detector.noise_level:.4f}")
             print(f"  Speech threshold: {max(ENERGY_THRESHOLD, detector.noise_level * 3):.4f}")
             print("="*60)
             print("\nListening for speech...")
             print("Press Ctrl+C to stop.\n")
             
-            silence_blocks = 0
-            max_silence_blocks = int(SILENCE_DURATION * fs / blocksize)
+            denoiser = StreamingDenoiser(noise_spectrum, q.capacity, blocksize, fs)
+            denoiser.reset(q.read_pos)
+            active_denoiser = denoiser
             
-            while True:
-                audio_block = q.get()
-                audio_flat = audio_block.flatten()
-                
-                if not detector.is_speaking:
-                    detector.update_noise_level(audio_flat)
-                
-                buffer.append(audio_block)
-                if len(buffer) > max_buffer_len:
-                    buffer.pop(0)
-
-                if is_speech(audio_flat, detector):
-                    silence_blocks = 0
-                    if not detector.is_speaking:
-                        detector.is_speaking = True
-                        speech_buffer = buffer.copy()
-                        print("Speech detected...", end='', flush=True)
-                    else:
-                        speech_buffer.append(audio_block)
-                else:
-                    if detector.is_speaking:
-                        silence_blocks += 1
-                        speech_buffer.append(audio_block)
-                        
-                        if silence_blocks >= max_silence_blocks:
-                            print(" Processing...")
-                            detector.is_speaking = False
-                            silence_blocks = 0
-                            
-                            audio_np = np.concatenate(speech_buffer, axis=0).flatten()
-                            
-                            if detector.calculate_energy(audio_np) > ENERGY_THRESHOLD:
-                                audio_proc = preprocess_audio(audio_np, noise_sample)
-                                
-                                text = stt_function(audio_proc)
-                                if text.strip() != "" and len(text.strip()) > 2:
-                                    print(f"Transcription: {text}\n")
-                                else:
-                                    print("No clear speech detected\n")
-                            else:
-                                print("Audio too quiet\n")
-                            
-                            speech_buffer = []
+            def save_noise_profile():
+                noise_profiles.save(device_name, detector.noise_level,
+                                    denoiser.noise_mean_db, denoiser.noise_std_db, fs, N_FFT)
+            
+            if endpointer is None and streaming_stt and ADAPTIVE_ENDPOINTING:
+                endpointer = AdaptiveEndpointer()
+            active_endpointer = endpointer
+            segmenter = UtteranceSegmenter(detector, q, buffer_seconds, streaming_stt, denoiser,
+                                           on_profile_update=save_noise_profile, endpointer=endpointer)
+            active_segmenter = segmenter
+            
+            def preprocess_stage(utterance):
+                if utterance['energy'] <= ENERGY_THRESHOLD:
+                    print("Audio too quiet\n")
+                    return None
+                return utterance
+            
+            def stt_stage(utterance):
+                kwargs = {}
+                if streaming_stt:
+                    kwargs['transcription'] = utterance['streamed_text']
+                if dispatch_function:
+                    kwargs['utterance_id'] = utterance['utterance_id']
+                text = stt_function(utterance['audio'], **kwargs)
+                if text and text.strip() != "" and len(text.strip()) > 2:
+                    print(f"Transcription: {text}\n")
+                    utterance['text'] = text
+                    return utterance
+                print("No clear speech detected\n")
+                return None
+            
+            def dispatch_stage(utterance):
+                if endpointer and utterance['speech_end_time']:
+                    endpointer.record_dispatch(time.time() - utterance['speech_end_time'])
+                if dispatch_function:
+                    dispatch_function(utterance['text'], utterance['utterance_id'])
+                return None
+            
+            pipeline = AudioPipeline()
+            pipeline.attach_queue(q)
+            pipeline.add_queue("utterances", UTTERANCE_QUEUE_SIZE, overflow="drop_oldest")
+            pipeline.add_queue("stt", UTTERANCE_QUEUE_SIZE, overflow="drop_oldest")
+            pipeline.add_queue("dispatch", TRANSCRIPT_QUEUE_SIZE, overflow="drop_oldest")
+            pipeline.add_stage("endpointing", segmenter.process, "capture", "utterances")
+            pipeline.add_stage("preprocess", preprocess_stage, "utterances", "stt")
+            pipeline.add_stage("stt", stt_stage, "stt", "dispatch")
+            pipeline.add_stage("dispatch", dispatch_stage, "dispatch")
+            active_pipeline = pipeline
+            pipeline.start()
+            
+            while not stop_event.wait(0.5):
+                pass
+            print("\n\nStopped listening.")
 
         except KeyboardInterrupt:
             print("\n\nStopped listening.")
         except Exception as e:
-            print(f"\nError: {e}")
\ No newline at end of file
+            print(f"\nError: {e}")
+        finally:
+            if pipeline:
+                pipeline.stop()
+            if active_denoiser is not None and active_denoiser.noise_updates:
+                save_noise_profile()
+            active_pipeline = None
+            active_denoiser = None
+            active_endpointer = None
+            active_segmenter = None
\ No newline at end of file
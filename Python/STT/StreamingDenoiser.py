@@ -0,0 +1,123 @@
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+from STT.AudioRingBuffer import AudioRingBuffer
+
+N_FFT = 512
+HOP_LENGTH = 256
+N_STD_THRESH = 1.5
+PROP_DECREASE = 0.8
+NOISE_ADAPT_RATE = 0.02
+
+HIGHPASS_SOS = None
+BANDPASS_SOS = None
+
+def get_filter_sos(sample_rate=16000):
+    global HIGHPASS_SOS, BANDPASS_SOS
+    if HIGHPASS_SOS is None:
+        HIGHPASS_SOS = signal.butter(4, 100, 'hp', fs=sample_rate, output='sos')
+        BANDPASS_SOS = signal.butter(3, [300, 3000], 'bp', fs=sample_rate, output='sos')
+    return HIGHPASS_SOS, BANDPASS_SOS
+
+def compute_noise_spectrum(noise_sample, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """Mean and standard deviation of the noise magnitude spectrum in dB, per frequency bin."""
+    window = np.sqrt(np.hanning(n_fft + 1)[:-1])
+    if len(noise_sample) < n_fft:
+        noise_sample = np.pad(noise_sample, (0, n_fft - len(noise_sample)))
+    frames = sliding_window_view(noise_sample, n_fft)[::hop_length] * window
+    noise_db = 20 * np.log10(np.abs(np.fft.rfft(frames, axis=1)) + 1e-10)
+    return noise_db.mean(axis=0), noise_db.std(axis=0)
+
+class StreamingDenoiser:
+    """Stationary spectral gating plus the high-pass/band-pass filters, applied block by block.
+
+    Uses a sqrt-Hann STFT with 50% overlap so output lags input by n_fft - hop samples.
+    Cleaned audio is written to its own ring at the capture position it corresponds to.
+    """
+
+    def __init__(self, noise_spectrum, capacity, block_size=1024, sample_rate=16000,
+                 n_fft=N_FFT, hop_length=HOP_LENGTH, prop_decrease=PROP_DECREASE):
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.latency = n_fft - hop_length
+        self.floor = 1.0 - prop_decrease
+        self.window = np.sqrt(np.hanning(n_fft + 1)[:-1])
+        self.hp_sos, self.bp_sos = get_filter_sos(sample_rate)
+        self.cleaned = AudioRingBuffer("cleaned", capacity, block_size)
+        self.set_noise_spectrum(*noise_spectrum)
+        self.noise_updates = 0
+        self._input = np.zeros(self.latency + block_size, dtype=np.float64)
+        self._acc = np.zeros(self.latency + block_size, dtype=np.float64)
+        self.blocks = 0
+        self.busy_seconds = 0.0
+        self.reset(0)
+
+    def set_noise_spectrum(self, mean_db, std_db):
+        self.noise_mean_db = np.asarray(mean_db, dtype=np.float64)
+        self.noise_std_db = np.asarray(std_db, dtype=np.float64)
+        self._noise_sq_db = self.noise_std_db ** 2 + self.noise_mean_db ** 2
+        self.threshold_db = self.noise_mean_db + N_STD_THRESH * self.noise_std_db
+
+    def _update_noise_spectrum(self, magnitude_db):
+        rate = NOISE_ADAPT_RATE
+        self.noise_mean_db += rate * (magnitude_db.mean(axis=0) - self.noise_mean_db)
+        self._noise_sq_db += rate * ((magnitude_db ** 2).mean(axis=0) - self._noise_sq_db)
+        self.noise_std_db = np.sqrt(np.maximum(self._noise_sq_db - self.noise_mean_db ** 2, 0))
+        self.threshold_db = self.noise_mean_db + N_STD_THRESH * self.noise_std_db
+        self.noise_updates += 1
+
+    def reset(self, position):
+        """Restarts filtering for a capture stream whose next block starts at `position`."""
+        self._input[:] = 0
+        self._acc[:] = 0
+        self.hp_zi = np.zeros((self.hp_sos.shape[0], 2))
+        self.bp_zi = np.zeros((self.bp_sos.shape[0], 2))
+        self.cleaned.write_pos = self.cleaned.read_pos = position
+
+    def process(self, audio_block, update_noise=False):
+        started = time.perf_counter()
+        latency = self.latency
+        self._input[:latency] = self._input[-latency:]
+        self._input[latency:] = audio_block
+
+        frames = sliding_window_view(self._input, self.n_fft)[::self.hop_length] * self.window
+        spectrum = np.fft.rfft(frames, axis=1)
+        magnitude_db = 20 * np.log10(np.abs(spectrum) + 1e-10)
+        if update_noise:
+            self._update_noise_spectrum(magnitude_db)
+        spectrum *= np.where(magnitude_db > self.threshold_db, 1.0, self.floor)
+        frames = np.fft.irfft(spectrum, n=self.n_fft, axis=1) * self.window
+
+        acc = self._acc
+        acc[:latency] = acc[-latency:]
+        acc[latency:] = 0
+        for k, frame in enumerate(frames):
+            offset = k * self.hop_length
+            acc[offset:offset + self.n_fft] += frame
+        out = acc[:self.block_size]
+
+        out, self.hp_zi = signal.sosfilt(self.hp_sos, out, zi=self.hp_zi)
+        out, self.bp_zi = signal.sosfilt(self.bp_sos, out, zi=self.bp_zi)
+        self.cleaned.put(out.astype(np.float32))
+        self.blocks += 1
+        self.busy_seconds += time.perf_counter() - started
+
+    def extract(self, start, end):
+        """Cleaned, peak-normalized audio for capture samples [start, end)."""
+        end = min(end, self.cleaned.write_pos - self.latency)
+        audio_np = self.cleaned.extract(start + self.latency, end + self.latency)
+        max_val = np.max(np.abs(audio_np)) if len(audio_np) else 0
+        if max_val > 0:
+            audio_np /= max_val
+        return audio_np
+
+    def get_metrics(self):
+        return {
+            'blocks': self.blocks,
+            'mean_block_ms': round(self.busy_seconds / self.blocks * 1000, 3) if self.blocks else None,
+            'latency_samples': self.latency,
+            'noise_updates': self.noise_updates,
+        }
@@ -0,0 +1,267 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+try:
+    from config import STT_LATENCY_BUDGET
+except ImportError:
+    STT_LATENCY_BUDGET = 2.0
+
+try:
+    from config import STT_SPECULATIVE, SPECULATIVE_MIN_CONFIDENCE
+except ImportError:
+    STT_SPECULATIVE = True
+    SPECULATIVE_MIN_CONFIDENCE = 0.85
+
+class SttBackend:
+    def __init__(self, name, transcribe, rtf=1.0, quality=0, is_loaded=None, warmup=None, streaming=False,
+                 uses_transcription=False, cancellable=False):
+        self.name = name
+        self.transcribe = transcribe
+        self.uses_transcription = uses_transcription
+        self.cancellable = cancellable
+        self.rtf = rtf
+        self.quality = quality
+        self.is_loaded = is_loaded or (lambda: True)
+        self.warmup = warmup
+        self.streaming = streaming
+        self.samples = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+    def estimate(self, duration, has_stream=False):
+        if self.streaming and has_stream:
+            return 0.0
+        return self.rtf * duration
+
+    def record(self, duration, elapsed):
+        observed = elapsed / max(duration, 0.1)
+        self.rtf = observed if self.samples == 0 else 0.8 * self.rtf + 0.2 * observed
+        self.samples += 1
+        self.total_seconds += elapsed
+
+    def get_status(self):
+        return {
+            'rtf': round(self.rtf, 3),
+            'quality': self.quality,
+            'samples': self.samples,
+            'failures': self.failures,
+            'total_seconds': round(self.total_seconds, 2),
+        }
+
+class SpeculativeDecoder:
+    """Commits a fast transcript instead of waiting for a slow, cancellable backend.
+
+    The fast result is accepted when every word is above min_confidence and the text
+    parses to a concrete command. A streamed Vosk transcript that carries word
+    confidences is checked before the slow backend even starts; without one, the
+    fast_transcribe decode is raced against the slow backend, which is cancelled
+    if the fast result wins.
+    """
+
+    def __init__(self, fast_transcribe, accept, min_confidence=SPECULATIVE_MIN_CONFIDENCE):
+        self.fast_transcribe = fast_transcribe
+        self.accept = accept
+        self.min_confidence = min_confidence
+        self.fast_wins = 0
+        self.slow_wins = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _is_acceptable(self, text, confidence):
+        return bool(text) and confidence >= self.min_confidence and self.accept(text)
+
+    def _record_fast(self, slow_backend, duration, fast_elapsed):
+        with self._lock:
+            self.fast_wins += 1
+            self.saved_seconds += max(0.0, slow_backend.estimate(duration) - fast_elapsed)
+
+    def run(self, audio_np, slow_backend, duration, transcription=None):
+        confidence = getattr(transcription, 'confidence', None)
+        if confidence is not None or self.fast_transcribe is None:
+            if confidence is not None and self._is_acceptable(str(transcription), confidence):
+                self._record_fast(slow_backend, duration, 0.0)
+                return str(transcription), "fast"
+            text = slow_backend.transcribe(audio_np)
+            with self._lock:
+                self.slow_wins += 1
+            return text, "slow"
+        cancel_event = threading.Event()
+        outcome = {}
+        def slow():
+            try:
+                outcome['text'] = slow_backend.transcribe(audio_np, cancel_event=cancel_event)
+            except Exception as e:
+                outcome['error'] = e
+        started = time.time()
+        thread = threading.Thread(target=slow, name=f"Speculative-{slow_backend.name}", daemon=True)
+        thread.start()
+        try:
+            fast_text, confidence = self.fast_transcribe(audio_np)
+        except Exception as e:
+            logger.error(f"STT router: speculative fast path failed: {e}")
+            fast_text, confidence = "", 0.0
+        fast_elapsed = time.time() - started
+        if self._is_acceptable(fast_text, confidence):
+            cancel_event.set()
+            self._record_fast(slow_backend, duration, fast_elapsed)
+            return fast_text, "fast"
+        thread.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        with self._lock:
+            self.slow_wins += 1
+        return outcome.get('text', ""), "slow"
+
+    def get_status(self):
+        total = self.fast_wins + self.slow_wins
+        return {
+            'fast_wins': self.fast_wins,
+            'slow_wins': self.slow_wins,
+            'fast_win_rate': round(self.fast_wins / total, 3) if total else None,
+            'latency_saved_seconds': round(self.saved_seconds, 2),
+            'min_confidence': self.min_confidence,
+        }
+
+class SttRouter:
+    def __init__(self, latency_budget=STT_LATENCY_BUDGET, speculative=None):
+        self.latency_budget = latency_budget
+        self.speculative = speculative
+        self.backends = []
+        self.pending = 0
+        self.decisions = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def add_backend(self, backend):
+        self.backends.append(backend)
+        self.backends.sort(key=lambda b: b.quality, reverse=True)
+        return backend
+
+    def _pick(self, candidates, duration, backlog, has_stream):
+        # Unmeasured backends are judged by their configured default rtf
+        for backend in candidates:
+            expected = backend.estimate(duration, has_stream) * (backlog + 1)
+            if expected <= self.latency_budget:
+                return backend, expected, "within budget" if backend.samples else "within budget, default rtf"
+        fastest = min(candidates, key=lambda b: b.estimate(duration, has_stream))
+        return fastest, fastest.estimate(duration, has_stream) * (backlog + 1), "over budget, fastest"
+
+    def choose(self, duration, backlog=0, has_stream=False, exclude=()):
+        candidates = [b for b in self.backends if b.name not in exclude]
+        if not candidates:
+            return None, None, "no backend ready"
+        preferred, expected, reason = self._pick(candidates, duration, backlog, has_stream)
+        if preferred.is_loaded():
+            return preferred, expected, reason
+        if preferred.warmup is not None:
+            preferred.warmup()
+        loaded = [b for b in candidates if b.is_loaded()]
+        if not loaded:
+            return None, None, "no backend ready"
+        backend, expected, reason = self._pick(loaded, duration, backlog, has_stream)
+        return backend, expected, f"{reason}, {preferred.name} warming up"
+
+    def transcribe(self, audio_np, transcription=None, backlog=None, sample_rate=16000):
+        duration = len(audio_np) / sample_rate
+        has_stream = transcription is not None
+        with self._lock:
+            queued = self.pending + (backlog or 0)
+            self.pending += 1
+        try:
+            tried = set()
+            while True:
+                backend, expected, reason = self.choose(duration, queued, has_stream, exclude=tried)
+                if backend is None:
+                    logger.warning(f"STT router: no backend available for {duration:.2f}s utterance")
+                    return ""
+                tried.add(backend.name)
+                started = time.time()
+                winner = None
+                try:
+                    if backend.streaming and has_stream:
+                        text = transcription
+                    elif self.speculative is not None and backend.cancellable:
+                        text, winner = self.speculative.run(audio_np, backend, duration, transcription)
+                    elif backend.uses_transcription:
+                        text = backend.transcribe(audio_np, transcription=transcription)
+                    else:
+                        text = backend.transcribe(audio_np)
+                except Exception as e:
+                    backend.failures += 1
+                    logger.error(f"STT router: {backend.name} failed: {e}")
+                    continue
+                elapsed = time.time() - started
+                if not (backend.streaming and has_stream) and winner != "fast":
+                    backend.record(duration, elapsed)
+                if winner:
+                    reason = f"{reason}, speculative {winner} path"
+                decision = {
+                    'backend': backend.name,
+                    'reason': reason,
+                    'duration': round(duration, 2),
+                    'backlog': queued,
+                    'expected': round(expected, 3),
+                    'actual': round(elapsed, 3),
+                    'budget': self.latency_budget,
+                    'timestamp': time.time(),
+                }
+                self.decisions.append(decision)
+                logger.info(f"STT router: {backend.name} ({reason}) for {duration:.2f}s audio, "
+                            f"backlog {queued}, expected {expected:.2f}s, took {elapsed:.2f}s")
+                return text
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def get_status(self):
+        return {
+            'latency_budget': self.latency_budget,
+            'pending': self.pending,
+            'backends': {b.name: b.get_status() for b in self.backends},
+            'recent_decisions': list(self.decisions)[-10:],
+            'speculative': self.speculative.get_status() if self.speculative else None,
+        }
+
+def _pool_backend(name, worker_pool, model_name, rtf, quality):
+    return SttBackend(
+        name, lambda audio_np, cancel_event=None: worker_pool.transcribe(audio_np, model_name, cancel_event),
+        rtf=rtf, quality=quality, is_loaded=lambda: worker_pool.is_ready(model_name), cancellable=True
+    )
+
+def create_stt_router(stt_vosk=None, latency_budget=STT_LATENCY_BUDGET, command_recognizer=None,
+                      stt_vosk_detailed=None, speculative=STT_SPECULATIVE, worker_pool=None):
+    from STT.sttWhisper import whisper_manager, get_whisper_manager, get_whisper_batcher, WHISPER_MODEL, WHISPER_SMALL_MODEL
+    router = SttRouter(latency_budget)
+    if whisper_manager.is_available() and worker_pool is not None and worker_pool.size > 0:
+        router.add_backend(_pool_backend("whisper", worker_pool, WHISPER_MODEL, rtf=1.5, quality=2))
+        if WHISPER_SMALL_MODEL:
+            router.add_backend(_pool_backend("whisper-small", worker_pool, WHISPER_SMALL_MODEL, rtf=0.4, quality=1))
+    elif whisper_manager.is_available():
+        router.add_backend(SttBackend(
+            "whisper", get_whisper_batcher(WHISPER_MODEL).transcribe, rtf=1.5, quality=2,
+            is_loaded=lambda: whisper_manager.state == "ready", warmup=whisper_manager.warmup, cancellable=True
+        ))
+        if WHISPER_SMALL_MODEL:
+            small_manager = get_whisper_manager(WHISPER_SMALL_MODEL)
+            router.add_backend(SttBackend(
+                "whisper-small", get_whisper_batcher(WHISPER_SMALL_MODEL).transcribe,
+                rtf=0.4, quality=1, is_loaded=lambda: small_manager.state == "ready", warmup=small_manager.warmup,
+                cancellable=True
+            ))
+    if whisper_manager.is_available():
+        if speculative and (stt_vosk_detailed or stt_vosk):
+            from STT.AdaptiveEndpointer import load_fallback_parser, parses_to_command
+            parse_function = load_fallback_parser()
+            router.speculative = SpeculativeDecoder(
+                stt_vosk_detailed, lambda text: parses_to_command(text, parse_function)
+            )
+    if command_recognizer is not None and command_recognizer.is_available():
+        router.add_backend(SttBackend(
+            "vosk-command", command_recognizer.transcribe, rtf=0.05, quality=0.5, uses_transcription=True
+        ))
+    if stt_vosk:
+        router.add_backend(SttBackend("vosk", stt_vosk, rtf=0.1, quality=0, streaming=True))
+    return router
\ No newline at end of file
@@ -0,0 +1,374 @@
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+try:
+    from config import STT_WORKERS, STT_WORKER_TIMEOUT
+except ImportError:
+    STT_WORKERS = 0
+    STT_WORKER_TIMEOUT = 120
+
+try:
+    from config import WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT
+except ImportError:
+    WHISPER_BATCH_SIZE = 4
+    WHISPER_BATCH_WAIT = 0.05
+
+class _CancelledTasks:
+    """Ids of the tasks the parent cancelled, fed through the worker's cancel queue."""
+
+    def __init__(self, cancel_queue):
+        self.cancel_queue = cancel_queue
+        self.task_ids = set()
+
+    def drain(self):
+        while True:
+            try:
+                self.task_ids.add(self.cancel_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def reset(self):
+        # Called before a batch is announced, so nothing queued can belong to it yet
+        self.drain()
+        self.task_ids.clear()
+
+class _TaskCancel:
+    def __init__(self, cancelled, task_id):
+        self.cancelled = cancelled
+        self.task_id = task_id
+
+    def is_set(self):
+        self.cancelled.drain()
+        return self.task_id in self.cancelled.task_ids
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Before 3.13 attaching registers the block with the resource tracker as well.
+    # The parent owns and unlinks it, so keep the worker from registering it at all.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+def _collect_tasks(task_queue, first_task, batch_size, batch_wait):
+    tasks = [first_task]
+    deadline = time.time() + batch_wait
+    while len(tasks) < batch_size:
+        remaining = deadline - time.time()
+        try:
+            task = task_queue.get(timeout=remaining) if remaining > 0 else task_queue.get_nowait()
+        except queue.Empty:
+            break
+        if task is None:
+            return tasks, True
+        tasks.append(task)
+    return tasks, False
+
+def _run_batch(worker_id, result_conn, cancelled, model_name, tasks):
+    from STT.sttWhisper import transcribe_batch, get_whisper_manager
+    cancelled.reset()
+    for task in tasks:
+        result_conn.send(("started", worker_id, task[0]))
+    started = time.time()
+    blocks = []
+    attached = []
+    audio_list = []
+    try:
+        for task in tasks:
+            task_id, shm_name, n_samples, _ = task
+            try:
+                blocks.append(_attach_shared_memory(shm_name))
+            except FileNotFoundError:
+                # Cancelled before it reached us; the parent already released the block
+                result_conn.send(("done", worker_id, task_id, "", None, 0.0, None))
+                continue
+            attached.append(task)
+            audio_list.append(np.ndarray((n_samples,), dtype=np.float32, buffer=blocks[-1].buf))
+        texts, stats = transcribe_batch(audio_list, get_whisper_manager(model_name),
+                                        [_TaskCancel(cancelled, task[0]) for task in attached],
+                                        with_stats=True) if attached else ([], [])
+        audio_list.clear()
+        for task, text, decode_stats in zip(attached, texts, stats):
+            result_conn.send(("done", worker_id, task[0], text, None, time.time() - started, decode_stats))
+    except Exception as e:
+        audio_list.clear()
+        for task in attached:
+            result_conn.send(("done", worker_id, task[0], "", str(e), time.time() - started, None))
+    finally:
+        for shm in blocks:
+            shm.close()
+
+def _worker_main(worker_id, task_queue, result_conn, cancel_queue, warmup_models, batch_size, batch_wait):
+    from STT.sttWhisper import get_whisper_manager
+    cancelled = _CancelledTasks(cancel_queue)
+    for model_name in warmup_models:
+        try:
+            get_whisper_manager(model_name).load()
+        except Exception as e:
+            result_conn.send(("log", worker_id, f"warmup of {model_name} failed: {e}"))
+    result_conn.send(("ready", worker_id, [m for m in warmup_models if get_whisper_manager(m).state == "ready"]))
+    stopping = False
+    while not stopping:
+        task = task_queue.get()
+        if task is None:
+            break
+        tasks, stopping = _collect_tasks(task_queue, task, batch_size, batch_wait)
+        by_model = {}
+        for task in tasks:
+            by_model.setdefault(task[3], []).append(task)
+        for model_name, model_tasks in by_model.items():
+            _run_batch(worker_id, result_conn, cancelled, model_name, model_tasks)
+
+class _WorkerHandle:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+        self.cancel_queue = None
+        self.result_conn = None
+        self.current_tasks = set()
+        self.ready_models = []
+        self.processed = 0
+        self.failures = 0
+        self.restarts = 0
+        self.started_at = None
+        self.last_elapsed = None
+        self.last_decode = None
+        self.next_restart = 0.0
+        self.crash_streak = 0
+
+class SttWorkerPool:
+    """Runs Whisper in separate processes so decoding never holds the API process's GIL.
+
+    Each worker micro-batches the tasks it finds queued within batch_wait seconds.
+    Audio is copied once into a shared-memory block that the worker maps directly;
+    only the block name travels over the task queue and results come back over a
+    pipe per worker, so a crashing worker cannot wedge the others. Crashed workers
+    are restarted and their in-flight task is retried once.
+    """
+
+    def __init__(self, size=STT_WORKERS, warmup_models=(), timeout=STT_WORKER_TIMEOUT,
+                 batch_size=WHISPER_BATCH_SIZE, batch_wait=WHISPER_BATCH_WAIT):
+        self.size = size
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.warmup_models = list(warmup_models)
+        self.timeout = timeout
+        self.ctx = mp.get_context("spawn")
+        self.workers = []
+        self.task_queue = None
+        self.pending = {}
+        self._task_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.size <= 0 or self.workers:
+            return self
+        self._stop_event.clear()
+        self.task_queue = self.ctx.Queue()
+        for worker_id in range(self.size):
+            handle = _WorkerHandle(worker_id)
+            self.workers.append(handle)
+            self._spawn(handle)
+        for target, name in ((self._collect_results, "SttPoolResults"), (self._supervise, "SttPoolSupervisor")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for handle in self.workers:
+            handle.process.join(2)
+            if handle.process.is_alive():
+                handle.process.terminate()
+            if handle.result_conn is not None:
+                handle.result_conn.close()
+        with self._lock:
+            for task_id in list(self.pending):
+                self._finish(task_id, "", "worker pool stopped")
+        self.workers = []
+
+    def _spawn(self, handle):
+        handle.cancel_queue = self.ctx.Queue()
+        reader, writer = self.ctx.Pipe(duplex=False)
+        handle.process = self.ctx.Process(
+            target=_worker_main,
+            args=(handle.worker_id, self.task_queue, writer, handle.cancel_queue, self.warmup_models,
+                  self.batch_size, self.batch_wait),
+            name=f"SttWorker-{handle.worker_id}", daemon=True,
+        )
+        handle.process.start()
+        writer.close()
+        if handle.result_conn is not None:
+            handle.result_conn.close()
+        handle.result_conn = reader
+        handle.started_at = time.time()
+        handle.current_tasks = set()
+        handle.ready_models = []
+
+    def is_running(self):
+        return any(handle.process is not None and handle.process.is_alive() for handle in self.workers)
+
+    def is_ready(self, model_name):
+        if model_name not in self.warmup_models:
+            return self.is_running()
+        return any(model_name in handle.ready_models for handle in self.workers)
+
+    def submit(self, audio_np, model_name):
+        audio_np = np.ascontiguousarray(audio_np, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio_np.nbytes, 1))
+        np.ndarray(audio_np.shape, dtype=np.float32, buffer=shm.buf)[:] = audio_np
+        task_id = next(self._task_ids)
+        future = Future()
+        with self._lock:
+            self.pending[task_id] = {
+                'future': future,
+                'shm': shm,
+                'task': (task_id, shm.name, len(audio_np), model_name),
+                'attempts': 1,
+                'worker': None,
+            }
+        self.task_queue.put(self.pending[task_id]['task'])
+        return task_id, future
+
+    def transcribe(self, audio_np, model_name, cancel_event=None):
+        if cancel_event is not None and cancel_event.is_set():
+            return ""
+        task_id, future = self.submit(audio_np, model_name)
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                text, error = future.result(timeout=0.05)
+                break
+            except Exception:
+                if cancel_event is not None and cancel_event.is_set():
+                    self.cancel(task_id)
+                    return ""
+                if time.time() > deadline:
+                    self.cancel(task_id)
+                    raise TimeoutError(f"STT worker did not answer within {self.timeout}s")
+        if error:
+            raise RuntimeError(error)
+        return text
+
+    def cancel(self, task_id):
+        with self._lock:
+            entry = self.pending.get(task_id)
+            if entry is None:
+                return
+            worker = entry['worker']
+            if worker is not None:
+                self.workers[worker].cancel_queue.put(task_id)
+            self._finish(task_id, "", None)
+
+    def _finish(self, task_id, text, error):
+        entry = self.pending.pop(task_id, None)
+        if entry is None:
+            return
+        entry['shm'].close()
+        try:
+            entry['shm'].unlink()
+        except FileNotFoundError:
+            pass
+        if not entry['future'].done():
+            entry['future'].set_result((text, error))
+
+    def _collect_results(self):
+        while not self._stop_event.is_set():
+            connections = {handle.result_conn: handle for handle in self.workers if handle.result_conn is not None}
+            for conn in wait(list(connections), timeout=0.5):
+                try:
+                    message = conn.recv()
+                except (OSError, EOFError):
+                    # Dead worker; the supervisor opens a new pipe when it restarts it
+                    handle = connections[conn]
+                    if handle.result_conn is conn:
+                        handle.result_conn = None
+                    conn.close()
+                    continue
+                self._handle_message(connections[conn], message)
+
+    def _handle_message(self, handle, message):
+        kind, worker_id = message[0], message[1]
+        with self._lock:
+            if kind == "ready":
+                handle.ready_models = message[2]
+            elif kind == "started":
+                handle.current_tasks.add(message[2])
+                if message[2] in self.pending:
+                    self.pending[message[2]]['worker'] = worker_id
+            elif kind == "done":
+                _, _, task_id, text, error, elapsed, decode_stats = message
+                handle.current_tasks.discard(task_id)
+                if task_id in self.pending:
+                    handle.last_elapsed = elapsed
+                    handle.last_decode = decode_stats or handle.last_decode
+                    if error:
+                        handle.failures += 1
+                    else:
+                        handle.processed += 1
+                self._finish(task_id, text, error)
+            elif kind == "log":
+                print(f"⚠ STT worker {worker_id}: {message[2]}")
+
+    def _supervise(self):
+        while not self._stop_event.wait(1.0):
+            for handle in self.workers:
+                if handle.process.is_alive() or time.time() < handle.next_restart:
+                    continue
+                exitcode = handle.process.exitcode
+                handle.crash_streak = handle.crash_streak + 1 if time.time() - handle.started_at < 30 else 1
+                handle.next_restart = time.time() + min(2 ** (handle.crash_streak - 1), 60)
+                print(f"⚠ STT worker {handle.worker_id} exited with code {exitcode}, restarting")
+                with self._lock:
+                    for task_id in handle.current_tasks:
+                        entry = self.pending.get(task_id)
+                        if entry is None:
+                            continue
+                        if entry['attempts'] < 2:
+                            entry['attempts'] += 1
+                            entry['worker'] = None
+                            self.task_queue.put(entry['task'])
+                        else:
+                            self._finish(task_id, "", f"STT worker crashed (exit code {exitcode})")
+                    handle.restarts += 1
+                    handle.failures += 1
+                self._spawn(handle)
+
+    def get_status(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'healthy': bool(self.workers) and all(h.process.is_alive() for h in self.workers),
+                'pending': len(self.pending),
+                'workers': [{
+                    'worker_id': handle.worker_id,
+                    'pid': handle.process.pid if handle.process else None,
+                    'alive': handle.process.is_alive() if handle.process else False,
+                    'ready_models': list(handle.ready_models),
+                    'busy': bool(handle.current_tasks),
+                    'processed': handle.processed,
+                    'failures': handle.failures,
+                    'restarts': handle.restarts,
+                    'uptime': round(time.time() - handle.started_at, 1) if handle.started_at else None,
+                    'last_elapsed': round(handle.last_elapsed, 3) if handle.last_elapsed is not None else None,
+                    'last_decode': handle.last_decode,
+                } for handle in self.workers],
+            }
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+import webrtcvad
+
+VAD_FRAME_LENGTH = 480
+
+class FrameFeatureExtractor:
+    """Per-block energy, int16 PCM and cached webrtcvad decisions.
+
+    Features live in preallocated slots indexed by block number, so any block still
+    held by the capture ring can be looked up again without recomputation.
+    """
+
+    def __init__(self, vad, history_blocks, block_size=1024, sample_rate=16000, frame_length=VAD_FRAME_LENGTH):
+        self.vad = vad
+        self.history_blocks = history_blocks
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.frames_per_block = block_size // frame_length
+        self.energies = np.zeros(history_blocks, dtype=np.float32)
+        self.decisions = np.full((history_blocks, self.frames_per_block), -1, dtype=np.int8)
+        self.block_ids = np.full(history_blocks, -1, dtype=np.int64)
+        self.pcm = np.zeros((history_blocks, block_size), dtype=np.int16)
+        self._scaled = np.zeros(block_size, dtype=np.float32)
+        frames = self.pcm[:, :self.frames_per_block * frame_length].reshape(
+            history_blocks, self.frames_per_block, frame_length
+        )
+        self._frame_bytes = [[frames[s, f].data.cast('B') for f in range(self.frames_per_block)]
+                             for s in range(history_blocks)]
+
+    def analyze(self, audio_block, block_id):
+        slot = block_id % self.history_blocks
+        np.multiply(audio_block, 32767, out=self._scaled)
+        np.copyto(self.pcm[slot], self._scaled, casting='unsafe')
+        self.energies[slot] = np.sqrt(np.dot(audio_block, audio_block) / len(audio_block))
+        self.decisions[slot] = -1
+        self.block_ids[slot] = block_id
+        return slot
+
+    def has_block(self, block_id):
+        return block_id >= 0 and self.block_ids[block_id % self.history_blocks] == block_id
+
+    def energy(self, block_id):
+        return float(self.energies[block_id % self.history_blocks])
+
+    def vad_decisions(self, block_id):
+        slot = block_id % self.history_blocks
+        row = self.decisions[slot]
+        frame_bytes = self._frame_bytes[slot]
+        for f in range(self.frames_per_block):
+            if row[f] < 0:
+                row[f] = self.vad.is_speech(frame_bytes[f], self.sample_rate)
+        return row
+
+    def speech_ratio(self, block_id):
+        if self.frames_per_block == 0:
+            return 0.0
+        return float(np.count_nonzero(self.vad_decisions(block_id) > 0)) / self.frames_per_block
+
+    def mean_energy(self, first_block, last_block):
+        """RMS over blocks [first_block, last_block) using the cached block energies."""
+        ids = np.arange(max(first_block, last_block - self.history_blocks), last_block)
+        if len(ids) == 0:
+            return 0.0
+        energies = self.energies[ids % self.history_blocks]
+        return float(np.sqrt(np.mean(energies.astype(np.float64) ** 2)))
+
+
+def _legacy_block_cost(audio_block, vad, sample_rate):
+    energy = np.sqrt(np.mean(audio_block**2))
+    energy = np.sqrt(np.mean(audio_block**2))
+    pcm_data = (audio_block * 32767).astype(np.int16).tobytes()
+    frame_length = VAD_FRAME_LENGTH
+    speech_frames = 0
+    for i in range(0, len(pcm_data), frame_length*2):
+        frame = pcm_data[i:i+frame_length*2]
+        if len(frame) < frame_length*2:
+            break
+        if vad.is_speech(frame, sample_rate=sample_rate):
+            speech_frames += 1
+    return energy, speech_frames
+
+def benchmark_vad_features(seconds=30, block_size=1024, sample_rate=16000):
+    vad = webrtcvad.Vad(3)
+    n_blocks = int(seconds * sample_rate / block_size)
+    rng = np.random.default_rng(0)
+    t = np.arange(block_size) / sample_rate
+    blocks = [(0.05 * rng.standard_normal(block_size) + 0.2 * np.sin(2 * np.pi * 200 * (t + i))).astype(np.float32)
+              for i in range(n_blocks)]
+
+    started = time.perf_counter()
+    for block in blocks:
+        _legacy_block_cost(block, vad, sample_rate)
+    legacy = (time.perf_counter() - started) / n_blocks
+
+    extractor = FrameFeatureExtractor(vad, 64, block_size, sample_rate)
+    started = time.perf_counter()
+    for i, block in enumerate(blocks):
+        extractor.analyze(block, i)
+        extractor.energy(i)
+        extractor.speech_ratio(i)
+    vectorized = (time.perf_counter() - started) / n_blocks
+
+    started = time.perf_counter()
+    for i in range(n_blocks - 64, n_blocks):
+        extractor.speech_ratio(i)
+    cached = (time.perf_counter() - started) / 64
+
+    return {
+        'blocks': n_blocks,
+        'legacy_us': legacy * 1e6,
+        'vectorized_us': vectorized * 1e6,
+        'cached_lookup_us': cached * 1e6,
+        'block_budget_us': block_size / sample_rate * 1e6,
+    }
+
+def test_vad_features():
+    result = benchmark_vad_features()
+    print("="*60)
+    print(f"VAD FEATURE BENCHMARK ({result['blocks']} blocks)")
+    print("="*60)
+    print(f"Legacy per-block cost:     {result['legacy_us']:8.1f} us")
+    print(f"Vectorized per-block cost: {result['vectorized_us']:8.1f} us")
+    print(f"Cached decision lookup:    {result['cached_lookup_us']:8.1f} us")
+    print(f"Real-time budget per block: {result['block_budget_us']:7.1f} us")
+
+if __name__ == "__main__":
+    test_vad_features()
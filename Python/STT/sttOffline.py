@@ -1,19 +1,227 @@
 import os
+import re
 import json
+import threading
 import numpy as np
 from vosk import Model, KaldiRecognizer
 
+try:
+    from config import VOSK_COMMAND_MODEL, VOSK_COMMAND_MIN_CONFIDENCE
+except ImportError:
+    VOSK_COMMAND_MODEL = "vosk-model-small-en-us-0.15"
+    VOSK_COMMAND_MIN_CONFIDENCE = 0.8
+
 vosk_model_path = os.path.join(os.path.dirname(__file__), "vosk-model-en-us-0.22")
 if not os.path.exists(vosk_model_path):
     raise Exception(f"Vosk model folder not found at {vosk_model_path}")
+vosk_command_model_path = os.path.join(os.path.dirname(__file__), VOSK_COMMAND_MODEL) if VOSK_COMMAND_MODEL else None
+
+model = None
+recognizer = None
+_model_lock = threading.Lock()
 
-model = Model(vosk_model_path)
-recognizer = KaldiRecognizer(model, 16000)
+def get_vosk_model():
+    global model, recognizer
+    with _model_lock:
+        if model is None:
+            model = Model(vosk_model_path)
+            recognizer = KaldiRecognizer(model, 16000)
+    return model
 
 def stt_vosk(audio_np):
+    get_vosk_model()
     data_bytes = (audio_np * 32767).astype(np.int16).tobytes()
     if recognizer.AcceptWaveform(data_bytes):
         result = json.loads(recognizer.Result())
     else:
         result = json.loads(recognizer.PartialResult())
-    return result.get("text", "").strip()
\ No newline at end of file
+    return result.get("text", "").strip()
+
+def _min_word_confidence(result):
+    return min((w.get("conf", 0.0) for w in result.get("result", [])), default=0.0)
+
+class VoskTranscript(str):
+    """Transcript text that also carries the lowest Vosk word confidence."""
+
+    def __new__(cls, text, confidence=0.0):
+        transcript = super().__new__(cls, text)
+        transcript.confidence = confidence
+        return transcript
+
+def stt_vosk_detailed(audio_np):
+    recognizer = KaldiRecognizer(get_vosk_model(), 16000)
+    recognizer.SetWords(True)
+    recognizer.AcceptWaveform((audio_np * 32767).astype(np.int16).tobytes())
+    result = json.loads(recognizer.FinalResult())
+    return result.get("text", "").strip(), _min_word_confidence(result)
+
+class VoskStream:
+    def __init__(self, on_partial=None, sample_rate=16000):
+        self.recognizer = KaldiRecognizer(get_vosk_model(), sample_rate)
+        self.recognizer.SetWords(True)
+        self.on_partial = on_partial
+        self.segments = []
+        self.confidences = []
+        self.last_partial = ""
+
+    def start(self):
+        self.recognizer.Reset()
+        self.segments = []
+        self.confidences = []
+        self.last_partial = ""
+
+    def _add_segment(self, result):
+        text = result.get("text", "").strip()
+        if text:
+            self.segments.append(text)
+            self.confidences.append(_min_word_confidence(result))
+
+    def accept(self, audio_block):
+        data_bytes = (audio_block.flatten() * 32767).astype(np.int16).tobytes()
+        if self.recognizer.AcceptWaveform(data_bytes):
+            self._add_segment(json.loads(self.recognizer.Result()))
+            partial = " ".join(self.segments)
+        else:
+            pending = json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+            partial = " ".join(self.segments + [pending]).strip()
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            if self.on_partial:
+                try:
+                    self.on_partial(partial)
+                except Exception as e:
+                    print(f"Partial transcript callback failed: {e}")
+        return partial
+
+    def finish(self):
+        self._add_segment(json.loads(self.recognizer.FinalResult()))
+        final_text = VoskTranscript(" ".join(self.segments).strip(), min(self.confidences, default=0.0))
+        self.segments = []
+        self.confidences = []
+        self.last_partial = ""
+        return final_text
+
+FALLBACK_PARSE_PHRASES = [
+    "search", "search for", "find", "lookup", "look up", "google", "go to", "open", "use", "launch", "start",
+    "switch to", "switch back", "previous app", "focus on", "create", "make", "file", "folder", "called",
+    "named", "titled", "open it", "open in", "write", "and", "on", "in", "for", "a", "the", "my", "to",
+    "browser", "chrome", "firefox", "edge", "safari", "brave", "opera", "vs code", "visual studio code",
+    "code editor", "notepad", "terminal", "calculator", "youtube", "instagram", "facebook", "twitter",
+    "amazon", "reddit", "wikipedia", "spotify", "linkedin", "github", "netflix", "whatsapp", "telegram",
+    "volume up", "volume down", "mute", "screenshot", "hello", "hi", "thank you", "thanks", "stop",
+    "exit", "quit", "goodbye", "yes", "no",
+]
+
+_PHRASE_RE = re.compile(r"^[a-z][a-z' ]*$")
+_ALTERNATION_RE = re.compile(r"\(([a-z' |]+)\)")
+
+def _patterns_to_phrases(patterns):
+    phrases = set()
+    for pattern in patterns:
+        for group in _ALTERNATION_RE.findall(pattern):
+            phrases.update(p.strip() for p in group.split("|") if _PHRASE_RE.match(p.strip()))
+    return phrases
+
+def build_command_vocabulary(classifier=None, system_controller=None, app_controller=None):
+    phrases = set(FALLBACK_PARSE_PHRASES)
+    if classifier is not None:
+        phrases |= _patterns_to_phrases(classifier.system_patterns + classifier.web_patterns)
+    if system_controller is not None:
+        for app_name in list(system_controller.installed_apps):
+            app_name = app_name.lower().strip()
+            if _PHRASE_RE.match(app_name) and len(app_name) > 1:
+                phrases.add(app_name)
+    if app_controller is not None:
+        for names in app_controller.get_command_names().values():
+            phrases.update(name for name in names if _PHRASE_RE.match(name))
+    return sorted(phrases)
+
+class VoskCommandRecognizer:
+    """Vosk recognizer restricted to the command vocabulary.
+
+    Runtime grammars need a model with a dynamic graph (the small en-us models);
+    the large model ignores the phrase list, so command mode is only available when
+    VOSK_COMMAND_MODEL is present. Low-confidence results fall back to open vocabulary.
+    """
+
+    def __init__(self, model_path=vosk_command_model_path, min_confidence=VOSK_COMMAND_MIN_CONFIDENCE,
+                 sample_rate=16000):
+        self.model_path = model_path
+        self.min_confidence = min_confidence
+        self.sample_rate = sample_rate
+        self.model = None
+        self.recognizer = None
+        self.sources = {}
+        self.signature = None
+        self.vocabulary_size = 0
+        self.rebuilds = 0
+        self.accepted = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return bool(self.model_path) and os.path.exists(self.model_path)
+
+    def set_sources(self, classifier=None, system_controller=None, app_controller=None):
+        with self._lock:
+            self.sources = {
+                'classifier': classifier,
+                'system_controller': system_controller,
+                'app_controller': app_controller,
+            }
+            self.signature = None
+
+    def _current_signature(self):
+        system_controller = self.sources.get('system_controller')
+        apps = tuple(sorted(system_controller.installed_apps)) if system_controller is not None else ()
+        return hash(apps), tuple(id(source) for source in self.sources.values())
+
+    def _ensure_recognizer(self):
+        signature = self._current_signature()
+        if self.recognizer is not None and signature == self.signature:
+            return
+        if self.model is None:
+            self.model = Model(self.model_path)
+        vocabulary = build_command_vocabulary(**self.sources)
+        self.recognizer = KaldiRecognizer(self.model, self.sample_rate, json.dumps(vocabulary + ["[unk]"]))
+        self.recognizer.SetWords(True)
+        self.signature = signature
+        self.vocabulary_size = len(vocabulary)
+        self.rebuilds += 1
+        print(f"✓ Vosk command grammar built with {len(vocabulary)} phrases")
+
+    def recognize(self, audio_np):
+        with self._lock:
+            self._ensure_recognizer()
+            self.recognizer.Reset()
+            data_bytes = (audio_np * 32767).astype(np.int16).tobytes()
+            self.recognizer.AcceptWaveform(data_bytes)
+            result = json.loads(self.recognizer.FinalResult())
+        words = [w for w in result.get("result", []) if w.get("word") != "[unk]"]
+        text = " ".join(w["word"] for w in words).strip()
+        unknown = "[unk]" in result.get("text", "")
+        confidence = min((w.get("conf", 0.0) for w in words), default=0.0)
+        return text, confidence, unknown
+
+    def transcribe(self, audio_np, transcription=None):
+        text, confidence, unknown = self.recognize(audio_np)
+        if text and not unknown and confidence >= self.min_confidence:
+            self.accepted += 1
+            return text
+        self.fallbacks += 1
+        if transcription is not None:
+            return transcription
+        return stt_vosk(audio_np)
+
+    def get_status(self):
+        return {
+            'model': os.path.basename(self.model_path) if self.model_path else None,
+            'available': self.is_available(),
+            'vocabulary_size': self.vocabulary_size,
+            'rebuilds': self.rebuilds,
+            'accepted': self.accepted,
+            'fallbacks': self.fallbacks,
+            'min_confidence': self.min_confidence,
+        }
+
+command_recognizer = VoskCommandRecognizer()
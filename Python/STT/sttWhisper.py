@@ -1,7 +1,11 @@
-import torch
+import gc
+import importlib.util
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import numpy as np
-import torchaudio
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
 import sys
 from pathlib import Path
 
@@ -12,49 +16,639 @@ try:
 except ImportError:
     PRIMARY_LANGUAGE = "english"
 
-if torch.cuda.is_available():
-    device = "cuda"
-elif torch.backends.mps.is_available():
-    device = "mps"
-else:
-    device = "cpu"
+try:
+    from config import WHISPER_MODEL, WHISPER_SMALL_MODEL, WHISPER_IDLE_TIMEOUT, WHISPER_PRECISION
+except ImportError:
+    WHISPER_MODEL = "openai/whisper-medium"
+    WHISPER_SMALL_MODEL = "openai/whisper-base"
+    WHISPER_IDLE_TIMEOUT = 600
+    WHISPER_PRECISION = "fp32"
+
+try:
+    from config import WHISPER_DECODING, WHISPER_DRAFT_MODEL
+except ImportError:
+    WHISPER_DECODING = "adaptive"
+    WHISPER_DRAFT_MODEL = None
+
+try:
+    from config import WHISPER_ESCALATE_LOGPROB, WHISPER_TOKENS_PER_SECOND, WHISPER_MIN_TOKENS
+except ImportError:
+    WHISPER_ESCALATE_LOGPROB = -0.6
+    WHISPER_TOKENS_PER_SECOND = 8
+    WHISPER_MIN_TOKENS = 16
+
+try:
+    from config import WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT
+except ImportError:
+    WHISPER_BATCH_SIZE = 4
+    WHISPER_BATCH_WAIT = 0.05
+
+SUSPICIOUS_RANGES = [
+    (0x1780, 0x17FF),
+    (0x0E00, 0x0E7F),
+    (0x0600, 0x06FF),
+    (0x4E00, 0x9FFF),
+    (0x3040, 0x309F),
+    (0x30A0, 0x30FF),
+]
+
+def _select_device():
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    elif torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+def _cpu_supports_bf16():
+    import torch
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        pass
+    try:
+        return torch.backends.cpu.get_cpu_capability() == "AVX512"
+    except Exception:
+        return False
+
+def _apply_precision(model, device, precision):
+    import torch
+    if device != "cpu" or precision == "fp32":
+        return model, "fp32"
+    if precision == "int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model, "int8"
+    if precision == "bf16":
+        if _cpu_supports_bf16():
+            return model.to(torch.bfloat16), "bf16"
+        print("⚠ CPU has no native bf16 support, keeping Whisper in fp32")
+        return model, "fp32"
+    print(f"⚠ Unknown Whisper precision '{precision}', keeping fp32")
+    return model, "fp32"
+
+class WhisperModelManager:
+    def __init__(self, model_name=WHISPER_MODEL, idle_timeout=WHISPER_IDLE_TIMEOUT, precision=WHISPER_PRECISION):
+        self.model_name = model_name
+        self.idle_timeout = idle_timeout
+        self.precision = precision
+        self.active_precision = None
+        self.processor = None
+        self.model = None
+        self.device = None
+        self.state = "unloaded"
+        self.error = None
+        self.load_seconds = None
+        self.last_used = None
+        self.active_requests = 0
+        self._lock = threading.RLock()
+        self._idle_timer = None
+        self._warmup_thread = None
+        self.decode_stats = deque(maxlen=100)
+
+    def is_available(self):
+        return all(importlib.util.find_spec(name) is not None for name in ("torch", "transformers"))
+
+    def load(self):
+        with self._lock:
+            if self.model is not None:
+                return
+            self.state = "loading"
+            self.error = None
+            started = time.time()
+            try:
+                from transformers import WhisperProcessor, WhisperForConditionalGeneration
+                device = _select_device()
+                processor = WhisperProcessor.from_pretrained(self.model_name)
+                model = WhisperForConditionalGeneration.from_pretrained(self.model_name).to(device)
+                model.config.forced_decoder_ids = None
+                model, active_precision = _apply_precision(model, device, self.precision)
+                model.eval()
+            except Exception as e:
+                self.state = "error"
+                self.error = str(e)
+                raise
+            self.processor = processor
+            self.model = model
+            self.device = device
+            self.active_precision = active_precision
+            self.load_seconds = time.time() - started
+            self.last_used = time.time()
+            self.state = "ready"
+            print(f"✓ Whisper {self.model_name} ({active_precision}) initialized on {device} in "
+                  f"{self.load_seconds:.1f}s with PRIMARY_LANGUAGE: {PRIMARY_LANGUAGE}")
+        self._schedule_idle_check()
+
+    def warmup(self):
+        if self.model is not None or (self._warmup_thread and self._warmup_thread.is_alive()):
+            return
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"⚠ Whisper warmup failed: {e}")
+        self._warmup_thread = threading.Thread(target=run, name="WhisperWarmup", daemon=True)
+        self._warmup_thread.start()
+
+    def acquire(self):
+        with self._lock:
+            self.load()
+            self.active_requests += 1
+            self.last_used = time.time()
+            return self.processor, self.model, self.device
+
+    def release(self):
+        with self._lock:
+            self.active_requests = max(0, self.active_requests - 1)
+            self.last_used = time.time()
+        self._schedule_idle_check()
+
+    def unload(self):
+        with self._lock:
+            if self.model is None or self.active_requests > 0:
+                return False
+            device = self.device
+            self.processor = None
+            self.model = None
+            self.device = None
+            self.state = "unloaded"
+        gc.collect()
+        if device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+        print(f"Whisper {self.model_name} unloaded")
+        return True
+
+    def record_decodes(self, stats):
+        with self._lock:
+            self.decode_stats.extend(stats)
+
+    def get_decode_summary(self):
+        with self._lock:
+            recent = list(self.decode_stats)
+        if not recent:
+            return None
+        escalated = [s for s in recent if s['escalated']]
+        token_counts = [s['tokens'] for s in recent if s['tokens'] is not None]
+        return {
+            'utterances': len(recent),
+            'escalation_rate': round(len(escalated) / len(recent), 3),
+            'escalations': {reason: sum(1 for s in escalated if s['escalated'] == reason)
+                            for reason in ("low_logprob", "suspicious_script")},
+            'mean_tokens': round(sum(token_counts) / len(token_counts), 1) if token_counts else None,
+            'mean_seconds': round(sum(s['seconds'] for s in recent) / len(recent), 3),
+            'recent': recent[-5:],
+        }
+
+    def get_status(self):
+        return {
+            'model': self.model_name,
+            'state': self.state,
+            'device': self.device,
+            'precision': self.active_precision or self.precision,
+            'load_seconds': self.load_seconds,
+            'idle_seconds': time.time() - self.last_used if self.last_used else None,
+            'idle_timeout': self.idle_timeout,
+            'error': self.error,
+            'decoding': self.get_decode_summary(),
+        }
+
+    def _schedule_idle_check(self):
+        if not self.idle_timeout:
+            return
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._unload_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _unload_if_idle(self):
+        if self.last_used and time.time() - self.last_used >= self.idle_timeout:
+            self.unload()
+
+whisper_manager = WhisperModelManager()
+_managers = {WHISPER_MODEL: whisper_manager}
+_managers_lock = threading.Lock()
+
+def get_whisper_manager(model_name=WHISPER_MODEL):
+    with _managers_lock:
+        if model_name not in _managers:
+            _managers[model_name] = WhisperModelManager(model_name)
+        return _managers[model_name]
+
+def _cancel_criteria(cancel_events):
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            flags = torch.tensor([e is not None and e.is_set() for e in cancel_events], dtype=torch.bool)
+            # Beam search expands every utterance into num_beams consecutive rows
+            flags = flags.repeat_interleave(input_ids.shape[0] // len(cancel_events))
+            return flags.to(input_ids.device)
+
+    return StoppingCriteriaList([CancelCriteria()])
+
+def _is_cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
 
-model_name = "openai/whisper-medium"
-processor = WhisperProcessor.from_pretrained(model_name)
-model = WhisperForConditionalGeneration.from_pretrained(model_name).to(device)
+def has_suspicious_script(text):
+    return any(start <= ord(char) <= end for char in text for start, end in SUSPICIOUS_RANGES)
 
-model.config.forced_decoder_ids = None
+MAX_NEW_TOKENS = 440
 
-print(f"✓ Whisper initialized with PRIMARY_LANGUAGE: {PRIMARY_LANGUAGE}")
+def token_budget(duration):
+    """Upper bound on generated tokens for an utterance of `duration` seconds."""
+    return min(MAX_NEW_TOKENS, int(WHISPER_MIN_TOKENS + WHISPER_TOKENS_PER_SECOND * duration))
 
-def stt_whisper(audio_np):
-    audio_np = audio_np / np.max(np.abs(audio_np))
-    input_features = processor(audio_np, sampling_rate=16000, return_tensors="pt").input_features.to(device)
-    predicted_ids = model.generate(
+def _acquire_draft(manager):
+    """Draft model for assisted generation, or None when it cannot be used."""
+    if not WHISPER_DRAFT_MODEL or WHISPER_DRAFT_MODEL == manager.model_name:
+        return None
+    draft_manager = get_whisper_manager(WHISPER_DRAFT_MODEL)
+    try:
+        _, draft_model, _ = draft_manager.acquire()
+    except Exception as e:
+        print(f"⚠ Whisper draft model {WHISPER_DRAFT_MODEL} unavailable, decoding without it: {e}")
+        return None
+    return draft_manager, draft_model
+
+def _average_logprobs(outputs, pad_token_id):
+    import torch
+    generated = outputs.sequences[:, -len(outputs.scores):]
+    logprobs = torch.stack([torch.log_softmax(step.float(), dim=-1) for step in outputs.scores], dim=1)
+    token_logprobs = logprobs.gather(2, generated.unsqueeze(-1)).squeeze(-1)
+    mask = generated != pad_token_id
+    counts = mask.sum(dim=1)
+    totals = torch.where(mask, token_logprobs, torch.zeros_like(token_logprobs)).sum(dim=1)
+    return (totals / counts.clamp(min=1)).tolist(), counts.tolist()
+
+def _generate(processor, model, input_features, cancel_events, max_new_tokens, options, with_scores=False):
+    outputs = model.generate(
         input_features,
         language=PRIMARY_LANGUAGE,
         task="transcribe",
-        max_length=448,
-        num_beams=5,
+        max_new_tokens=max_new_tokens,
         temperature=0.0,
         compression_ratio_threshold=1.35,
         logprob_threshold=-1.0,
         no_repeat_ngram_size=3,
+        stopping_criteria=_cancel_criteria(cancel_events) if any(e is not None for e in cancel_events) else None,
+        return_dict_in_generate=with_scores,
+        output_scores=with_scores,
+        **options,
     )
-    transcription = processor.batch_decode(predicted_ids, skip_special_tokens=True)[0]
-    transcription = transcription.strip()
-    suspicious_ranges = [
-        (0x1780, 0x17FF),
-        (0x0E00, 0x0E7F),
-        (0x0600, 0x06FF),
-        (0x4E00, 0x9FFF),
-        (0x3040, 0x309F),
-        (0x30A0, 0x30FF),
-    ]
-    for char in transcription:
-        code = ord(char)
-        for start, end in suspicious_ranges:
-            if start <= code <= end:
-                print(f"⚠️  Detected non-Hindi/English script, likely wrong detection. Ignoring.")
-                return ""
-    return transcription
\ No newline at end of file
+    sequences = outputs.sequences if with_scores else outputs
+    texts = [text.strip() for text in processor.batch_decode(sequences, skip_special_tokens=True)]
+    if not with_scores:
+        return texts, None, None
+    logprobs, tokens = _average_logprobs(outputs, model.generation_config.pad_token_id)
+    return texts, logprobs, tokens
+
+def transcribe_batch(audio_list, manager=None, cancel_events=None, decoding=None, with_stats=False):
+    """Transcribes several utterances with one processor call and one generate call per pass.
+
+    Every input is padded to Whisper's 30 s window anyway, so utterances of any length
+    batch together. Cancelled entries are skipped, or come back empty. Generation is
+    capped at token_budget() of the longest utterance.
+
+    decoding is one of:
+      "adaptive": greedy first, then beam search only for utterances whose average
+                  token log-probability is below WHISPER_ESCALATE_LOGPROB or that trip
+                  the suspicious-script filter
+      "greedy" / "beam": a single pass with 1 or 5 beams
+      "assisted": greedy verified against WHISPER_DRAFT_MODEL proposals, no escalation
+    The greedy pass of "adaptive" and "assisted" uses the draft model when one is
+    configured; assisted generation only supports a batch of one.
+
+    With with_stats=True, returns (texts, stats) with one decode-stats dict per input.
+    """
+    manager = manager or whisper_manager
+    decoding = decoding or WHISPER_DECODING
+    cancel_events = list(cancel_events) if cancel_events is not None else [None] * len(audio_list)
+    results = [""] * len(audio_list)
+    stats = [None] * len(audio_list)
+    active = [i for i in range(len(audio_list)) if not _is_cancelled(cancel_events[i])]
+    if not active:
+        return (results, stats) if with_stats else results
+    events = [cancel_events[i] for i in active]
+    max_new_tokens = token_budget(max(len(audio_list[i]) for i in active) / 16000)
+    draft = None
+    if decoding in ("adaptive", "assisted") and len(active) == 1:
+        draft = _acquire_draft(manager)
+    first_options = {'num_beams': 5} if decoding == "beam" else {'num_beams': 1}
+    if draft is not None:
+        first_options['assistant_model'] = draft[1]
+    processor, model, device = manager.acquire()
+    started = time.time()
+    try:
+        batch = [audio_list[i] / np.max(np.abs(audio_list[i])) for i in active]
+        input_features = processor(batch, sampling_rate=16000, return_tensors="pt").input_features
+        input_features = input_features.to(device, dtype=model.dtype)
+        texts, logprobs, tokens = _generate(processor, model, input_features, events, max_new_tokens,
+                                            first_options, with_scores=decoding != "beam")
+        first_seconds = time.time() - started
+        reasons = [None] * len(active)
+        if decoding == "adaptive":
+            for k, text in enumerate(texts):
+                if _is_cancelled(events[k]):
+                    continue
+                if has_suspicious_script(text):
+                    reasons[k] = "suspicious_script"
+                elif logprobs[k] < WHISPER_ESCALATE_LOGPROB:
+                    reasons[k] = "low_logprob"
+        escalate = [k for k, reason in enumerate(reasons) if reason]
+        if escalate:
+            beam_texts, _, _ = _generate(processor, model, input_features[escalate], [events[k] for k in escalate],
+                                         max_new_tokens, {'num_beams': 5})
+            for k, text in zip(escalate, beam_texts):
+                texts[k] = text
+    finally:
+        manager.release()
+        if draft is not None:
+            draft[0].release()
+    elapsed = time.time() - started
+    for k, i in enumerate(active):
+        stats[i] = {
+            'decoding': decoding,
+            'assisted': draft is not None,
+            'escalated': reasons[k],
+            'avg_logprob': round(logprobs[k], 3) if logprobs else None,
+            'tokens': tokens[k] if tokens else None,
+            'max_new_tokens': max_new_tokens,
+            'capped': bool(tokens) and tokens[k] >= max_new_tokens,
+            'duration': round(len(audio_list[i]) / 16000, 2),
+            'batch_size': len(active),
+            'first_pass_seconds': round(first_seconds, 3),
+            'seconds': round(elapsed, 3),
+        }
+        if _is_cancelled(cancel_events[i]):
+            continue
+        if has_suspicious_script(texts[k]):
+            print(f"⚠️  Detected non-Hindi/English script, likely wrong detection. Ignoring.")
+            continue
+        results[i] = texts[k]
+    manager.record_decodes([stats[i] for i in active])
+    return (results, stats) if with_stats else results
+
+def stt_whisper(audio_np, manager=None, cancel_event=None):
+    return transcribe_batch([audio_np], manager, [cancel_event])[0]
+
+class WhisperBatcher:
+    """Micro-batches concurrent transcriptions for one Whisper model.
+
+    The first request opens a batch that closes after max_wait seconds or once
+    max_batch_size requests have arrived; the batch runs as a single generate call
+    and each caller gets its own result back through a Future.
+    """
+
+    def __init__(self, manager=None, max_batch_size=WHISPER_BATCH_SIZE, max_wait=WHISPER_BATCH_WAIT):
+        self.manager = manager or whisper_manager
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"WhisperBatcher-{self.manager.model_name}",
+                                                daemon=True)
+                self._thread.start()
+
+    def submit(self, audio_np, cancel_event=None):
+        future = Future()
+        self.requests.put((audio_np, cancel_event, future))
+        self._ensure_thread()
+        return future
+
+    def transcribe(self, audio_np, cancel_event=None):
+        if _is_cancelled(cancel_event):
+            return ""
+        future = self.submit(audio_np, cancel_event)
+        while True:
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeoutError:
+                if _is_cancelled(cancel_event):
+                    return ""
+
+    def transcribe_many(self, audio_list):
+        futures = [self.submit(audio_np) for audio_np in audio_list]
+        return [future.result() for future in futures]
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [request for request in self._collect() if not _is_cancelled(request[1])]
+            if not batch:
+                continue
+            audio_list, cancel_events, futures = zip(*batch)
+            started = time.time()
+            try:
+                transcriptions = transcribe_batch(list(audio_list), self.manager, list(cancel_events))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self.busy_seconds += time.time() - started
+            for future, transcription in zip(futures, transcriptions):
+                future.set_result(transcription)
+
+    def get_status(self):
+        with self._lock:
+            return {
+                'model': self.manager.model_name,
+                'max_batch_size': self.max_batch_size,
+                'max_wait': self.max_wait,
+                'queued': self.requests.qsize(),
+                'batches': self.batches,
+                'requests': self.items,
+                'mean_batch_size': round(self.items / self.batches, 2) if self.batches else None,
+                'largest_batch': self.largest_batch,
+                'mean_batch_seconds': round(self.busy_seconds / self.batches, 3) if self.batches else None,
+            }
+
+_batchers = {}
+
+def get_whisper_batcher(model_name=WHISPER_MODEL):
+    manager = get_whisper_manager(model_name)
+    with _managers_lock:
+        if model_name not in _batchers:
+            _batchers[model_name] = WhisperBatcher(manager)
+        return _batchers[model_name]
+
+def get_batching_status():
+    with _managers_lock:
+        return {name: batcher.get_status() for name, batcher in _batchers.items()}
+
+
+def benchmark_precisions(audio_np, precisions=("fp32", "int8", "bf16"), runs=3, model_name=WHISPER_MODEL):
+    import psutil
+    process = psutil.Process()
+    duration = len(audio_np) / 16000
+    results = []
+    for precision in precisions:
+        manager = WhisperModelManager(model_name, idle_timeout=0, precision=precision)
+        gc.collect()
+        rss_before = process.memory_info().rss
+        manager.load()
+        rss_loaded = process.memory_info().rss
+        stt_whisper(audio_np, manager)
+        timings = []
+        text = ""
+        for _ in range(runs):
+            started = time.perf_counter()
+            text = stt_whisper(audio_np, manager)
+            timings.append(time.perf_counter() - started)
+        mean_seconds = sum(timings) / len(timings)
+        results.append({
+            'precision': manager.active_precision,
+            'requested': precision,
+            'load_seconds': manager.load_seconds,
+            'model_mb': (rss_loaded - rss_before) / (1024 * 1024),
+            'peak_rss_mb': process.memory_info().rss / (1024 * 1024),
+            'mean_seconds': mean_seconds,
+            'rtf': mean_seconds / duration,
+            'text': text,
+        })
+        manager.unload()
+        del manager
+    return results
+
+
+def _load_test_audio(path=None):
+    import wave
+    if path:
+        with wave.open(path, 'rb') as wav:
+            frames = wav.readframes(wav.getnframes())
+            return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    t = np.arange(int(3 * 16000)) / 16000
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def benchmark_batching(audio_list, batch_sizes=(1, 2, 4, 8), model_name=WHISPER_MODEL):
+    manager = get_whisper_manager(model_name)
+    manager.load()
+    stt_whisper(audio_list[0], manager)
+    results = []
+    for batch_size in batch_sizes:
+        batcher = WhisperBatcher(manager, max_batch_size=batch_size)
+        started = time.perf_counter()
+        batcher.transcribe_many(audio_list)
+        elapsed = time.perf_counter() - started
+        status = batcher.get_status()
+        results.append({
+            'batch_size': batch_size,
+            'seconds': elapsed,
+            'per_utterance': elapsed / len(audio_list),
+            'throughput': len(audio_list) / elapsed,
+            'mean_batch_size': status['mean_batch_size'],
+        })
+    return results
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance and reference length, ignoring case and punctuation."""
+    import re
+    ref = re.sub(r"[^\w\s']", " ", reference.lower()).split()
+    hyp = re.sub(r"[^\w\s']", " ", hypothesis.lower()).split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+    return row[-1], len(ref)
+
+def load_corpus(directory):
+    """(name, audio, reference) for every .wav in directory with a matching .txt transcript."""
+    corpus = []
+    for wav_path in sorted(Path(directory).glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        if txt_path.exists():
+            corpus.append((wav_path.stem, _load_test_audio(str(wav_path)), txt_path.read_text().strip()))
+    return corpus
+
+def benchmark_decoding(corpus, decodings=None, model_name=WHISPER_MODEL):
+    decodings = decodings or ("beam", "greedy", "adaptive") + (("assisted",) if WHISPER_DRAFT_MODEL else ())
+    manager = get_whisper_manager(model_name)
+    manager.load()
+    results = []
+    for decoding in decodings:
+        transcribe_batch([corpus[0][1]], manager, decoding=decoding)
+        timings = []
+        errors = words = 0
+        for _, audio_np, reference in corpus:
+            started = time.perf_counter()
+            text = transcribe_batch([audio_np], manager, decoding=decoding)[0]
+            timings.append(time.perf_counter() - started)
+            edits, length = word_error_rate(reference, text)
+            errors += edits
+            words += length
+        timings.sort()
+        results.append({
+            'decoding': decoding,
+            'mean_seconds': sum(timings) / len(timings),
+            'p90_seconds': timings[int(0.9 * (len(timings) - 1))],
+            'wer': errors / words if words else 0.0,
+        })
+    return results
+
+def test_decoding():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    corpus = load_corpus(paths[0]) if paths else []
+    if not corpus:
+        print("Usage: python sttWhisper.py --decoding <dir with name.wav + name.txt pairs>")
+        return
+    print("="*70)
+    print(f"WHISPER DECODING BENCHMARK ({WHISPER_MODEL}, draft {WHISPER_DRAFT_MODEL}, {len(corpus)} utterances)")
+    print("="*70)
+    print(f"{'decoding':<10}{'mean s':>10}{'p90 s':>10}{'WER':>8}")
+    for row in benchmark_decoding(corpus):
+        print(f"{row['decoding']:<10}{row['mean_seconds']:>10.2f}{row['p90_seconds']:>10.2f}{row['wer']:>8.1%}")
+
+def test_batching():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    audio_list = [_load_test_audio(path) for path in paths] or [_load_test_audio()] * 8
+    print("="*70)
+    print(f"WHISPER BATCHING BENCHMARK ({WHISPER_MODEL}, {len(audio_list)} utterances)")
+    print("="*70)
+    print(f"{'batch':>6}{'total s':>10}{'s/utt':>10}{'utt/s':>10}{'mean batch':>12}")
+    for row in benchmark_batching(audio_list):
+        print(f"{row['batch_size']:>6}{row['seconds']:>10.2f}{row['per_utterance']:>10.2f}"
+              f"{row['throughput']:>10.2f}{row['mean_batch_size']:>12}")
+
+def test_precisions():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    audio_np = _load_test_audio(paths[0] if paths else None)
+    print("="*90)
+    print(f"WHISPER PRECISION BENCHMARK ({WHISPER_MODEL}, {len(audio_np) / 16000:.1f}s audio)")
+    print("="*90)
+    print(f"{'precision':<10}{'requested':<11}{'load s':>8}{'model MB':>10}{'peak MB':>10}{'decode s':>10}{'RTF':>8}  text")
+    for row in benchmark_precisions(audio_np):
+        print(f"{row['precision']:<10}{row['requested']:<11}{row['load_seconds']:>8.1f}{row['model_mb']:>10.0f}"
+              f"{row['peak_rss_mb']:>10.0f}{row['mean_seconds']:>10.2f}{row['rtf']:>8.2f}  {row['text'][:40]}")
+
+if __name__ == "__main__":
+    if "--batch" in sys.argv:
+        test_batching()
+    elif "--decoding" in sys.argv:
+        test_decoding()
+    else:
+        test_precisions()
\ No newline at end of file
@@ -2,10 +2,12 @@
 from CommandClassifier import CommandClassifier, CommandType
 from Browser.IntelligentBrowser import EnhancedIntelligentBrowser
 from GeminiAPI import GeminiAssistant
+from IntentEngine import local_intents
 from ConfirmationManager import ConfirmationManager
 from Application.ApplicationController import ApplicationController
 from Application.ContextManager import ContextManager
 import platform
+import threading
 import time
 from pathlib import Path
 
@@ -27,7 +29,25 @@ class SmartAssistant:
         self.confirmation_manager = ConfirmationManager()
         self.app_controller = ApplicationController()
         self.context_manager = ContextManager()
+        self.command_lock = threading.RLock()
         print("✓ Application Controller initialized for app control")
+    def bind_driver(self, driver):
+        if driver is self.driver:
+            return
+        self.driver = driver
+        self.browser = EnhancedIntelligentBrowser(driver, self.system_controller) if driver else None
+        if self.confirmation_manager.has_pending():
+            self.confirmation_manager.clear()
+    def _parse_command(self, transcription, current_context):
+        known_apps = self.system_controller.installed_apps if self.system_controller else None
+        intent = local_intents.parse(transcription, current_context, known_apps, parser=self.gemini)
+        if local_intents.is_confident(intent):
+            print(f"⚡ Local parse ({intent.source}, confidence {intent.confidence:.2f})")
+            local_intents.record(True, intent.command.get('action'))
+            return intent.command
+        command_json = self.gemini.parse_command_to_json(transcription, current_context)
+        local_intents.record(False, command_json.get('action') if isinstance(command_json, dict) else None)
+        return command_json
     def process_command(self, transcription):
         if not transcription or transcription.strip() == "":
             return False, "Empty transcription"
@@ -42,7 +62,7 @@ class SmartAssistant:
             return self._handle_confirmation(transcription)
         if self.gemini_available:
             try:
-                command_json = self.gemini.parse_command_to_json(transcription)
+                command_json = self._parse_command(transcription, current_context)
                 print(f"🤖 Action: {command_json.get('action', 'unknown')}")
                 action = command_json.get('action', 'unknown')
                 
@@ -888,8 +908,45 @@ class SmartAssistant:
         return "I understand. Is there anything specific you'd like me to do? I can control your system, search the web, or answer questions."
 
 
-def process_voice_command_smart(driver, system_controller, transcription):
-    assistant = SmartAssistant(driver, system_controller)
+class SessionRegistry:
+    def __init__(self):
+        self.sessions = {}
+        self.lock = threading.Lock()
+    def get(self, session_id="default", driver=None, system_controller=None):
+        with self.lock:
+            assistant = self.sessions.get(session_id)
+            if assistant is None:
+                assistant = SmartAssistant(driver, system_controller)
+                self.sessions[session_id] = assistant
+                return assistant
+        with assistant.command_lock:
+            if system_controller is not None and system_controller is not assistant.system_controller:
+                assistant.system_controller = system_controller
+                assistant.browser = None
+                assistant.driver = None
+            assistant.bind_driver(driver)
+        return assistant
+    def close(self, session_id):
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+    def get_session_info(self):
+        with self.lock:
+            sessions = dict(self.sessions)
+        return {
+            session_id: {
+                'browser_bound': assistant.browser is not None,
+                'pending_confirmation': assistant.confirmation_manager.has_pending(),
+                'context': assistant.context_manager.get_context_info(),
+            }
+            for session_id, assistant in sessions.items()
+        }
+
+
+session_registry = SessionRegistry()
+
+
+def process_voice_command_smart(driver, system_controller, transcription, session_id="default"):
+    assistant = session_registry.get(session_id, driver, system_controller)
     exit_commands = ["exit", "quit", "close", "stop", "close browser", "band karo", "bund karo"]
     if any(cmd in transcription.lower() for cmd in exit_commands):
         if driver:
@@ -897,6 +954,8 @@ def process_voice_command_smart(driver, system_controller, transcription):
                 driver.quit()
             except:
                 pass
+            assistant.bind_driver(None)
         return True, "Goodbye!"
-    success, message = assistant.process_command(transcription)
+    with assistant.command_lock:
+        success, message = assistant.process_command(transcription)
     return success, message
\ No newline at end of file
@@ -6,6 +6,7 @@ import asyncio
 import threading
 import queue
 import time
+import uuid
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
@@ -15,21 +16,32 @@ logger = logging.getLogger(__name__)
 
 sys.path.append(str(Path(__file__).parent))
 
-from STT.RTMicroPhone import stream_microPhone, SpeechDetector
-from STT.sttOffline import stt_vosk
-from STT.NetworkStatus import check_server_connectivity
+from STT.RTMicroPhone import stream_microPhone, SpeechDetector, get_pipeline_metrics
+from STT.sttOffline import stt_vosk, stt_vosk_detailed, VoskStream, command_recognizer
+from STT.NetworkStatus import connectivity_monitor
 from Browser.DriverManager import setup_driver
 from Browser.IntelligentBrowser import process_voice_command, EnhancedIntelligentBrowser
 from System.SystemController import SystemController
-from SmartAssistant import SmartAssistant, process_voice_command_smart
+from SmartAssistant import process_voice_command_smart, session_registry
+from ParseCache import parse_cache
+from IntentEngine import local_intents
+from GeminiAPI import GeminiAssistant
+from GeminiTransport import gemini_transport
+from PromptBuilder import prompt_builder
+
+from STT.sttWhisper import whisper_manager, get_whisper_manager, get_batching_status, WHISPER_MODEL, WHISPER_SMALL_MODEL, WHISPER_DRAFT_MODEL
+from STT.SttRouter import create_stt_router
+from STT.SttWorkerPool import SttWorkerPool
+
+WHISPER_AVAILABLE = whisper_manager.is_available()
+if not WHISPER_AVAILABLE:
+    logger.warning("Whisper STT not available - using Vosk only")
 
 try:
-    from STT.sttWhisper import stt_whisper
-    WHISPER_AVAILABLE = True
+    from config import STREAMING_VOSK, WHISPER_WARMUP
 except ImportError:
-    logger.warning("Whisper STT not available - using Vosk only")
-    WHISPER_AVAILABLE = False
-    stt_whisper = None
+    STREAMING_VOSK = True
+    WHISPER_WARMUP = True
 
 try:
     from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
@@ -48,12 +60,20 @@ except ImportError:
 browser_driver = None
 system_controller = None
 voice_queue = queue.Queue()
+# Built in initialize_system: spawned STT workers re-import this module and must not rebuild them
+stt_worker_pool = None
+stt_router = None
 websocket_connections = set()
 is_listening = False
+voice_listener = None
+voice_stop_event = threading.Event()
 speech_detector = None
+gemini_assistant = None
+event_loop = None
 
 class VoiceCommand(BaseModel):
     command: str
+    session_id: str = "default"
 
 class SystemStatus(BaseModel):
     status: str
@@ -88,6 +108,18 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def _broadcast_threadsafe(payload):
+    if event_loop is None or event_loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(manager.broadcast(json.dumps(payload)), event_loop)
+
+def _broadcast_partial(text):
+    _broadcast_threadsafe({
+        "type": "partial_transcription",
+        "text": text,
+        "timestamp": time.time()
+    })
+
 def _clean_response_message(message):
     if not message:
         return ""
@@ -166,8 +198,16 @@ def ensure_browser_driver():
         browser_driver = None
         return False
 
+def _on_connectivity_change(online):
+    logger.info(f"Network {'available' if online else 'unavailable'}")
+    _broadcast_threadsafe({
+        "type": "connectivity",
+        "online": online,
+        "timestamp": time.time()
+    })
+
 def initialize_system():
-    global system_controller, browser_driver, speech_detector
+    global system_controller, browser_driver, speech_detector, stt_worker_pool, stt_router
     logger.info("Initializing system components...")
     system_controller = SystemController()
     logger.info("System controller initialized")
@@ -175,136 +215,166 @@ def initialize_system():
     logger.info("Speech detector initialized")
     browser_driver = None
     logger.info("Browser driver: Lazy loading enabled (will open on demand)")
+    connectivity_monitor.add_listener(_on_connectivity_change)
+    connectivity_monitor.start()
+    threading.Thread(target=gemini_transport.warmup, name="GeminiWarmup", daemon=True).start()
+    if command_recognizer.is_available():
+        assistant = session_registry.get("default", browser_driver, system_controller)
+        command_recognizer.set_sources(assistant.classifier, system_controller, assistant.app_controller)
+        logger.info("Vosk command grammar enabled")
+    stt_worker_pool = SttWorkerPool(
+        warmup_models=[m for m in (WHISPER_MODEL, WHISPER_SMALL_MODEL, WHISPER_DRAFT_MODEL) if m] if WHISPER_WARMUP else []
+    )
+    stt_router = create_stt_router(stt_vosk, command_recognizer=command_recognizer, stt_vosk_detailed=stt_vosk_detailed,
+                                   worker_pool=stt_worker_pool if WHISPER_AVAILABLE else None)
     if WHISPER_AVAILABLE:
-        network_available = check_server_connectivity("8.8.8.8", 53, 3)
-        if network_available:
-            logger.info("Network available - Whisper STT enabled")
-        else:
-            logger.info("Network unavailable - Vosk STT enabled")
+        logger.info(f"STT router backends: {', '.join(b.name for b in stt_router.backends)}")
+        if stt_worker_pool.size > 0:
+            stt_worker_pool.start()
+            logger.info(f"Whisper running in {stt_worker_pool.size} worker process(es)")
+        elif WHISPER_WARMUP:
+            whisper_manager.warmup()
+            if WHISPER_DRAFT_MODEL:
+                get_whisper_manager(WHISPER_DRAFT_MODEL).warmup()
+            logger.info("Whisper model warming up in the background")
     else:
         logger.info("Whisper not available - Using Vosk STT only")
     system_controller.get_system_info()
     logger.info("System initialization complete")
 
-def process_voice_input(audio_np):
-    global browser_driver, system_controller, speech_detector
+def _is_closed_window_error(error):
+    return "closed window" in str(error).lower() or "window_handles" in str(error).lower()
+
+def _needs_browser(text):
+    return any(keyword in text.lower() for keyword in 
+               ['search', 'browser', 'web', 'google', 'youtube', 'website', 'download', 'open website'])
+
+def _process_without_browser(text, session_id):
+    assistant = session_registry.get(session_id, None, system_controller)
+    with assistant.command_lock:
+        return assistant.process_command(text)
+
+def _execute_command(text, session_id="default", require_browser=False):
+    global browser_driver
+    if _needs_browser(text):
+        if not ensure_browser_driver():
+            if require_browser:
+                return False, "Failed to initialize browser. Please check browser installation."
+            logger.warning("Browser not available for web command")
+    if browser_driver:
+        try:
+            success, message = process_voice_command_smart(browser_driver, system_controller, text, session_id)
+        except Exception as e:
+            if not _is_closed_window_error(e):
+                raise
+            logger.info("Browser closed, attempting to reopen...")
+            if ensure_browser_driver():
+                success, message = process_voice_command_smart(browser_driver, system_controller, text, session_id)
+            else:
+                success, message = _process_without_browser(text, session_id)
+        if message == "Goodbye!":
+            browser_driver = None
+    else:
+        success, message = _process_without_browser(text, session_id)
+    return success, message
+
+def dispatch_command(text, source="voice", utterance_id=None, session_id="default",
+                     require_browser=False, broadcast=True):
+    utterance_id = utterance_id or uuid.uuid4().hex
+    started = time.time()
     try:
-        network_available = check_server_connectivity("8.8.8.8", 53, 3) if WHISPER_AVAILABLE else False
-        if network_available and WHISPER_AVAILABLE:
-            transcription = stt_whisper(audio_np)
-        else:
-            transcription = stt_vosk(audio_np)
+        success, message = _execute_command(text, session_id, require_browser)
+    except Exception as e:
+        logger.error(f"[{utterance_id}] Error executing {source} command '{text}': {e}")
+        if broadcast:
+            _broadcast_threadsafe({
+                "type": "error",
+                "utterance_id": utterance_id,
+                "message": str(e),
+                "timestamp": time.time()
+            })
+        return utterance_id, False, f"Error: {str(e)}"
+    logger.info(f"[{utterance_id}] {source} command '{text}' -> success={success} "
+                f"in {time.time() - started:.2f}s: {message}")
+    if broadcast and success and message and message not in ["Command processed", "CONTINUE", "EXIT"]:
+        clean_message = _clean_response_message(message)
+        if clean_message:
+            _broadcast_threadsafe({
+                "type": "command_result",
+                "utterance_id": utterance_id,
+                "text": text,
+                "result": clean_message,
+                "timestamp": time.time()
+            })
+    result_message = _clean_response_message(message) if success else f"Error: {message}"
+    return utterance_id, success, result_message
+
+def _stt_backlog():
+    return get_pipeline_metrics().get('queues', {}).get('stt', {}).get('depth', 0)
+
+def transcribe_voice_input(audio_np, transcription=None, utterance_id=None):
+    try:
+        transcription = stt_router.transcribe(audio_np, transcription=transcription, backlog=_stt_backlog())
         if transcription and transcription.strip():
-            logger.info(f"Voice input: {transcription}")
-            asyncio.create_task(manager.broadcast(json.dumps({
+            utterance_id = utterance_id or uuid.uuid4().hex
+            logger.info(f"[{utterance_id}] Voice input: {transcription}")
+            _broadcast_threadsafe({
                 "type": "voice_transcription",
+                "utterance_id": utterance_id,
                 "text": transcription,
                 "timestamp": time.time()
-            })))
-            needs_browser = any(keyword in transcription.lower() for keyword in 
-                              ['search', 'browser', 'web', 'google', 'youtube', 'website', 'download', 'open website'])
-            
-            if needs_browser:
-                if not ensure_browser_driver():
-                    logger.warning("Browser not available for web command")
-            
-            if browser_driver and system_controller:
-                try:
-                    result = process_voice_command_smart(browser_driver, system_controller, transcription)
-                    if result == "EXIT":
-                        browser_driver = None
-                except Exception as e:
-                    if "closed window" in str(e).lower() or "window_handles" in str(e).lower():
-                        logger.info("Browser closed, attempting to reopen...")
-                        if ensure_browser_driver():
-                            result = process_voice_command_smart(browser_driver, system_controller, transcription)
-                        else:
-                            class DummyDriver:
-                                def get(self, url): pass
-                                def quit(self): pass
-                            dummy = DummyDriver()
-                            assistant = SmartAssistant(dummy, system_controller)
-                            assistant.process_command(transcription)
-                    else:
-                        raise
-            elif system_controller:
-                class DummyDriver:
-                    def get(self, url): pass
-                    def quit(self): pass
-                dummy = DummyDriver()
-                assistant = SmartAssistant(dummy, system_controller)
-                assistant.process_command(transcription)
-            if browser_driver and system_controller:
-                try:
-                    success, message = process_voice_command_smart(browser_driver, system_controller, transcription)
-                    if success and message and message not in ["Command processed", "CONTINUE", "EXIT"]:
-                        clean_message = _clean_response_message(message)
-                        if clean_message:
-                            asyncio.create_task(manager.broadcast(json.dumps({
-                                "type": "command_result",
-                                "text": transcription,
-                                "result": clean_message,
-                                "timestamp": time.time()
-                            })))
-                except Exception as e:
-                    if "closed window" in str(e).lower() or "window_handles" in str(e).lower():
-                        try:
-                            if ensure_browser_driver():
-                                success, message = process_voice_command_smart(browser_driver, system_controller, transcription)
-                                if success and message and message not in ["Command processed", "CONTINUE", "EXIT"]:
-                                    clean_message = _clean_response_message(message)
-                                    if clean_message:
-                                        asyncio.create_task(manager.broadcast(json.dumps({
-                                            "type": "command_result",
-                                            "text": transcription,
-                                            "result": clean_message,
-                                            "timestamp": time.time()
-                                        })))
-                        except:
-                            pass
-            elif system_controller:
-                dummy = type('DummyDriver', (), {'get': lambda self, url: None, 'quit': lambda self: None})()
-                assistant = SmartAssistant(dummy, system_controller)
-                success, message = assistant.process_command(transcription)
-                if success and message and message not in ["Command processed", "CONTINUE", "EXIT"]:
-                    clean_message = _clean_response_message(message)
-                    if clean_message:
-                        asyncio.create_task(manager.broadcast(json.dumps({
-                            "type": "command_result",
-                            "text": transcription,
-                            "result": clean_message,
-                            "timestamp": time.time()
-                        })))
+            })
         return transcription
     except Exception as e:
         logger.error(f"Error processing voice input: {e}")
-        asyncio.create_task(manager.broadcast(json.dumps({
+        _broadcast_threadsafe({
             "type": "error",
             "message": str(e),
             "timestamp": time.time()
-        })))
+        })
         return None
 
+def dispatch_voice_input(transcription, utterance_id=None):
+    if system_controller:
+        dispatch_command(transcription, source="voice", utterance_id=utterance_id)
+
 def start_voice_listening():
-    global is_listening
+    global is_listening, voice_listener, voice_stop_event
     if is_listening:
         return
     is_listening = True
+    previous = voice_listener
+    stop_event = voice_stop_event = threading.Event()
     logger.info("Starting voice recognition...")
     def voice_thread():
+        global is_listening
         try:
-            stream_microPhone(process_voice_input, buffer_seconds=3)
+            # The capture ring and pipeline are module-level, so never run two listeners at once
+            if previous is not None:
+                previous.join()
+            if stop_event.is_set():
+                return
+            streaming_stt = VoskStream(on_partial=_broadcast_partial) if STREAMING_VOSK else None
+            stream_microPhone(transcribe_voice_input, buffer_seconds=3, streaming_stt=streaming_stt,
+                              dispatch_function=dispatch_voice_input, stop_event=stop_event)
         except Exception as e:
             logger.error(f"Voice recognition error: {e}")
         finally:
-            is_listening = False
-    thread = threading.Thread(target=voice_thread, daemon=True)
-    thread.start()
+            if voice_listener is threading.current_thread():
+                is_listening = False
+    voice_listener = threading.Thread(target=voice_thread, daemon=True)
+    voice_listener.start()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global event_loop
+    event_loop = asyncio.get_running_loop()
     initialize_system()
     yield
+    connectivity_monitor.stop()
+    await gemini_transport.aclose()
+    if stt_worker_pool is not None and stt_worker_pool.is_running():
+        stt_worker_pool.stop()
     if browser_driver:
         try:
             browser_driver.quit()
@@ -337,9 +407,36 @@ async def get_status():
         "voice_listening": is_listening,
         "browser_enabled": browser_driver is not None,
         "system_controller": system_controller is not None,
+        "sessions": len(session_registry.sessions),
+        "network": connectivity_monitor.get_status(),
+        "whisper": whisper_manager.get_status() if WHISPER_AVAILABLE else {"state": "unavailable"},
+        "stt": stt_router.get_status() if stt_router else None,
+        "stt_workers": stt_worker_pool.get_status() if stt_worker_pool else None,
+        "whisper_batching": get_batching_status(),
+        "parse_cache": parse_cache.get_stats(),
+        "intent_engine": local_intents.get_report(),
+        "gemini_transport": gemini_transport.get_stats(),
+        "prompt_builder": prompt_builder.get_stats(),
+        "vosk_command": command_recognizer.get_status(),
+        "audio_pipeline": get_pipeline_metrics(),
         "timestamp": time.time()
     }
 
+@app.get("/stt/workers")
+async def get_stt_workers():
+    if stt_worker_pool is None:
+        return {"success": False, "message": "STT workers not initialized"}
+    return stt_worker_pool.get_status()
+
+@app.get("/parse-cache")
+async def get_parse_cache():
+    return parse_cache.get_stats()
+
+@app.delete("/parse-cache")
+async def clear_parse_cache(text: Optional[str] = None, context: Optional[str] = None):
+    removed = parse_cache.invalidate(text, context)
+    return {"success": True, "removed": removed}
+
 @app.post("/voice/start")
 async def start_voice():
     global is_listening
@@ -352,6 +449,7 @@ async def start_voice():
 @app.post("/voice/stop")
 async def stop_voice():
     global is_listening
+    voice_stop_event.set()
     is_listening = False
     return {"success": True, "message": "Voice recognition stopped"}
 
@@ -360,50 +458,15 @@ async def process_command(command: VoiceCommand):
     global browser_driver, system_controller
     try:
         if system_controller:
-            needs_browser = any(keyword in command.command.lower() for keyword in 
-                              ['search', 'browser', 'web', 'google', 'youtube', 'website', 'download', 'open website'])
-            
-            if needs_browser:
-                if not ensure_browser_driver():
-                    return CommandResponse(
-                        success=False,
-                        message="Failed to initialize browser. Please check browser installation."
-                    )
-            
-            if browser_driver:
-                try:
-                    success, message = process_voice_command_smart(browser_driver, system_controller, command.command)
-                    result_message = _clean_response_message(message) if success else f"Error: {message}"
-                except Exception as e:
-                    if "closed window" in str(e).lower() or "window_handles" in str(e).lower():
-                        logger.info("Browser closed, attempting to reopen...")
-                        if ensure_browser_driver():
-                            success, message = process_voice_command_smart(browser_driver, system_controller, command.command)
-                            result_message = _clean_response_message(message) if success else f"Error: {message}"
-                        else:
-                            class DummyDriver:
-                                def get(self, url): pass
-                                def quit(self): pass
-                            dummy = DummyDriver()
-                            assistant = SmartAssistant(dummy, system_controller)
-                            success, message = assistant.process_command(command.command)
-                            result_message = _clean_response_message(message) if success else f"Error: {message}"
-                    else:
-                        result_message = f"Error: {str(e)}"
-                        success = False
-            else:
-                class DummyDriver:
-                    def get(self, url): pass
-                    def quit(self): pass
-                dummy = DummyDriver()
-                assistant = SmartAssistant(dummy, system_controller)
-                success, message = assistant.process_command(command.command)
-                result_message = _clean_response_message(message) if success else f"Error: {message}"
-            
+            # Parsing and dispatch block on Gemini, the browser and the system; keep them off the event loop
+            utterance_id, success, result_message = await asyncio.to_thread(
+                dispatch_command, command.command, source="http", session_id=command.session_id,
+                require_browser=True, broadcast=False
+            )
             return CommandResponse(
                 success=success,
                 message=result_message,
-                result={"output": result_message}
+                result={"output": result_message, "utterance_id": utterance_id}
             )
         else:
             return CommandResponse(
@@ -417,6 +480,14 @@ async def process_command(command: VoiceCommand):
             message=f"Error: {str(e)}"
         )
 
+@app.post("/ask")
+async def ask(command: VoiceCommand):
+    global gemini_assistant
+    if gemini_assistant is None:
+        gemini_assistant = GeminiAssistant()
+    success, answer = await gemini_assistant.aquery(command.command)
+    return CommandResponse(success=success, message=answer)
+
 @app.post("/browser/enable")
 async def enable_browser():
     global browser_driver
@@ -5,4 +5,80 @@ PRIMARY_LANGUAGE = "english"
 
 USE_DEFAULT_PROFILE = True
 
-ENABLE_VOICE_FEEDBACK = True
\ No newline at end of file
+ENABLE_VOICE_FEEDBACK = True
+
+STREAMING_VOSK = True
+
+WHISPER_MODEL = "openai/whisper-medium"
+
+WHISPER_SMALL_MODEL = "openai/whisper-base"
+
+WHISPER_PRECISION = "fp32"
+
+WHISPER_WARMUP = True
+
+WHISPER_IDLE_TIMEOUT = 600
+
+STT_LATENCY_BUDGET = 2.0
+
+NOISE_PROFILE_FILE = "~/.either_assistant/noise_profiles.json"
+
+NOISE_PROFILE_MAX_AGE = 7 * 24 * 3600
+
+ADAPTIVE_ENDPOINTING = True
+
+ENDPOINT_SHORT_TAIL = 0.3
+
+ENDPOINT_DEFAULT_TAIL = 1.0
+
+ENDPOINT_LONG_TAIL = 1.5
+
+ENDPOINT_LONG_SPEECH = 4.0
+
+VAD_TRIM_MARGIN = 0.15
+
+VOSK_COMMAND_MODEL = "vosk-model-small-en-us-0.15"
+
+VOSK_COMMAND_MIN_CONFIDENCE = 0.8
+
+STT_SPECULATIVE = True
+
+SPECULATIVE_MIN_CONFIDENCE = 0.85
+
+STT_WORKERS = 1
+
+STT_WORKER_TIMEOUT = 120
+
+WHISPER_BATCH_SIZE = 4
+
+WHISPER_BATCH_WAIT = 0.05
+
+WHISPER_DECODING = "adaptive"
+
+WHISPER_DRAFT_MODEL = None
+
+WHISPER_ESCALATE_LOGPROB = -0.6
+
+WHISPER_TOKENS_PER_SECOND = 8
+
+WHISPER_MIN_TOKENS = 16
+
+PARSE_CACHE_FILE = "~/.either_assistant/parse_cache.json"
+
+PARSE_CACHE_SIZE = 500
+
+PARSE_CACHE_TTL = 7 * 24 * 3600
+
+LOCAL_INTENT_MIN_CONFIDENCE = 0.85
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_CONNECT_TIMEOUT = 3.05
+GEMINI_READ_TIMEOUT = 10
+GEMINI_RETRIES = 2
+GEMINI_RETRY_BACKOFF = 0.25
+GEMINI_POOL_SIZE = 8
+
+PROMPT_TOKEN_BUDGET = 1400
+PROMPT_MAX_EXAMPLES = 8
+PROMPT_MAX_RULES = 6
\ No newline at end of file
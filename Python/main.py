@@ -84,47 +84,43 @@ if __name__ == "__main__":
 
 from STT.RTMicroPhone import stream_microPhone
 try:
-    from STT.sttOffline import stt_vosk
+    from STT.sttOffline import stt_vosk, stt_vosk_detailed, command_recognizer
     VOSK_AVAILABLE = True
 except Exception as e:
     print(f"⚠ Vosk offline STT not available: {e}")
     VOSK_AVAILABLE = False
     stt_vosk = None
-from STT.sttWhisper import stt_whisper
-from STT.NetworkStatus import check_server_connectivity
+    stt_vosk_detailed = None
+    command_recognizer = None
+from STT.sttWhisper import whisper_manager, get_whisper_manager, WHISPER_DRAFT_MODEL
+from STT.SttRouter import create_stt_router
+from STT.NetworkStatus import connectivity_monitor
 from Browser.DriverManager import setup_driver
 from Browser.IntelligentBrowser import process_voice_command
 from System.SystemController import SystemController
-from SmartAssistant import SmartAssistant, process_voice_command_smart
+from SmartAssistant import process_voice_command_smart, session_registry
 import queue
 
 browser_driver = None
 system_controller = None
+stt_router = create_stt_router(stt_vosk, command_recognizer=command_recognizer, stt_vosk_detailed=stt_vosk_detailed)
 command_queue = queue.Queue()
 
-def stt_with_actions(audio_np):
+def transcribe_voice(audio_np, transcription=None, utterance_id=None):
+    return stt_router.transcribe(audio_np, transcription=transcription)
+
+def dispatch_voice(transcription, utterance_id=None):
     global browser_driver, system_controller
-    network_available = check_server_connectivity("8.8.8.8", 53, 3)
-    if network_available and browser_driver:
-        transcription = stt_whisper(audio_np)
-    elif network_available:
-        transcription = stt_whisper(audio_np)
-    else:
-        transcription = stt_whisper(audio_np)
-    if transcription and transcription.strip():
-        if browser_driver and system_controller:
-            result = process_voice_command_smart(browser_driver, system_controller, transcription)
-            if result == "EXIT":
-                browser_driver = None
-        elif system_controller:
-            from Browser.IntelligentBrowser import EnhancedIntelligentBrowser
-            class DummyDriver:
-                def get(self, url): pass
-                def quit(self): pass
-            dummy = DummyDriver()
-            assistant = SmartAssistant(dummy, system_controller)
+    if not transcription or not transcription.strip():
+        return
+    if browser_driver and system_controller:
+        success, message = process_voice_command_smart(browser_driver, system_controller, transcription)
+        if message == "Goodbye!":
+            browser_driver = None
+    elif system_controller:
+        assistant = session_registry.get("default", None, system_controller)
+        with assistant.command_lock:
             assistant.process_command(transcription)
-    return transcription
 
 def print_help():
     print("\n" + "="*60)
@@ -157,18 +153,22 @@ def main():
     print("VOICE-CONTROLLED SYSTEM AUTOMATION")
     print("="*60)
     print("\nInitializing system...")
+    if whisper_manager.is_available():
+        whisper_manager.warmup()
+        if WHISPER_DRAFT_MODEL:
+            get_whisper_manager(WHISPER_DRAFT_MODEL).warmup()
+    else:
+        print("⚠ Whisper not available - using Vosk STT only")
     system_controller = SystemController()
     print("System controller initialized")
-    network_available = check_server_connectivity("8.8.8.8", 53, 3)
-    if network_available:
-        print("Network available - Using Whisper (GPU)")
-        stt_function = stt_whisper
-    elif VOSK_AVAILABLE:
-        print("Network unavailable - Using Vosk (offline)")
-        stt_function = stt_vosk
-    else:
-        print("⚠ No offline STT available - Whisper will be used (requires internet)")
-        stt_function = stt_whisper
+    if command_recognizer is not None and command_recognizer.is_available():
+        assistant = session_registry.get("default", None, system_controller)
+        command_recognizer.set_sources(assistant.classifier, system_controller, assistant.app_controller)
+    connectivity_monitor.start(wait=True)
+    network_available = connectivity_monitor.is_online()
+    print(f"Network {'available' if network_available else 'unavailable'}")
+    backends = ", ".join(backend.name for backend in stt_router.backends)
+    print(f"STT router backends: {backends} (latency budget {stt_router.latency_budget:.1f}s)")
     system_controller.get_system_info()
     print("\n" + "="*60)
     print("BROWSER SETUP")
@@ -189,7 +189,7 @@ def main():
     print("STARTING VOICE RECOGNITION")
     print("="*60 + "\n")
     try:
-        stream_microPhone(stt_with_actions, buffer_seconds=3)
+        stream_microPhone(transcribe_voice, buffer_seconds=3, dispatch_function=dispatch_voice)
     except KeyboardInterrupt:
         print("\n\nShutting down...")
     finally:
@@ -0,0 +1,30 @@
+import pytest
+
+from STT.AudioPipeline import StageQueue
+
+def drain(stage_queue):
+    items = []
+    while stage_queue.depth():
+        items.append(stage_queue.get(timeout=0))
+    return items
+
+def test_drop_oldest_keeps_newest_items():
+    stage_queue = StageQueue("capture", 3, overflow="drop_oldest")
+    for item in range(5):
+        assert stage_queue.put(item) is True
+    assert drain(stage_queue) == [2, 3, 4]
+    metrics = stage_queue.get_metrics()
+    assert metrics['enqueued'] == 5
+    assert metrics['dropped'] == 2
+    assert metrics['max_depth'] == 3
+
+def test_drop_newest_rejects_when_full():
+    stage_queue = StageQueue("stt", 2, overflow="drop_newest")
+    assert stage_queue.put("a") and stage_queue.put("b")
+    assert stage_queue.put("c") is False
+    assert drain(stage_queue) == ["a", "b"]
+    assert stage_queue.get_metrics()['dropped'] == 1
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        StageQueue("capture", 3, overflow="spill")
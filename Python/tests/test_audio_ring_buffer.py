@@ -0,0 +1,43 @@
+import queue
+
+import numpy as np
+import pytest
+
+from STT.AudioRingBuffer import AudioRingBuffer
+
+def blocks(count, block_size, start=0):
+    return [np.arange(start + i * block_size, start + (i + 1) * block_size, dtype=np.float32)
+            for i in range(count)]
+
+def test_get_returns_blocks_in_order_across_wrap_around():
+    ring = AudioRingBuffer("capture", 4 * 4, 4)
+    for block in blocks(3, 4):
+        ring.put(block)
+    for block in blocks(3, 4)[:2]:
+        np.testing.assert_array_equal(ring.get(timeout=0), block)
+    # Writes 12..19 and 20..23 wrap past the end of the 16-sample buffer
+    for block in blocks(3, 4, start=12):
+        ring.put(block)
+    for expected in [blocks(1, 4, start=8)[0]] + blocks(3, 4, start=12):
+        np.testing.assert_array_equal(ring.get(timeout=0), expected)
+    with pytest.raises(queue.Empty):
+        ring.get(timeout=0)
+
+def test_view_copies_only_when_range_wraps():
+    ring = AudioRingBuffer("capture", 8, 4)
+    for block in blocks(3, 4):
+        ring.put(block[:, None])
+    np.testing.assert_array_equal(ring.view(4, 8), np.arange(4, 8))
+    assert np.shares_memory(ring.view(4, 8), ring.data)
+    wrapped = ring.view(6, 10)
+    np.testing.assert_array_equal(wrapped, np.arange(6, 10))
+    assert not np.shares_memory(wrapped, ring.data)
+
+def test_overflow_drops_oldest_blocks():
+    ring = AudioRingBuffer("capture", 8, 4)
+    for block in blocks(4, 4):
+        ring.put(block)
+    assert ring.get_metrics()['dropped'] == 2
+    assert ring.oldest() == 8
+    np.testing.assert_array_equal(ring.get(timeout=0), np.arange(8, 12))
+    np.testing.assert_array_equal(ring.extract(0, 16), np.arange(8, 16))
@@ -0,0 +1,35 @@
+import pytest
+
+from CommandClassifier import CommandClassifier, KeywordAutomaton, _scoring_corpus
+
+@pytest.fixture(scope="module")
+def classifier():
+    return CommandClassifier()
+
+def naive_find(keywords, text):
+    return {keyword for keyword in keywords if keyword in text}
+
+def test_automaton_reports_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+    assert automaton.find("ushers") == {"she", "he", "hers"}
+    assert automaton.find("this") == {"his"}
+    assert automaton.find("nothing here") == {"he"}
+    assert automaton.find("") == set()
+
+def test_automaton_matches_substring_search(classifier):
+    keywords = sorted(classifier.keyword_weights)
+    automaton = KeywordAutomaton(keywords)
+    for text in _scoring_corpus(classifier, 500, seed=3):
+        assert automaton.find(text) == naive_find(keywords, text)
+
+def test_compiled_scores_match_reference(classifier):
+    for text in _scoring_corpus(classifier, 2000):
+        assert classifier._compiled_scores(text) == classifier._reference_scores(text), text
+
+@pytest.mark.parametrize("text", [
+    "open chrome", "search for python tutorials on youtube", "hello how are you",
+    "create file notes.txt", "ſearch KELVIN café", "", "karo mein",
+])
+def test_compiled_scores_match_reference_on_edge_cases(classifier, text):
+    text = text.lower().strip()
+    assert classifier._compiled_scores(text) == classifier._reference_scores(text)
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import ParseCache as parse_cache_module
+from ParseCache import ParseCache
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(parse_cache_module, "time", clock)
+    return clock
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ParseCache(path=None, max_entries=2, ttl=None)
+    cache.put("open chrome", {"action": "open_app", "app_name": "chrome"})
+    cache.put("scroll down", {"action": "browser_control", "command": "scroll_down"})
+    assert cache.get("Open Chrome!") == {"action": "open_app", "app_name": "chrome"}
+    cache.put("go back", {"action": "browser_control", "command": "go_back"})
+    assert cache.get("scroll down") is None
+    assert cache.get("open chrome") is not None
+    assert cache.get("go back") is not None
+    assert cache.get_stats()['evictions'] == 1
+
+def test_get_expires_entries_past_ttl(clock):
+    cache = ParseCache(path=None, ttl=60)
+    cache.put("volume up", {"action": "system_control"})
+    clock.now += 59
+    assert cache.get("volume up") == {"action": "system_control"}
+    clock.now += 2
+    assert cache.get("volume up") is None
+    stats = cache.get_stats()
+    assert stats['expired'] == 1
+    assert stats['entries'] == 0
+
+def test_load_skips_expired_entries_and_keeps_lru_order(clock, tmp_path):
+    path = tmp_path / "parse_cache.json"
+    path.write_text(json.dumps({
+        "|stale": {"result": {"action": "stale"}, "timestamp": clock.now - 120, "last_used": clock.now - 1},
+        "|recent": {"result": {"action": "recent"}, "timestamp": clock.now - 10, "last_used": clock.now - 5},
+        "|old": {"result": {"action": "old"}, "timestamp": clock.now - 30, "last_used": clock.now - 20},
+    }))
+    cache = ParseCache(path=str(path), max_entries=1, ttl=60)
+    assert list(cache.entries) == ["|recent"]
+
+def test_invalidate_by_text_context_and_all(clock):
+    cache = ParseCache(path=None, ttl=None)
+    cache.put("save", {"action": "app_command", "command": "save"}, context="vscode")
+    cache.put("copy", {"action": "app_command", "command": "copy"}, context="vscode")
+    cache.put("save", {"action": "app_command", "command": "save"}, context="notepad")
+    cache.put("open chrome", {"action": "open_app", "app_name": "chrome"})
+    assert cache.invalidate("save", context="notepad") == 1
+    assert cache.get("save", context="notepad") is None
+    assert cache.invalidate(context="VSCode") == 2
+    assert cache.get("copy", context="vscode") is None
+    assert cache.get("open chrome") is not None
+    assert cache.invalidate() == 1
+    assert cache.get_stats()['entries'] == 0
+
+def test_results_are_copied(clock):
+    cache = ParseCache(path=None, ttl=None)
+    result = {"action": "complex_command", "steps": [{"action": "open_app"}]}
+    cache.put("open and type", result)
+    result["steps"].clear()
+    cached = cache.get("open and type")
+    cached["steps"].append({"action": "type"})
+    assert cache.get("open and type") == {"action": "complex_command", "steps": [{"action": "open_app"}]}
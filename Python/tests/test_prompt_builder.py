@@ -0,0 +1,54 @@
+from collections import Counter
+
+import pytest
+
+from PromptBuilder import (
+    CONTEXT_EXAMPLES, CORE_PROMPT, EXAMPLES, MAX_EXAMPLES_PER_ACTION, PromptBuilder, SimilarityIndex,
+    estimate_tokens,
+)
+
+@pytest.fixture(scope="module")
+def builder():
+    return PromptBuilder(token_budget=1400, max_examples=8, max_rules=6)
+
+def test_similarity_index_ranks_closest_document_first():
+    index = SimilarityIndex(["open chrome", "search cats on youtube", "close this tab"])
+    assert index.query("search dogs on youtube")[0][1] == 1
+    assert index.query("open chrome")[0][1] == 0
+    assert index.query("zzz") == []
+
+def test_build_keeps_core_and_closest_example(builder):
+    prompt = builder.build("search cats on youtube", "Linux", "Chrome")
+    assert prompt.startswith(CORE_PROMPT.split("{os_name}")[0])
+    assert "Operating System: Linux" in prompt
+    assert '"search cats on youtube" →' in prompt
+    assert prompt.endswith("User Input: search cats on youtube\nJSON Output:")
+    assert estimate_tokens(prompt) < builder.full_tokens
+
+def test_context_examples_only_with_app_context(builder):
+    without = builder.build("hello world", "Linux", "Chrome")
+    within = builder.build("hello world", "Linux", "Chrome", app_context="VSCode")
+    assert CONTEXT_EXAMPLES[0][1] not in without
+    assert CONTEXT_EXAMPLES[0][1] in within
+    assert "Current Application: VSCode" in within
+
+def test_examples_are_capped_per_action():
+    builder = PromptBuilder(max_examples=len(EXAMPLES))
+    examples = builder._select_examples("download install get from web snap terminal store", None)
+    assert examples
+    assert max(Counter(action for action, _, _ in examples).values()) <= MAX_EXAMPLES_PER_ACTION
+
+def test_token_budget_drops_examples_and_rules():
+    core_tokens = estimate_tokens(PromptBuilder._assemble("open chrome", "Linux", "Chrome", [], [], None))
+    builder = PromptBuilder(token_budget=core_tokens)
+    prompt = builder.build("open chrome", "Linux", "Chrome")
+    assert estimate_tokens(prompt) <= core_tokens
+    assert "Examples:" not in prompt
+    assert builder.get_stats()['last_tokens'] == estimate_tokens(prompt)
+
+def test_record_usage_averages_reported_tokens():
+    builder = PromptBuilder()
+    builder.record_usage(400)
+    builder.record_usage(None)
+    builder.record_usage(600)
+    assert builder.get_stats()['avg_reported_tokens'] == 500